@@ -0,0 +1,91 @@
+"""Append-only activity feed for the admin dashboard (activity_events table).
+
+Events are written in the same transaction as the change they describe and
+read newest-first by primary key, so every read is a short index range scan.
+"""
+
+MAX_ACTIVITY_LIMIT = 100
+
+ACTIVITY_COLUMNS = "id, type, title, action, entity_id, created_at"
+
+# One-time fill from the tables the feed used to be computed from
+BACKFILL_QUERY = """
+INSERT INTO activity_events (type, title, action, entity_id, created_at)
+SELECT type, title, action, entity_id, created_at FROM (
+    SELECT 'lawyer' AS type, name AS title, 'registered' AS action, id AS entity_id, created_at
+    FROM lawyers WHERE status = 'verified'
+    UNION ALL
+    SELECT 'application', name, 'applied', id, created_at FROM lawyer_applications
+    UNION ALL
+    SELECT 'message', name, 'contacted', id, created_at FROM contact_messages
+) AS history
+ORDER BY created_at, entity_id
+"""
+
+
+def record_activity(connection, type, title, action, entity_id=None):
+    """Append an event on the caller's connection (committed with the caller's write)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO activity_events (type, title, action, entity_id) VALUES (%s, %s, %s, %s)",
+            (type, (title or '')[:255], action, entity_id)
+        )
+    finally:
+        cursor.close()
+
+
+def record_activities(connection, events):
+    """Append many (type, title, action, entity_id) events with one executemany"""
+    if not events:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(
+            "INSERT INTO activity_events (type, title, action, entity_id) VALUES (%s, %s, %s, %s)",
+            [(type, (title or '')[:255], action, entity_id) for type, title, action, entity_id in events]
+        )
+    finally:
+        cursor.close()
+
+
+def backfill_activity(connection):
+    """Seed an empty activity_events table from existing rows; returns True if it did"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT 1 FROM activity_events LIMIT 1")
+        if cursor.fetchone():
+            return False
+        cursor.execute(BACKFILL_QUERY)
+        return True
+    finally:
+        cursor.close()
+
+
+def clamp_limit(limit, default=20):
+    return min(max(limit or default, 1), MAX_ACTIVITY_LIMIT)
+
+
+def fetch_activity(connection, limit=20, before=None, since=None):
+    """Newest-first events; `before` pages back from an id, `since` returns only newer ids.
+
+    Returns (events, has_more).
+    """
+    conditions, params = [], []
+    if before is not None:
+        conditions.append("id < %s")
+        params.append(before)
+    if since is not None:
+        conditions.append("id > %s")
+        params.append(since)
+    where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            f"SELECT {ACTIVITY_COLUMNS} FROM activity_events {where}ORDER BY id DESC LIMIT %s",
+            params + [limit + 1]
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return rows[:limit], len(rows) > limit
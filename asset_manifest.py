@@ -0,0 +1,136 @@
+"""Content-hash fingerprinting for static assets.
+
+The manifest maps each static file to a name with a short SHA-256 of its
+content ('js/state-district.js' -> 'js/state-district.1a2b3c4d5e.js').
+url_for('static', filename=...) emits the fingerprinted name through a
+url_defaults hook, and the static view maps it back and sends it with a
+one-year immutable Cache-Control: a changed file gets a new URL, so browsers
+never need to revalidate. The service worker's cache version and precache
+list are derived from the same manifest.
+"""
+import hashlib
+import os
+import re
+import threading
+
+from flask import url_for
+
+HASH_LENGTH = 10
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Files that must keep a stable URL (the service worker and PWA manifest are
+# looked up by name; icons have their own route) and build outputs
+EXCLUDED = ('service-worker.js', 'manifest.json', 'icons/')
+EXCLUDED_SUFFIXES = ('.gz', '.br', '.tmp')
+FINGERPRINT = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % HASH_LENGTH)
+
+
+def fingerprinted_name(path, digest):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(folder):
+    """{relative path: fingerprinted relative path} for every asset under `folder`"""
+    manifest = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, folder).replace(os.sep, '/')
+            if relative.startswith(EXCLUDED) or name.endswith(EXCLUDED_SUFFIXES):
+                continue
+            manifest[relative] = fingerprinted_name(relative, hash_file(path))
+    return manifest
+
+
+class AssetManifest:
+    """Fingerprinted static URLs for an app.
+
+    The manifest is built once per process from the files on disk; with
+    `auto_reload` (debug mode) it is rebuilt whenever a file changes.
+    """
+
+    def __init__(self, app=None, auto_reload=False):
+        self.folder = None
+        self.auto_reload = auto_reload
+        self._manifest = None
+        self._reverse = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.folder = app.static_folder
+        app.url_defaults(self._fingerprint_static)
+        app.jinja_env.globals['asset_url'] = self.url
+        # Wraps whatever serves /static (e.g. the precompressed view in compression.py)
+        app.view_functions['static'] = self.static_view(app.view_functions['static'])
+
+    def _mtime_stamp(self):
+        return max((os.path.getmtime(os.path.join(root, name))
+                    for root, _, names in os.walk(self.folder) for name in names), default=0)
+
+    @property
+    def manifest(self):
+        stamp = self._mtime_stamp() if self.auto_reload else None
+        if self._manifest is None or stamp != self._stamp:
+            with self._lock:
+                manifest = build_manifest(self.folder)
+                self._reverse = {hashed: name for name, hashed in manifest.items()}
+                self._manifest, self._stamp = manifest, stamp
+        return self._manifest
+
+    @property
+    def version(self):
+        """Short hash of the whole manifest: changes whenever any asset changes"""
+        listing = '\n'.join(f"{name} {hashed}" for name, hashed in sorted(self.manifest.items()))
+        return hashlib.sha256(listing.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+    def fingerprinted(self, filename):
+        return self.manifest.get(filename, filename)
+
+    def original(self, filename):
+        """(original name, current) for a requested name; current is False for an outdated hash"""
+        manifest = self.manifest
+        name = self._reverse.get(filename)
+        if name:
+            return name, True
+        match = FINGERPRINT.match(filename)
+        if match and match.group('stem') + match.group('ext') in manifest:
+            # A page rendered before the last deploy: serve the current file, but not as immutable
+            return match.group('stem') + match.group('ext'), False
+        return filename, False
+
+    def url(self, filename):
+        """url_for('static') for `filename`, fingerprinted when it is in the manifest"""
+        return url_for('static', filename=filename)
+
+    def _fingerprint_static(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = self.fingerprinted(values['filename'])
+
+    def static_view(self, view):
+        def static(filename):
+            name, current = self.original(filename)
+            response = view(filename=name)
+            if current and response.status_code in (200, 206, 304):
+                response.cache_control.public = True
+                response.cache_control.max_age = IMMUTABLE_MAX_AGE
+                response.cache_control.immutable = True
+                response.cache_control.no_cache = None
+                response.expires = None
+            return response
+
+        return static
+
+    def urls(self, filenames):
+        """Fingerprinted static URLs for `filenames` (for the service worker precache list)"""
+        return [self.url(filename) for filename in filenames]
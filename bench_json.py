@@ -0,0 +1,71 @@
+"""Benchmark: jsonify of a large lawyer directory with FastJSONProvider vs Flask's default provider.
+
+    python bench_json.py --rows 50000 --repeat 5
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import FastJSONProvider, orjson
+
+
+def lawyer_rows(count):
+    """Rows shaped like SELECT * FROM lawyers (DECIMAL and TIMESTAMP columns included)"""
+    start = datetime(2024, 1, 1)
+    return [{
+        'id': n,
+        'name': f"Advocate {n}",
+        'specialization': ('Criminal Law', 'Family Law', 'Corporate Law', 'Tax Law')[n % 4],
+        'years_experience': n % 40,
+        'rating': Decimal(f"{3 + (n % 20) / 10:.2f}"),
+        'total_ratings': n % 500,
+        'case_win_rate': Decimal(f"{50 + n % 50}.25"),
+        'bio': "Practising advocate with experience in trial and appellate courts. " * 3,
+        'photo': f"/uploads/{n:064x}.jpg",
+        'phone': f"+9198{n:08d}",
+        'email': f"advocate{n}@example.com",
+        'location': 'Pune, Maharashtra',
+        'state': 'Maharashtra',
+        'district': 'Pune',
+        'consultation_fee': Decimal(f"{500 + n % 50 * 100}.00"),
+        'keywords': ['bail', 'property', 'divorce'],
+        'status': 'verified',
+        'created_at': start + timedelta(minutes=n),
+        'updated_at': start + timedelta(minutes=n, seconds=30),
+    } for n in range(count)]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payload = {'success': True, 'lawyers': lawyer_rows(args.rows)}
+    print(f"{args.rows} lawyers, best of {args.repeat}; orjson {'installed' if orjson else 'NOT installed (stdlib fallback)'}")
+    baseline = None
+    for name, provider_class in (('flask default', DefaultJSONProvider), ('FastJSONProvider', FastJSONProvider)):
+        app = Flask(__name__)
+        app.json = provider_class(app)
+        with app.app_context():
+            seconds, response = best_of(args.repeat, lambda: app.json.response(payload))
+        size = len(response.get_data())
+        baseline = baseline or seconds
+        print(f"  {name:<18} {seconds * 1000:8.1f} ms  {size / 1e6:6.2f} MB  {baseline / seconds:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
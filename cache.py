@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBackend:
+    """Per-process backend: size-bounded LRU with per-entry expiry"""
+
+    def __init__(self, maxsize=1024, clock=time.monotonic):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._counters = {}
+        # Versions start from a per-process seed so two workers never agree on a
+        # version number for different data
+        self._counter_seed = time.time_ns()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.setdefault(key, self._counter_seed)
+
+    def incr(self, key):
+        with self._lock:
+            value = self._counters.get(key, self._counter_seed) + 1
+            self._counters[key] = value
+            return value
+
+    def info(self):
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._entries),
+                    'maxsize': self.maxsize, 'evictions': self.evictions}
+
+
+class RedisBackend:
+    """Backend shared by every worker through a Redis-protocol server"""
+
+    def __init__(self, url, client=None):
+        if client is None:
+            import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._client = client
+
+    def get(self, key):
+        raw = self._client.get(key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=max(int(ttl), 1))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def get_counter(self, key):
+        raw = self._client.get(key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key):
+        return int(self._client.incr(key))
+
+    def info(self):
+        return {'backend': 'redis'}
+
+
+def create_cache_backend(config):
+    """Build the backend named by config['backend'] ('memory' or 'redis')"""
+    if config.get('backend') == 'redis':
+        try:
+            return RedisBackend(config['redis_url'])
+        except Exception as e:
+            logging.error(f"Redis cache backend unavailable ({type(e).__name__}: {e}); using in-memory cache")
+    return MemoryBackend(maxsize=config.get('memory_max_entries', 1024))
+
+
+class CacheNamespace:
+    """Group of cache entries invalidated together by bumping a version key.
+
+    Entry keys embed the namespace version, so invalidate() in one worker makes
+    every worker's entries unreachable at once; they then expire by TTL.
+    Concurrent misses for the same key inside a process wait for one loader
+    call (stampede protection). None is never cached.
+    """
+
+    def __init__(self, backend, name, ttl, prefix='legalmatch'):
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self._prefix = f"{prefix}:{name}"
+        self._version_key = f"{self._prefix}:version"
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'loads': 0, 'load_errors': 0,
+                       'waits': 0, 'invalidations': 0, 'backend_errors': 0}
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _entry_key(self, key, version):
+        if not isinstance(key, str):
+            key = json.dumps(key, sort_keys=True, default=str)
+        if len(key) > 150:
+            key = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return f"{self._prefix}:v{version}:{key}"
+
+    def version(self):
+        """Current namespace version (changes on every invalidate())"""
+        try:
+            return self.backend.get_counter(self._version_key)
+        except Exception as e:
+            self._backend_error(e)
+            return None
+
+    def _backend_error(self, error):
+        self._count('backend_errors')
+        logging.warning(f"Cache backend error in {self.name}: {type(error).__name__}: {error}")
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() once on a miss"""
+        version = self.version()
+        if version is None:
+            return loader()
+        entry_key = self._entry_key(key, version)
+
+        while True:
+            try:
+                value = self.backend.get(entry_key)
+            except Exception as e:
+                self._backend_error(e)
+                return loader()
+            if value is not None:
+                self._count('hits')
+                return value
+            with self._lock:
+                pending = self._loading.get(entry_key)
+                if pending is None:
+                    self._stats['misses'] += 1
+                    pending = self._loading[entry_key] = threading.Event()
+                    break
+                self._stats['waits'] += 1
+            # Another thread in this process is loading the key; wait and look again
+            pending.wait()
+
+        try:
+            value = loader()
+            self._count('loads')
+            if value is not None:
+                try:
+                    self.backend.set(entry_key, value, self.ttl)
+                except Exception as e:
+                    self._backend_error(e)
+            return value
+        except Exception:
+            self._count('load_errors')
+            raise
+        finally:
+            with self._lock:
+                del self._loading[entry_key]
+            pending.set()
+
+    def delete(self, key):
+        """Evict a single entry of the current version"""
+        version = self.version()
+        if version is None:
+            return
+        try:
+            self.backend.delete(self._entry_key(key, version))
+        except Exception as e:
+            self._backend_error(e)
+
+    def invalidate(self):
+        """Make every entry of this namespace unreachable in all workers"""
+        self._count('invalidations')
+        try:
+            self.backend.incr(self._version_key)
+        except Exception as e:
+            self._backend_error(e)
+
+    def item_version(self, item):
+        """Version of one item's entries (changes on every invalidate_item(item)); None if unavailable"""
+        try:
+            return self.backend.get_counter(f"{self._version_key}:{item}")
+        except Exception as e:
+            self._backend_error(e)
+            return None
+
+    def invalidate_item(self, item):
+        """Make the entries whose keys embed item_version(item) unreachable in all workers"""
+        self._count('invalidations')
+        try:
+            self.backend.incr(f"{self._version_key}:{item}")
+        except Exception as e:
+            self._backend_error(e)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        return stats
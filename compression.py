@@ -0,0 +1,174 @@
+"""gzip/brotli response compression and precompressed static assets.
+
+Dynamic responses (HTML pages, JSON) are compressed in an after_request hook
+when the client accepts it, the body is at least `min_size` bytes and its
+mimetype is on the allowlist. Streamed responses (exports, file downloads)
+are left alone. Static files are compressed once by `flask compress-static`
+into <file>.br / <file>.gz next to the original; the static view sends those
+as-is when they exist and the client accepts the encoding.
+"""
+import gzip
+import os
+from mimetypes import guess_type
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript', 'text/csv',
+    'application/javascript', 'application/json', 'application/manifest+json',
+    'application/xml', 'image/svg+xml',
+}
+STATIC_EXTENSIONS = ('.css', '.js', '.json', '.html', '.svg', '.xml', '.txt')
+# Preferred first: brotli is smaller at a similar decode cost
+ENCODINGS = ('br', 'gzip')
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+_brotli = None
+
+
+def load_brotli():
+    """The optional brotli module, or None when it is not installed"""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+        except ImportError:
+            brotli = False
+        _brotli = brotli
+    return _brotli or None
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header that we can produce, best first"""
+    accepted = set()
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+    available = [encoding for encoding in ENCODINGS if encoding != 'br' or load_brotli()]
+    return [encoding for encoding in available if encoding in accepted or '*' in accepted]
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=5):
+    if encoding == 'br':
+        return load_brotli().compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def _add_vary(response):
+    response.vary.add('Accept-Encoding')
+
+
+class Compression:
+    """Compresses eligible responses of an app and serves precompressed static files"""
+
+    def __init__(self, app=None, min_size=500, gzip_level=6, brotli_quality=5, mimetypes=COMPRESSIBLE_MIMETYPES):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = set(mimetypes)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+        if app.static_folder and 'static' in app.view_functions:
+            app.view_functions['static'] = self.static_view(app)
+
+    def should_compress(self, response):
+        return (
+            response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in self.mimetypes
+            and 'no-transform' not in response.headers.get('Cache-Control', '')
+            and (response.content_length or 0) >= self.min_size
+        )
+
+    def after_request(self, response):
+        if response.mimetype in self.mimetypes:
+            _add_vary(response)
+        if not self.should_compress(response):
+            return response
+        encodings = accepted_encodings(request.headers.get('Accept-Encoding'))
+        if not encodings:
+            return response
+        data = compress(response.get_data(), encodings[0], self.gzip_level, self.brotli_quality)
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encodings[0]
+        # The bytes differ from the identity body, so a strong validator would be wrong
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def static_view(self, app):
+        folder = app.static_folder
+        max_age = app.get_send_file_max_age
+
+        def static(filename):
+            for encoding in accepted_encodings(request.headers.get('Accept-Encoding')):
+                path = safe_join(folder, filename + PRECOMPRESSED_SUFFIXES[encoding])
+                original = safe_join(folder, filename)
+                if path and original and os.path.isfile(path) and _is_current(path, original):
+                    response = send_from_directory(folder, filename + PRECOMPRESSED_SUFFIXES[encoding],
+                                                   mimetype=_guess_mimetype(filename), max_age=max_age(filename))
+                    response.headers['Content-Encoding'] = encoding
+                    _add_vary(response)
+                    return response
+            response = send_from_directory(folder, filename, max_age=max_age(filename))
+            if response.mimetype in self.mimetypes:
+                _add_vary(response)
+            return response
+
+        return static
+
+
+def _is_current(compressed, original):
+    """False if the original changed after it was compressed (stale build output)"""
+    try:
+        return os.path.getmtime(compressed) >= os.path.getmtime(original)
+    except OSError:
+        return False
+
+
+def _guess_mimetype(filename):
+    return guess_type(filename)[0] or 'application/octet-stream'
+
+
+def precompress_static(folder, min_size=500, gzip_level=9, brotli_quality=11):
+    """Write .gz (and .br when brotli is installed) next to compressible static files.
+
+    Returns {'files', 'written', 'bytes_in', 'bytes_out'}; outputs that would not
+    be smaller than the original are not written (and stale ones are removed).
+    """
+    stats = {'files': 0, 'written': 0, 'bytes_in': 0, 'bytes_out': 0}
+    encodings = [encoding for encoding in ENCODINGS if encoding != 'br' or load_brotli()]
+    for root, _, names in os.walk(folder):
+        for name in sorted(names):
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            stats['files'] += 1
+            for encoding in encodings:
+                target = path + PRECOMPRESSED_SUFFIXES[encoding]
+                compressed = compress(data, encoding, gzip_level, brotli_quality)
+                if len(compressed) >= len(data):
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                tmp = target + '.tmp'
+                with open(tmp, 'wb') as f:
+                    f.write(compressed)
+                os.replace(tmp, target)
+                stats['written'] += 1
+                stats['bytes_in'] += len(data)
+                stats['bytes_out'] += len(compressed)
+    return stats
@@ -12,6 +12,61 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 3306))
 }
 
+# Database Connection Pool Configuration
+DB_POOL_CONFIG = {
+    'size': int(os.getenv('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    'recycle': int(os.getenv('DB_POOL_RECYCLE', 3600)),
+    'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+}
+
+# Cache Configuration (TTLs in seconds). CACHE_BACKEND=redis shares entries
+# between workers; it needs the optional `redis` package.
+CACHE_CONFIG = {
+    'backend': os.getenv('CACHE_BACKEND', 'memory'),
+    'redis_url': os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+    'key_prefix': os.getenv('CACHE_KEY_PREFIX', 'legalmatch'),
+    'memory_max_entries': int(os.getenv('CACHE_MEMORY_MAX_ENTRIES', 1024)),
+    'directory_ttl': int(os.getenv('DIRECTORY_CACHE_TTL', 60)),
+    'profile_ttl': int(os.getenv('PROFILE_CACHE_TTL', 300)),
+    'stats_ttl': int(os.getenv('STATS_CACHE_TTL', 30)),
+    'fragment_ttl': int(os.getenv('FRAGMENT_CACHE_TTL', 600))
+}
+
+# Browser caching of the lawyer APIs (seconds; 0 = always revalidate with the ETag)
+API_CACHE_CONFIG = {
+    'directory_max_age': int(os.getenv('API_DIRECTORY_MAX_AGE', 0)),
+    'profile_max_age': int(os.getenv('API_PROFILE_MAX_AGE', 60))
+}
+
+# Response compression (see compression.py); brotli needs the optional `brotli` package
+COMPRESSION_CONFIG = {
+    'enabled': os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+    'min_size': int(os.getenv('COMPRESSION_MIN_SIZE', 500)),
+    'gzip_level': int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)),
+    'brotli_quality': int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+}
+
+# Admin dashboard counters are rebuilt from the base tables this often (seconds, 0 = never)
+STATS_CONFIG = {
+    'reconcile_interval': int(os.getenv('STATS_RECONCILE_INTERVAL', 3600))
+}
+
+# Admin exports: large exports run on a thread pool and are written to this folder
+EXPORT_CONFIG = {
+    'folder': os.getenv('EXPORT_FOLDER', os.path.join(os.getcwd(), 'exports')),
+    'workers': int(os.getenv('EXPORT_WORKERS', 2)),
+    'batch_size': int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+}
+
+# Bulk lawyer import (admin upload and `flask import-lawyers`)
+IMPORT_CONFIG = {
+    'batch_size': int(os.getenv('IMPORT_BATCH_SIZE', 500)),
+    'max_rows': int(os.getenv('IMPORT_MAX_ROWS', 20000)),
+    'max_bytes': int(os.getenv('IMPORT_MAX_BYTES', 10 * 1024 * 1024))
+}
+
 # Secret Key
 SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
 
@@ -20,10 +75,41 @@ EMAIL_CONFIG = {
     'smtp_server': os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
     'smtp_port': int(os.getenv('SMTP_PORT', 587)),
     'email': os.getenv('ADMIN_EMAIL', ''),
-    'password': os.getenv('EMAIL_PASSWORD', '')
+    'password': os.getenv('EMAIL_PASSWORD', ''),
+    # Set SMTP_USE_TLS=false for a local plaintext test server (e.g. aiosmtpd)
+    'use_tls': os.getenv('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
+}
+
+# Background mail queue (retry delays in seconds, doubled after each failed attempt)
+MAIL_QUEUE_CONFIG = {
+    'workers': int(os.getenv('MAIL_WORKERS', 2)),
+    'batch_size': int(os.getenv('MAIL_BATCH_SIZE', 20)),
+    'max_attempts': int(os.getenv('MAIL_MAX_ATTEMPTS', 5)),
+    'retry_base_delay': int(os.getenv('MAIL_RETRY_BASE_DELAY', 30)),
+    'retry_max_delay': int(os.getenv('MAIL_RETRY_MAX_DELAY', 3600)),
+    'poll_interval': int(os.getenv('MAIL_POLL_INTERVAL', 5))
 }
 
 # File Upload Configuration
 UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
+# Content-addressed store for new uploads (see upload_store.py)
+UPLOAD_STORE_FOLDER = os.getenv('UPLOAD_STORE_FOLDER', os.path.join(UPLOAD_FOLDER, 'store'))
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'pdf', 'doc', 'docx'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+MAX_PHOTO_SIZE = 2 * 1024 * 1024
+MAX_CLIENT_DOCUMENT_SIZE = 10 * 1024 * 1024
+
+# How /uploads is served (see upload_serving.py). UPLOAD_OFFLOAD: '' (Flask sends the
+# file), 'x-accel' (nginx internal locations below) or 'x-sendfile'
+UPLOAD_SERVING_CONFIG = {
+    'offload': os.getenv('UPLOAD_OFFLOAD', '').lower(),
+    'accel_prefix': os.getenv('UPLOAD_ACCEL_PREFIX', '/internal/uploads/'),
+    'store_accel_prefix': os.getenv('UPLOAD_STORE_ACCEL_PREFIX', '/internal/uploads/store/'),
+    'max_age': int(os.getenv('UPLOAD_MAX_AGE', 3600))
+}
+
+# Resized WebP/AVIF/JPEG variants of lawyer photos (image_variants.py, needs Pillow)
+IMAGE_CONFIG = {
+    'workers': int(os.getenv('IMAGE_WORKERS', 2)),
+    'widths': tuple(int(width) for width in os.getenv('IMAGE_VARIANT_WIDTHS', '160,320,640').split(',') if width.strip())
+}
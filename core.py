@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_app_context
 from flask_wtf import CSRFProtect
 import mysql.connector
 from mysql.connector import Error
@@ -7,12 +7,30 @@ import re
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from decimal import Decimal, ROUND_HALF_UP
 import html
 import logging
-from config import DB_CONFIG, SECRET_KEY, EMAIL_CONFIG, UPLOAD_FOLDER, ALLOWED_EXTENSIONS
+import click
+from contextlib import contextmanager
+from db_pool import ConnectionPool
+from json_provider import FastJSONProvider
+from compression import Compression, precompress_static
+from asset_manifest import AssetManifest
+from cache import CacheNamespace, create_cache_backend
+from fragment_cache import FragmentCache, templates_version
+from geo_data import StatesDistrictsDataset
+from uploads import UploadRequest
+from upload_store import UploadStore, add_references, blob_key
+from image_variants import ImageVariants
+from upload_serving import OFFLOAD_MODES
+from mail_queue import MailQueue, MySQLOutbox, MemoryOutbox, SMTPSender
+from exports import ExportCursor, ExportError, ExportJobs, EXPORT_FORMATS, EXPORTS, parse_export_filters, write_export
+from lawyer_import import ImportFileError, import_lawyers, parse_import_file
+from activity_log import backfill_activity, fetch_activity, record_activities, record_activity
+from stats_counters import Reconciler, INITIALIZED_COUNTER, read_counters, reconcile_counters, record_change, summarize
+from validators import validate_email, validate_phone, sanitize_phone, normalize_indian_phone
+from lawyer_search import build_lawyer_search_query, build_suggestion_query, effective_sort, encode_cursor, KEYSET_SORTS, PROFILE_TEXT_COLUMNS
+from config import DB_CONFIG, DB_POOL_CONFIG, CACHE_CONFIG, COMPRESSION_CONFIG, STATS_CONFIG, EXPORT_CONFIG, IMPORT_CONFIG, SECRET_KEY, EMAIL_CONFIG, MAIL_QUEUE_CONFIG, IMAGE_CONFIG, UPLOAD_SERVING_CONFIG, UPLOAD_FOLDER, UPLOAD_STORE_FOLDER, ALLOWED_EXTENSIONS
 
 load_dotenv()
 
@@ -20,10 +38,32 @@ applications_storage = []
 application_counter = 0
 
 app = Flask(__name__)
+# orjson-backed jsonify with Decimal/datetime support (json_provider.py)
+app.json = FastJSONProvider(app)
+# Multipart bodies of views with @upload_limits are streamed to disk (uploads.py)
+app.request_class = UploadRequest
 app.secret_key = SECRET_KEY
 app.config['WTF_CSRF_ENABLED'] = False
+app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 csrf = CSRFProtect(app)
+# Registered first so it runs after every other after_request hook
+compression = Compression(
+    app if COMPRESSION_CONFIG['enabled'] else None,
+    COMPRESSION_CONFIG['min_size'], COMPRESSION_CONFIG['gzip_level'], COMPRESSION_CONFIG['brotli_quality']
+)
+# Fingerprinted /static URLs (asset_manifest.py); wraps the static view set up above
+assets = AssetManifest(app, auto_reload=os.getenv('FLASK_DEBUG', '').lower() in ('1', 'true'))
+# Precached by the service worker alongside '/' and the CDN files
+PRECACHE_ASSETS = [
+    'style.css', 'main.js', 'components.js', 'lawyers.js', 'filter-utils.js',
+    'js/state-district.js', 'data/indian_states_districts.json',
+]
+PRECACHE_URLS = [
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+]
 DISABLE_RATE_LIMITS = os.getenv('DISABLE_RATE_LIMITS', 'true').lower() in ('1', 'true', 'yes')
 
 if DISABLE_RATE_LIMITS:
@@ -89,95 +129,164 @@ def sanitize_input(text):
     # Remove HTML tags and escape special characters
     return html.escape(text.strip())
 
-def validate_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
-def validate_phone(phone):
-    """Validate Indian mobile numbers: 10 digits starting 6-9, optional +91/0 prefix"""
-    # Keep digits only for validation
-    digits = re.sub(r'\D', '', phone or '')
-    if not digits:
-        return False
-    # Strip country or trunk prefix
-    if digits.startswith('91') and len(digits) == 12:
-        digits = digits[2:]
-    elif digits.startswith('0') and len(digits) == 11:
-        digits = digits[1:]
-    # Must be 10 digits, starting 6-9
-    return len(digits) == 10 and digits[0] in '6789'
-
-def sanitize_phone(phone):
-    # Remove spaces, dashes, parentheses from phone number
-    return re.sub(r'[\s\-\(\)]', '', phone or '')
-
-def normalize_indian_phone(phone):
-    """Normalize to E.164 +91XXXXXXXXXX for valid Indian mobile numbers"""
-    digits = re.sub(r'\D', '', phone or '')
-    if digits.startswith('91') and len(digits) == 12:
-        local = digits[2:]
-    elif digits.startswith('0') and len(digits) == 11:
-        local = digits[1:]
-    elif len(digits) == 10:
-        local = digits
-    else:
-        return phone  # return original if cannot normalize
-    if len(local) == 10 and local[0] in '6789':
-        return f'+91{local}'
-    return phone
-
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+db_pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+
+class SharedConnection:
+    """Handle on the request transaction's connection given to nested helpers.
+
+    commit() and close() are deferred to the enclosing db_transaction();
+    rollback() rolls back and marks the whole transaction as failed.
+    """
+
+    def __init__(self, state):
+        self._state = state
+        self._raw = state['connection']
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        # Buffer results so helpers can interleave cursors on one connection
+        kwargs.setdefault('buffered', True)
+        return self._raw.cursor(*args, **kwargs)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._state['rollback_only'] = True
+        self._raw.rollback()
+
+    def close(self):
+        pass
+
 def get_db_connection():
-    """Create and return a database connection"""
+    """Check out a pooled database connection; close() returns it to the pool.
+
+    Inside db_transaction() the request's shared connection is returned instead.
+    """
+    if has_app_context():
+        state = g.get('_db_transaction')
+        if state:
+            return SharedConnection(state)
     try:
-        # Add a sane connection timeout
-        connection = mysql.connector.connect(**DB_CONFIG, connection_timeout=5)
-        return connection
+        return db_pool.get_connection()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
 
+@contextmanager
+def db_transaction():
+    """Run every core helper inside the block on one connection and one transaction.
+
+    Yields None when the database is unavailable. Commits on normal exit unless
+    rollback() was called; rolls back if the block raises. Nested use joins the
+    outer transaction.
+    """
+    state = g.get('_db_transaction') if has_app_context() else None
+    if state:
+        state['depth'] += 1
+        try:
+            yield SharedConnection(state)
+        finally:
+            state['depth'] -= 1
+        return
+
+    connection = get_db_connection()
+    if not connection:
+        yield None
+        return
+
+    state = {'connection': connection, 'depth': 1, 'rollback_only': False}
+    scoped = has_app_context()
+    if scoped:
+        g._db_transaction = state
+    try:
+        yield SharedConnection(state)
+        if state['rollback_only']:
+            connection.rollback()
+        else:
+            connection.commit()
+            for callback in state.get('after_commit', []):
+                callback()
+    except BaseException:
+        try:
+            connection.rollback()
+        except Error:
+            pass
+        raise
+    finally:
+        if scoped:
+            g.pop('_db_transaction', None)
+        connection.close()
+
+def after_commit(callback):
+    """Run callback once the enclosing db_transaction() commits (immediately outside one)"""
+    state = g.get('_db_transaction') if has_app_context() else None
+    if state:
+        state.setdefault('after_commit', []).append(callback)
+    else:
+        callback()
+
+def get_db_pool_stats():
+    """Return connection pool metrics (checkouts, waits, timeouts, ...)"""
+    return db_pool.stats()
+
 def send_email(to_email, subject, body):
-    """Send email notification"""
+    """Send an email synchronously (request handlers should use queue_email)"""
     try:
         if not EMAIL_CONFIG_VALID:
             logging.warning('Email config invalid or incomplete; skipping send_email')
             return False
 
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_CONFIG['email']
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        msg.attach(MIMEText(body, 'html'))
-        
-        # Use STARTTLS with timeout; for port 465, switch to SMTP_SSL
-        smtp_server = EMAIL_CONFIG['smtp_server']
-        smtp_port = EMAIL_CONFIG['smtp_port']
-        smtp_user = EMAIL_CONFIG['email']
-        smtp_pass = EMAIL_CONFIG['password']
-
-        if int(smtp_port) == 465:
-            server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=15)
-        else:
-            server = smtplib.SMTP(smtp_server, smtp_port, timeout=15)
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-
-        server.login(smtp_user, smtp_pass)
-        server.sendmail(smtp_user, [to_email], msg.as_string())
-        server.quit()
+        sender = SMTPSender(EMAIL_CONFIG)
+        try:
+            sender.send(to_email, subject, body)
+        finally:
+            sender.close()
         
         return True
     except Exception as e:
         logging.error(f"Error sending email: {type(e).__name__}: {e}")
         return False
 
+# Outbound mail goes through the email_outbox table and is delivered by worker
+# threads that reuse SMTP sessions, so responses never wait on SMTP.
+mail_queue = MailQueue(
+    MySQLOutbox(get_db_connection),
+    lambda: SMTPSender(EMAIL_CONFIG),
+    fallback=MemoryOutbox(),
+    **MAIL_QUEUE_CONFIG
+)
+
+def queue_email(to_email, subject, body):
+    """Queue an email for background delivery; inside db_transaction() it is queued atomically"""
+    if not EMAIL_CONFIG_VALID:
+        logging.warning('Email config invalid or incomplete; skipping queue_email')
+        return False
+    mail_queue.start()
+    message_id = mail_queue.enqueue(to_email, subject, body)
+    after_commit(mail_queue.notify)
+    return message_id
+
+def queue_emails(messages):
+    """queue_email() for a list of (to_email, subject, body) with a single outbox insert"""
+    if not EMAIL_CONFIG_VALID:
+        logging.warning('Email config invalid or incomplete; skipping queue_emails')
+        return 0
+    mail_queue.start()
+    queued = mail_queue.enqueue_many(messages)
+    if queued:
+        after_commit(mail_queue.notify)
+    return queued
+
+def get_mail_queue_stats():
+    return mail_queue.stats()
+
 def check_duplicate_lawyer(email, phone):
     """Check if lawyer with same email or phone already exists"""
     connection = get_db_connection()
@@ -386,6 +495,60 @@ def init_database():
         )
         """
         
+        # Outbound mail queue drained by mail_queue workers
+        create_email_outbox_table = """
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            to_email VARCHAR(255) NOT NULL,
+            subject VARCHAR(255) NOT NULL,
+            body MEDIUMTEXT NOT NULL,
+            status ENUM('pending', 'sending', 'sent', 'failed') DEFAULT 'pending',
+            attempts INT DEFAULT 0,
+            last_error VARCHAR(500),
+            claim_token CHAR(32),
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            locked_until TIMESTAMP NULL,
+            sent_at TIMESTAMP NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_email_outbox_due (status, next_attempt_at),
+            INDEX idx_email_outbox_claim (claim_token)
+        )
+        """
+        
+        # Admin dashboard counters, maintained by the write paths (see stats_counters.py)
+        create_stats_counters_table = """
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name VARCHAR(300) NOT NULL,
+            slot TINYINT UNSIGNED NOT NULL,
+            value BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, slot)
+        )
+        """
+        
+        # Admin dashboard activity feed (see activity_log.py)
+        create_activity_events_table = """
+        CREATE TABLE IF NOT EXISTS activity_events (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            type VARCHAR(30) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            action VARCHAR(50) NOT NULL,
+            entity_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_activity_events_entity (type, entity_id)
+        )
+        """
+        
+        # Reference counts of content-addressed uploads (see upload_store.py)
+        create_upload_blobs_table = """
+        CREATE TABLE IF NOT EXISTS upload_blobs (
+            blob_key VARCHAR(80) PRIMARY KEY,
+            refcount INT NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_upload_blobs_unreferenced (refcount, updated_at)
+        )
+        """
+        
         cursor.execute(create_lawyers_table)
         cursor.execute(create_users_table)
         cursor.execute(create_user_cases_table)
@@ -395,6 +558,10 @@ def init_database():
         cursor.execute(create_audit_table)
         cursor.execute(create_lawyer_messages_table)
         cursor.execute(create_verification_tokens_table)
+        cursor.execute(create_email_outbox_table)
+        cursor.execute(create_stats_counters_table)
+        cursor.execute(create_activity_events_table)
+        cursor.execute(create_upload_blobs_table)
         
         # Create indexes (skip if they already exist)
         indexes = [
@@ -402,6 +569,17 @@ def init_database():
             "CREATE INDEX idx_lawyers_rating ON lawyers(rating)",
             "CREATE INDEX idx_lawyers_status ON lawyers(status)",
             "CREATE INDEX idx_lawyers_email ON lawyers(email)",
+            # Composite indexes backing the search API's WHERE status = ... ORDER BY ...
+            "CREATE INDEX idx_lawyers_status_rating ON lawyers(status, rating, years_experience, id)",
+            "CREATE INDEX idx_lawyers_status_experience ON lawyers(status, years_experience, rating, id)",
+            "CREATE INDEX idx_lawyers_status_name ON lawyers(status, name, id)",
+            "CREATE INDEX idx_lawyers_status_created ON lawyers(status, created_at, id)",
+            "CREATE INDEX idx_lawyers_status_specialization ON lawyers(status, specialization)",
+            # Index-only COUNT/MAX for the lawyer API validators (lawyer_data_version)
+            "CREATE INDEX idx_lawyers_status_updated ON lawyers(status, updated_at)",
+            # Full-text indexes for /api/lawyers/search (q) and /api/lawyers (search)
+            "CREATE FULLTEXT INDEX ft_lawyers_profile ON lawyers(name, specialization, bio)",
+            "CREATE FULLTEXT INDEX ft_lawyers_directory ON lawyers(name, specialization, location)",
             "CREATE INDEX idx_applications_status ON lawyer_applications(status)",
             "CREATE INDEX idx_applications_email ON lawyer_applications(email)",
             "CREATE INDEX idx_contacts_status ON contact_messages(status)",
@@ -419,6 +597,7 @@ def init_database():
                 else:
                     raise
         
+        backfill_activity(connection)
         connection.commit()
         return True
         
@@ -430,11 +609,207 @@ def init_database():
             cursor.close()
             connection.close()
 
-def get_all_lawyers_from_db(status='verified'):
-    """Fetch all lawyers from database"""
+# Cached reads live in a backend shared by all workers (CACHE_BACKEND=redis) or
+# in-process memory. Each namespace is invalidated by bumping its version key,
+# so a write in one worker evicts the entries everywhere.
+cache_backend = create_cache_backend(CACHE_CONFIG)
+directory_cache = CacheNamespace(cache_backend, 'lawyer_directory', CACHE_CONFIG['directory_ttl'], CACHE_CONFIG['key_prefix'])
+profile_cache = CacheNamespace(cache_backend, 'lawyer_profiles', CACHE_CONFIG['profile_ttl'], CACHE_CONFIG['key_prefix'])
+admin_stats_cache = CacheNamespace(cache_backend, 'admin_stats', CACHE_CONFIG['stats_ttl'], CACHE_CONFIG['key_prefix'])
+# Rendered lawyer cards and profile bodies; keys carry the template and asset
+# versions, so a deploy never serves fragments rendered by older templates
+fragment_cache = FragmentCache(
+    CacheNamespace(cache_backend, 'fragments', CACHE_CONFIG['fragment_ttl'], CACHE_CONFIG['key_prefix']),
+    f"{templates_version(os.path.join(app.root_path, 'templates'))}-{assets.version}"
+)
+fragment_cache.install(app)
+
+STATES_DISTRICTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'data', 'indian_states_districts.json')
+
+# Parsed once per process and reloaded only when the file changes on disk
+states_dataset = StatesDistrictsDataset(STATES_DISTRICTS_FILE)
+try:
+    states_dataset.get()
+except Exception as e:
+    print(f"Error loading states/districts data: {e}")
+
+class DataUnavailable(Exception):
+    """Raised by cache loaders so failed reads are never cached"""
+
+def invalidate_lawyer_directory(lawyer_id=None):
+    """Evict cached directory reads (and one lawyer's profile) once the current write has committed"""
+    def evict():
+        if lawyer_id is not None:
+            profile_cache.invalidate_item(lawyer_id)
+            fragment_cache.invalidate(lawyer_id)
+        directory_cache.invalidate()
+        admin_stats_cache.invalidate()
+    after_commit(evict)
+
+def invalidate_admin_stats():
+    after_commit(admin_stats_cache.invalidate)
+
+def get_cache_stats():
+    """Hit/miss counters per cache namespace plus backend information"""
+    return {
+        'backend': cache_backend.info(),
+        'namespaces': {
+            cache.name: cache.stats()
+            for cache in (directory_cache, profile_cache, admin_stats_cache, fragment_cache.namespace)
+        }
+    }
+
+# Periodic rebuild of the dashboard counters from the base tables (0 disables)
+stats_reconciler = Reconciler(get_db_connection, STATS_CONFIG['reconcile_interval'])
+
+def get_dashboard_counters():
+    """Dashboard counters; the first call builds them from the base tables"""
+    connection = get_db_connection()
+    if not connection:
+        raise DataUnavailable()
+    try:
+        counters = read_counters(connection)
+        if INITIALIZED_COUNTER not in counters:
+            # End the read snapshot so the rebuild sees every committed row
+            connection.commit()
+            counters = reconcile_counters(connection)
+        stats_reconciler.start()
+        return summarize(counters)
+    finally:
+        connection.close()
+
+@app.cli.command('reconcile-stats')
+def reconcile_stats_command():
+    """Rebuild the admin dashboard counters from the base tables"""
+    counters = stats_reconciler.run_once()
+    if counters is None:
+        print("Stats counters could not be rebuilt (database unavailable)")
+        return
+    admin_stats_cache.invalidate()
+    print(json.dumps(summarize(counters), indent=2))
+
+upload_store = UploadStore(UPLOAD_STORE_FOLDER)
+if UPLOAD_SERVING_CONFIG['offload'] not in OFFLOAD_MODES:
+    logging.warning(f"Unknown UPLOAD_OFFLOAD {UPLOAD_SERVING_CONFIG['offload']!r}; uploads will be sent by Flask")
+    UPLOAD_SERVING_CONFIG['offload'] = ''
+
+@app.cli.command('gc-uploads')
+@click.option('--grace', default=3600, show_default=True, help='Keep files changed within this many seconds')
+@click.option('--dry-run', is_flag=True, help='Report what would be deleted')
+def gc_uploads_command(grace, dry_run):
+    """Delete stored uploads that no row references any more"""
     connection = get_db_connection()
     if not connection:
+        raise click.ClickException('Database connection failed')
+    try:
+        stats = upload_store.collect_garbage(connection, grace, dry_run)
+    except Error as e:
+        raise click.ClickException(f"Error collecting uploads: {e}")
+    finally:
+        connection.close()
+    print(json.dumps(stats, indent=2))
+
+@app.cli.command('compress-static')
+def compress_static_command():
+    """Write .gz/.br copies of static assets for the static view to send as-is"""
+    stats = precompress_static(app.static_folder, COMPRESSION_CONFIG['min_size'])
+    print(json.dumps(stats, indent=2))
+
+def _photo_variants_ready(key):
+    # Directory responses and rendered cards were built without this photo's <picture> sources
+    directory_cache.invalidate()
+    fragment_cache.invalidate()
+
+# Photo variants are rendered off the request path by a process pool (see image_variants.py)
+image_variants = ImageVariants(upload_store, IMAGE_CONFIG['workers'], IMAGE_CONFIG['widths'],
+                               on_ready=_photo_variants_ready)
+app.jinja_env.globals['photo_sources'] = image_variants.sources
+
+def with_photo_sources(lawyer):
+    """Copy of a lawyer dict with the srcset data of its photo (None until variants exist)"""
+    if 'photo' not in lawyer:
+        return lawyer
+    return dict(lawyer, photo_sources=image_variants.sources(lawyer['photo']))
+
+@app.cli.command('process-images')
+@click.option('--force', is_flag=True, help='Render variants again even where they exist')
+def process_images_command(force):
+    """Render resized photo variants for every lawyer photo in the upload store"""
+    if not image_variants.available:
+        raise click.ClickException('Pillow is not installed; pip install Pillow')
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection failed')
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT DISTINCT photo FROM lawyers WHERE photo LIKE '/uploads/%'")
+        keys = [blob_key(photo) for (photo,) in cursor.fetchall()]
+    except Error as e:
+        raise click.ClickException(f"Error reading lawyer photos: {e}")
+    finally:
+        cursor.close()
+        connection.close()
+    queued = 0
+    for key in keys:
+        if key and (force or not image_variants.sources(key)):
+            queued += image_variants.submit(key)
+    image_variants.wait()
+    print(f"Rendered variants for {queued} photo(s)")
+
+# Exports that should not hold a request thread run here (see exports.py)
+export_jobs = ExportJobs(EXPORT_CONFIG['folder'], get_db_connection, EXPORT_CONFIG['workers'], EXPORT_CONFIG['batch_size'])
+
+@app.cli.command('export')
+@click.argument('dataset', type=click.Choice(sorted(EXPORTS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv')
+@click.option('--from', 'date_from', help='First day to include (YYYY-MM-DD)')
+@click.option('--to', 'date_to', help='Last day to include (YYYY-MM-DD)')
+@click.option('--status', help='Only rows with this status')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), help='Output file (default: stdout)')
+def export_command(dataset, fmt, date_from, date_to, status, output):
+    """Export a dataset as CSV, Parquet or Arrow"""
+    try:
+        filters = parse_export_filters({'from': date_from, 'to': date_to, 'status': status})
+    except ExportError as e:
+        raise click.UsageError(str(e))
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection failed')
+    export = ExportCursor(connection, dataset, filters, EXPORT_CONFIG['batch_size'])
+    try:
+        if output:
+            with open(output, 'wb') as f:
+                rows = write_export(export, fmt, f)
+        else:
+            rows = write_export(export, fmt, click.get_binary_stream('stdout'))
+    except ExportError as e:
+        raise click.ClickException(str(e))
+    finally:
+        export.close()
+    click.echo(f"Exported {rows} {dataset} rows", err=True)
+
+def get_recent_activity(limit=20, before=None, since=None):
+    """Page of the admin activity feed as (events, has_more)"""
+    connection = get_db_connection()
+    if not connection:
+        raise DataUnavailable()
+    try:
+        return fetch_activity(connection, limit, before, since)
+    finally:
+        connection.close()
+
+def get_all_lawyers_from_db(status='verified'):
+    """Fetch all lawyers from database (cached until the next directory write)"""
+    try:
+        lawyers = directory_cache.get_or_load(('all', status), lambda: _fetch_all_lawyers(status))
+    except DataUnavailable:
         return []
+    return list(lawyers)
+
+def _fetch_all_lawyers(status):
+    connection = get_db_connection()
+    if not connection:
+        raise DataUnavailable()
     
     try:
         cursor = connection.cursor(dictionary=True)
@@ -453,6 +828,134 @@ def get_all_lawyers_from_db(status='verified'):
         
     except Error as e:
         print(f"Error fetching lawyers: {e}")
+        raise DataUnavailable() from e
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+def lawyer_data_version(status='verified'):
+    """Validator for lawyer API responses; None if the database or cache is unavailable.
+
+    The directory cache version changes on every committed lawyer write (and
+    when photo variants become available), including several writes within one
+    second. With CACHE_BACKEND=redis the version is shared, so every worker
+    sees a write at once. With the per-process memory backend a write made by
+    another process does not bump this process's version; it shows up only
+    through the row count and latest updated_at, which are themselves cached
+    for DIRECTORY_CACHE_TTL, so validators can be stale for up to that long.
+    """
+    version = directory_cache.version()
+    if version is None:
+        return None
+    try:
+        data_version = directory_cache.get_or_load(('data_version', status), lambda: _fetch_lawyer_data_version(status))
+    except DataUnavailable:
+        return None
+    return f"{version}-{data_version}"
+
+def _fetch_lawyer_data_version(status):
+    connection = get_db_connection()
+    if not connection:
+        raise DataUnavailable()
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*), MAX(updated_at) FROM lawyers WHERE status = %s", (status,))
+        count, last_updated = cursor.fetchone()
+        return f"{count}-{last_updated.isoformat() if last_updated else 0}"
+    except Error as e:
+        print(f"Error reading lawyer data version: {e}")
+        raise DataUnavailable() from e
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+def search_lawyers_in_db(filters, status='verified', text_columns=PROFILE_TEXT_COLUMNS, fields=None):
+    """Fetch one page of lawyers matching search filters.
+
+    Returns (lawyers, total, next_cursor); total is None for keyset (cursor) pages
+    and next_cursor is None on the last page. Pages are cached like the full listing.
+    """
+    key = ('search', status, text_columns, tuple(fields or ()),
+           json.dumps(filters, sort_keys=True, default=str))
+    try:
+        lawyers, total, next_cursor = directory_cache.get_or_load(
+            key, lambda: _run_lawyer_search(filters, status, text_columns, fields))
+    except DataUnavailable:
+        return [], 0, None
+    return list(lawyers), total, next_cursor
+
+def _run_lawyer_search(filters, status, text_columns, fields):
+    connection = get_db_connection()
+    if not connection:
+        raise DataUnavailable()
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        select_sql, select_params, count_sql, count_params = build_lawyer_search_query(filters, status, text_columns, fields)
+        sort_by = effective_sort(filters)
+        per_page = filters.get('per_page')
+        keyset = per_page and filters.get('cursor') is not None and sort_by in KEYSET_SORTS
+        
+        total = None
+        if count_sql:
+            cursor.execute(count_sql, count_params)
+            total = cursor.fetchone()['total']
+        
+        lawyers = []
+        if total is None or total:
+            cursor.execute(select_sql, select_params)
+            lawyers = cursor.fetchall()
+        
+        if keyset:
+            has_more = len(lawyers) > per_page
+            lawyers = lawyers[:per_page]
+        elif per_page:
+            has_more = filters['page'] * per_page < total
+        else:
+            has_more = False
+            total = len(lawyers)
+        
+        next_cursor = None
+        if has_more and lawyers and sort_by in KEYSET_SORTS:
+            next_cursor = encode_cursor(sort_by, lawyers[-1])
+        
+        for lawyer in lawyers:
+            if fields:
+                for column in list(lawyer):
+                    if column not in fields and column != 'relevance':
+                        del lawyer[column]
+            if 'keywords' in lawyer:
+                lawyer['keywords'] = json.loads(lawyer['keywords']) if lawyer['keywords'] else []
+        
+        return lawyers, total, next_cursor
+        
+    except Error as e:
+        print(f"Error searching lawyers: {e}")
+        raise DataUnavailable() from e
+    finally:
+        if connection.is_connected():
+            cursor.close()
+            connection.close()
+
+def suggest_lawyers_from_db(text, limit=8):
+    """Typeahead suggestions ranked by full-text relevance"""
+    built = build_suggestion_query(text, limit)
+    if not built:
+        return []
+    connection = get_db_connection()
+    if not connection:
+        return []
+    
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(*built)
+        return cursor.fetchall()
+        
+    except Error as e:
+        print(f"Error fetching lawyer suggestions: {e}")
         return []
     finally:
         if connection.is_connected():
@@ -460,10 +963,24 @@ def get_all_lawyers_from_db(status='verified'):
             connection.close()
 
 def get_lawyer_by_id(lawyer_id):
-    """Fetch a specific lawyer by ID"""
+    """Fetch a specific lawyer by ID (cached until the profile changes)"""
+    try:
+        lawyer_id = int(lawyer_id)
+        # Keyed by the lawyer's version: a profile read before a write commits
+        # is stored under the old version and never served after the bump
+        version = profile_cache.item_version(lawyer_id)
+        if version is None:
+            lawyer = _fetch_lawyer(lawyer_id)
+        else:
+            lawyer = profile_cache.get_or_load((lawyer_id, version), lambda: _fetch_lawyer(lawyer_id))
+    except (DataUnavailable, TypeError, ValueError):
+        return None
+    return dict(lawyer) if lawyer else None
+
+def _fetch_lawyer(lawyer_id):
     connection = get_db_connection()
     if not connection:
-        return None
+        raise DataUnavailable()
     
     try:
         cursor = connection.cursor(dictionary=True)
@@ -480,7 +997,7 @@ def get_lawyer_by_id(lawyer_id):
         
     except Error as e:
         print(f"Error fetching lawyer: {e}")
-        return None
+        raise DataUnavailable() from e
     finally:
         if connection.is_connected():
             cursor.close()
@@ -488,56 +1005,124 @@ def get_lawyer_by_id(lawyer_id):
 
 def add_lawyer_to_db(lawyer_data):
     """Add a new lawyer to the database with duplicate checking"""
-    connection = get_db_connection()
-    if not connection:
-        return False
-    
-    try:
-        cursor = connection.cursor()
-        
-        # Check for duplicates
-        if check_duplicate_lawyer(lawyer_data['email'], lawyer_data['phone']):
-            print(f"Duplicate lawyer found with email {lawyer_data['email']} or phone {lawyer_data['phone']}")
+    with db_transaction() as connection:
+        if not connection:
             return False
+        try:
+            cursor = connection.cursor()
         
-        keywords_json = json.dumps(lawyer_data['keywords'])
+            # Check for duplicates (shares this connection and transaction)
+            if check_duplicate_lawyer(lawyer_data['email'], lawyer_data['phone']):
+                print(f"Duplicate lawyer found with email {lawyer_data['email']} or phone {lawyer_data['phone']}")
+                return False
         
-        query = """
-        INSERT INTO lawyers (name, specialization, years_experience, rating, bio, qualification, biodata, case_win_rate, total_cases, won_cases, photo, phone, email, location, state, district, pincode, court_workplace, consultation_fee, case_fee_range, keywords, status)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
+            keywords_json = json.dumps(lawyer_data['keywords'])
         
-        values = (
-            lawyer_data['name'],
-            lawyer_data['specialization'],
-            lawyer_data['years_experience'],
-            lawyer_data['rating'],
-            lawyer_data['bio'],
-            lawyer_data.get('qualification', ''),
-            lawyer_data.get('biodata', ''),
-            lawyer_data.get('case_win_rate', 0.0),
-            lawyer_data.get('total_cases', 0),
-            lawyer_data.get('won_cases', 0),
-            lawyer_data['photo'],
-            lawyer_data['phone'],
-            lawyer_data['email'],
-            lawyer_data['location'],
-            lawyer_data.get('state'),
-            lawyer_data.get('district'),
-            lawyer_data.get('pincode'),
-            lawyer_data.get('court_workplace'),
-            lawyer_data.get('consultation_fee'),
-            lawyer_data.get('case_fee_range'),
-            keywords_json,
-            lawyer_data.get('status', 'verified')
-        )
+            query = """
+            INSERT INTO lawyers (name, specialization, years_experience, rating, bio, qualification, biodata, case_win_rate, total_cases, won_cases, photo, phone, email, location, state, district, pincode, court_workplace, consultation_fee, case_fee_range, keywords, status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
         
-        cursor.execute(query, values)
-        connection.commit()
-        return cursor.lastrowid
+            values = (
+                lawyer_data['name'],
+                lawyer_data['specialization'],
+                lawyer_data['years_experience'],
+                lawyer_data['rating'],
+                lawyer_data['bio'],
+                lawyer_data.get('qualification', ''),
+                lawyer_data.get('biodata', ''),
+                lawyer_data.get('case_win_rate', 0.0),
+                lawyer_data.get('total_cases', 0),
+                lawyer_data.get('won_cases', 0),
+                lawyer_data['photo'],
+                lawyer_data['phone'],
+                lawyer_data['email'],
+                lawyer_data['location'],
+                lawyer_data.get('state'),
+                lawyer_data.get('district'),
+                lawyer_data.get('pincode'),
+                lawyer_data.get('court_workplace'),
+                lawyer_data.get('consultation_fee'),
+                lawyer_data.get('case_fee_range'),
+                keywords_json,
+                lawyer_data.get('status', 'verified')
+            )
         
+            cursor.execute(query, values)
+            lawyer_id = cursor.lastrowid
+            add_references(connection, [lawyer_data['photo']])
+            record_change(connection, 'lawyer', None, {
+                'status': lawyer_data.get('status', 'verified'),
+                'specialization': lawyer_data['specialization'],
+                'total_ratings': 0
+            })
+            if lawyer_data.get('status', 'verified') == 'verified':
+                record_activity(connection, 'lawyer', lawyer_data['name'], 'registered', lawyer_id)
+            connection.commit()
+            invalidate_lawyer_directory()
+            return lawyer_id
+        
+        except Error as e:
+            print(f"Error adding lawyer: {e}")
+            # Don't let the enclosing transaction commit a half-added lawyer
+            connection.rollback()
+            return False
+        finally:
+            if connection.is_connected():
+                cursor.close()
+                connection.close()
+
+def import_lawyers_to_db(rows, dry_run=False):
+    """Bulk import in one transaction; returns the per-row report, or None if the database failed"""
+    with db_transaction() as connection:
+        if not connection:
+            return None
+        try:
+            report = import_lawyers(connection, rows, dry_run, IMPORT_CONFIG['batch_size'])
+        except Error as e:
+            print(f"Error importing lawyers: {e}")
+            connection.rollback()
+            return None
+        if report['imported']:
+            invalidate_lawyer_directory()
+        return report
+
+@app.cli.command('import-lawyers')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Validate and report without inserting')
+@click.option('--report', 'report_path', type=click.Path(dir_okay=False), help='Write the full JSON report here')
+def import_lawyers_command(path, dry_run, report_path):
+    """Import lawyers from a CSV or JSON file"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        rows = parse_import_file(data, path)
+    except ImportFileError as e:
+        raise click.ClickException(str(e))
+    report = import_lawyers_to_db(rows, dry_run=dry_run)
+    if report is None:
+        raise click.ClickException('Import failed; no lawyers were imported')
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    for error in report['errors']:
+        click.echo(f"row {error['row']} ({error['email'] or '-'}): {'; '.join(error['errors'])}", err=True)
+    verb = 'Validated' if dry_run else 'Imported'
+    click.echo(f"{verb} {report['valid'] if dry_run else report['imported']} of {report['total']} rows, "
+               f"{report['failed']} rejected")
+
+def has_pending_application(email):
+    """True if a pending application exists for this email (False if the database is unavailable)"""
+    connection = get_db_connection()
+    if not connection:
+        return False
+    
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT id FROM lawyer_applications WHERE email = %s AND status = 'pending'", (email,))
+        return cursor.fetchone() is not None
     except Error as e:
-        print(f"Error adding lawyer: {e}")
+        print(f"Error checking pending application: {e}")
         return False
     finally:
         if connection.is_connected():
@@ -586,8 +1171,13 @@ def add_lawyer_application(application_data):
         )
         
         cursor.execute(query, values)
+        application_id = cursor.lastrowid
+        add_references(connection, [application_data.get('document_path'), application_data.get('photo_path')])
+        record_change(connection, 'application', None, {'status': 'pending'})
+        record_activity(connection, 'application', application_data['name'], 'applied', application_id)
         connection.commit()
-        return cursor.lastrowid
+        invalidate_admin_stats()
+        return application_id
         
     except Error as e:
         print(f"Error adding lawyer application: {e}")
@@ -648,8 +1238,12 @@ def add_contact_message(contact_data):
             'new'
         )
         cursor.execute(query, values)
+        message_id = cursor.lastrowid
+        record_change(connection, 'message', None, {'status': 'new'})
+        record_activity(connection, 'message', contact_data['name'], 'contacted', message_id)
         connection.commit()
-        return cursor.lastrowid
+        invalidate_admin_stats()
+        return message_id
         
     except Error as e:
         print(f"Error adding contact message: {e}")
@@ -659,62 +1253,96 @@ def add_contact_message(contact_data):
             cursor.close()
             connection.close()
 
-def add_rating(lawyer_id, rating, user_ip):
-    """Add or update a rating for a lawyer"""
+# Locks the lawyer row (serializing concurrent ratings of one lawyer) and reads
+# the counter snapshot, the aggregate and this voter's previous rating at once
+RATING_SNAPSHOT_QUERY = """
+SELECT l.status, l.specialization, l.rating, l.total_ratings, l.photo, l.rating_sum, r.rating AS old_rating
+FROM lawyers l LEFT JOIN lawyer_ratings r ON r.lawyer_id = l.id AND r.user_ip = %s
+WHERE l.id = %s
+FOR UPDATE
+"""
+
+RATING_UPSERT_QUERY = """
+INSERT INTO lawyer_ratings (lawyer_id, user_ip, rating) VALUES (%s, %s, %s)
+ON DUPLICATE KEY UPDATE rating = %s
+"""
+
+# The new aggregate is computed from the locked snapshot, so it is written as-is
+RATING_AGGREGATE_QUERY = """
+UPDATE lawyers SET total_ratings = %s, rating_sum = %s, rating = %s WHERE id = %s
+"""
+
+def add_rating(lawyer_id, rating, user_ip, retries=3):
+    """Add or update a rating; returns the lawyer's new {'rating', 'total_ratings'} or False"""
+    for attempt in range(retries):
+        connection = get_db_connection()
+        if not connection:
+            return False
+        
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=True)
+            cursor.execute(RATING_SNAPSHOT_QUERY, (user_ip, lawyer_id))
+            before = cursor.fetchone()
+            if not before:
+                return False
+            old_rating = before.pop('old_rating')
+            rating_sum = (before.pop('rating_sum') or 0) + rating - (old_rating or 0)
+            total_ratings = (before['total_ratings'] or 0) + (1 if old_rating is None else 0)
+            new_rating = (Decimal(rating_sum) / total_ratings).quantize(Decimal('0.1'), ROUND_HALF_UP)
+            cursor.execute(RATING_UPSERT_QUERY, (lawyer_id, user_ip, rating, rating))
+            cursor.execute(RATING_AGGREGATE_QUERY, (total_ratings, rating_sum, new_rating, lawyer_id))
+            record_change(connection, 'lawyer', before, dict(before, rating=new_rating, total_ratings=total_ratings))
+            connection.commit()
+            invalidate_lawyer_directory(lawyer_id)
+            return {'rating': float(new_rating), 'total_ratings': total_ratings}
+            
+        except Error as e:
+            # 1213: deadlock between concurrent inserts into the unique key – retry
+            if getattr(e, 'errno', None) == 1213 and attempt < retries - 1:
+                continue
+            print(f"Error adding/updating rating: {e}")
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            connection.close()
+    return False
+
+def log_application_action(application_id, action, old_status, new_status, reason=None, processed_by="Admin", title=None):
+    """Log application processing actions (audit log plus the dashboard activity feed)"""
     connection = get_db_connection()
     if not connection:
         return False
     
     try:
         cursor = connection.cursor()
-        
-        # Check if user already rated this lawyer
-        check_query = "SELECT rating FROM lawyer_ratings WHERE lawyer_id = %s AND user_ip = %s"
-        cursor.execute(check_query, (lawyer_id, user_ip))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing rating
-            old_rating = existing[0]
-            update_query = "UPDATE lawyer_ratings SET rating = %s WHERE lawyer_id = %s AND user_ip = %s"
-            cursor.execute(update_query, (rating, lawyer_id, user_ip))
-            
-            # Update lawyer's rating statistics
-            update_lawyer_query = """
-            UPDATE lawyers 
-            SET rating_sum = rating_sum - %s + %s, 
-                rating = ROUND((rating_sum - %s + %s) / total_ratings, 2)
-            WHERE id = %s
-            """
-            cursor.execute(update_lawyer_query, (old_rating, rating, old_rating, rating, lawyer_id))
-        else:
-            # Insert new rating
-            insert_query = "INSERT INTO lawyer_ratings (lawyer_id, user_ip, rating) VALUES (%s, %s, %s)"
-            cursor.execute(insert_query, (lawyer_id, user_ip, rating))
-            
-            # Update lawyer's rating statistics
-            update_lawyer_query = """
-            UPDATE lawyers 
-            SET total_ratings = total_ratings + 1,
-                rating_sum = rating_sum + %s,
-                rating = ROUND((rating_sum + %s) / (total_ratings + 1), 2)
-            WHERE id = %s
-            """
-            cursor.execute(update_lawyer_query, (rating, rating, lawyer_id))
-        
+        query = """
+        INSERT INTO application_audit_log (application_id, action, old_status, new_status, reason, processed_by)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        cursor.execute(query, (application_id, action, old_status, new_status, reason, processed_by))
+        record_activity(connection, 'application', title or f"Application #{application_id}",
+                        new_status or action, application_id)
         connection.commit()
+        invalidate_admin_stats()
         return True
         
     except Error as e:
-        print(f"Error adding/updating rating: {e}")
+        print(f"Error logging application action: {e}")
         return False
     finally:
         if connection.is_connected():
             cursor.close()
             connection.close()
 
-def log_application_action(application_id, action, old_status, new_status, reason=None, processed_by="Admin"):
-    """Log application processing actions"""
+def log_application_actions(entries):
+    """log_application_action() for many applications with one multi-row insert.
+
+    entries are (application_id, action, old_status, new_status, reason, processed_by, title) tuples.
+    """
+    if not entries:
+        return True
     connection = get_db_connection()
     if not connection:
         return False
@@ -725,76 +1353,84 @@ def log_application_action(application_id, action, old_status, new_status, reaso
         INSERT INTO application_audit_log (application_id, action, old_status, new_status, reason, processed_by)
         VALUES (%s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (application_id, action, old_status, new_status, reason, processed_by))
+        cursor.executemany(query, [entry[:6] for entry in entries])
+        record_activities(connection, [
+            ('application', title or f"Application #{application_id}", new_status or action, application_id)
+            for application_id, action, old_status, new_status, reason, processed_by, title in entries
+        ])
         connection.commit()
+        invalidate_admin_stats()
         return True
         
     except Error as e:
-        print(f"Error logging application action: {e}")
+        print(f"Error logging application actions: {e}")
         return False
     finally:
         if connection.is_connected():
             cursor.close()
             connection.close()
 
-def create_lawyer_from_application(application):
-    """Create a lawyer profile from approved application"""
-    try:
-        # Generate keywords from specialization and other fields
-        keywords = [
-            application['specialization'].lower(),
-            'lawyer',
-            'legal',
-            'attorney'
-        ]
-        
-        # Add experience level keywords
-        if application['years_experience'] >= 10:
-            keywords.append('experienced')
-        elif application['years_experience'] >= 5:
-            keywords.append('skilled')
-        else:
-            keywords.append('qualified')
-        
-        # Create default bio if none provided
-        bio = application['bio'] or f"""Experienced {application['specialization']} attorney with {application['years_experience']} years of dedicated legal practice. 
+def lawyer_data_from_application(application):
+    """Lawyer profile fields for an approved application"""
+    # Generate keywords from specialization and other fields
+    keywords = [
+        application['specialization'].lower(),
+        'lawyer',
+        'legal',
+        'attorney'
+    ]
+    
+    # Add experience level keywords
+    if application['years_experience'] >= 10:
+        keywords.append('experienced')
+    elif application['years_experience'] >= 5:
+        keywords.append('skilled')
+    else:
+        keywords.append('qualified')
+    
+    # Create default bio if none provided
+    bio = application['bio'] or f"""Experienced {application['specialization']} attorney with {application['years_experience']} years of dedicated legal practice. 
         
 Licensed professional committed to providing exceptional legal services. Graduate with {application['degree']} qualification.
 Contact me for professional legal consultation and representation."""
-        
-        # Use uploaded photo if available, otherwise use default
-        photo_url = 'https://via.placeholder.com/300x300/3730a3/ffffff?text=Lawyer'
-        if application.get('photo_path'):
-            # Convert file path to URL for web access
-            photo_filename = os.path.basename(application['photo_path'])
-            photo_url = f"/uploads/{photo_filename}"
-        
-        lawyer_data = {
-            'name': application['name'].strip(),
-            'specialization': application['specialization'].strip(),
-            'years_experience': application['years_experience'],
-            'rating': 0.0,
-            'bio': bio,
-            'qualification': application.get('degree', ''),
-            'biodata': f"Professional lawyer with {application['years_experience']} years of experience in {application['specialization']}. Licensed professional committed to providing quality legal services.",
-            'case_win_rate': 0.0,
-            'total_cases': 0,
-            'won_cases': 0,
-            'photo': photo_url,
-            'phone': application['phone'].strip(),
-            'email': application['email'].strip().lower(),
-            'location': application.get('location', 'Not specified').strip(),
-            'state': application.get('state'),
-            'district': application.get('district'),
-            'pincode': application.get('pincode'),
-            'court_workplace': application.get('court_workplace'),
-            'consultation_fee': application.get('consultation_fee'),
-            'case_fee_range': application.get('case_fee_range'),
-            'keywords': keywords,
-            'status': 'verified'
-        }
-        
-        return add_lawyer_to_db(lawyer_data)
+    
+    # Use uploaded photo if available, otherwise use default
+    photo_url = 'https://via.placeholder.com/300x300/3730a3/ffffff?text=Lawyer'
+    if application.get('photo_path'):
+        # Store key (or legacy file name) served by /uploads/<name>
+        photo_filename = blob_key(application['photo_path']) or os.path.basename(application['photo_path'])
+        photo_url = f"/uploads/{photo_filename}"
+    
+    lawyer_data = {
+        'name': application['name'].strip(),
+        'specialization': application['specialization'].strip(),
+        'years_experience': application['years_experience'],
+        'rating': 0.0,
+        'bio': bio,
+        'qualification': application.get('degree', ''),
+        'biodata': f"Professional lawyer with {application['years_experience']} years of experience in {application['specialization']}. Licensed professional committed to providing quality legal services.",
+        'case_win_rate': 0.0,
+        'total_cases': 0,
+        'won_cases': 0,
+        'photo': photo_url,
+        'phone': application['phone'].strip(),
+        'email': application['email'].strip().lower(),
+        'location': application.get('location', 'Not specified').strip(),
+        'state': application.get('state'),
+        'district': application.get('district'),
+        'pincode': application.get('pincode'),
+        'court_workplace': application.get('court_workplace'),
+        'consultation_fee': application.get('consultation_fee'),
+        'case_fee_range': application.get('case_fee_range'),
+        'keywords': keywords,
+        'status': 'verified'
+    }
+    return lawyer_data
+
+def create_lawyer_from_application(application):
+    """Create a lawyer profile from approved application"""
+    try:
+        return add_lawyer_to_db(lawyer_data_from_application(application))
         
     except Exception as e:
         print(f"Error creating lawyer from application: {e}")
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection became free within the checkout timeout"""
+
+
+class PooledConnection:
+    """Proxy around a raw MySQL connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, raw, overflow):
+        self._pool = pool
+        self._raw = raw
+        self._overflow = overflow
+        self._closed = False
+
+    def __getattr__(self, name):
+        if self._closed:
+            raise Error(msg='Pooled connection already returned to the pool')
+        return getattr(self._raw, name)
+
+    def is_connected(self):
+        if self._closed:
+            return False
+        return self._raw.is_connected()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self._raw, self._overflow)
+
+    def discard(self):
+        """Drop the connection instead of returning it, e.g. with an unread result set pending.
+
+        Nothing is read from the server; a later checkout opens a replacement.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._discard(self._raw, abort=True)
+        self._pool._release_slot(self._overflow)
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool with overflow, health checks and metrics"""
+
+    def __init__(self, db_config, size=5, max_overflow=10, timeout=10, recycle=3600,
+                 connect_timeout=5, connect=None):
+        self.db_config = dict(db_config)
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.connect_timeout = connect_timeout
+        self._connect = connect or mysql.connector.connect
+        self._idle = deque()
+        self._in_use = 0
+        self._overflow_in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'failed_health_checks': 0,
+            'overflow_checkouts': 0,
+            'total_wait_ms': 0.0,
+        }
+
+    def _new_connection(self):
+        raw = self._connect(**self.db_config, connection_timeout=self.connect_timeout)
+        raw._pool_created_at = time.monotonic()
+        with self._cond:
+            self._stats['connections_created'] += 1
+        return raw
+
+    def _healthy(self, raw):
+        """Cheap liveness check performed on every checkout"""
+        created = getattr(raw, '_pool_created_at', 0)
+        if self.recycle and time.monotonic() - created > self.recycle:
+            return False
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, raw, abort=False):
+        try:
+            if abort and hasattr(raw, 'shutdown'):
+                # Closes the socket at once: no QUIT round trip, pending rows are never read
+                raw.shutdown()
+            else:
+                raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['connections_discarded'] += 1
+
+    def get_connection(self):
+        """Check out a connection, waiting up to `timeout` seconds when the pool is exhausted"""
+        deadline = None
+        waited_since = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw = self._idle.pop()
+                    overflow = False
+                    self._in_use += 1
+                    break
+                if self._in_use < self.size:
+                    raw = None
+                    overflow = False
+                    self._in_use += 1
+                    break
+                if self._overflow_in_use < self.max_overflow:
+                    raw = None
+                    overflow = True
+                    self._overflow_in_use += 1
+                    self._stats['overflow_checkouts'] += 1
+                    break
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + self.timeout
+                    waited_since = now
+                    self._stats['waits'] += 1
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(msg=f'Timed out after {self.timeout}s waiting for a database connection')
+                self._cond.wait(remaining)
+            self._stats['checkouts'] += 1
+            if waited_since is not None:
+                self._stats['total_wait_ms'] += (time.monotonic() - waited_since) * 1000
+
+        try:
+            if raw is not None and not self._healthy(raw):
+                with self._cond:
+                    self._stats['failed_health_checks'] += 1
+                self._discard(raw)
+                raw = None
+            if raw is None:
+                raw = self._new_connection()
+        except Exception:
+            self._release_slot(overflow)
+            raise
+        return PooledConnection(self, raw, overflow)
+
+    def _release_slot(self, overflow):
+        with self._cond:
+            if overflow:
+                self._overflow_in_use -= 1
+            else:
+                self._in_use -= 1
+            self._cond.notify()
+
+    def _release(self, raw, overflow):
+        """Reset session state and return the connection to the idle set"""
+        reusable = not overflow
+        if reusable:
+            try:
+                # COM_RESET_CONNECTION: rolls back, and drops the session variables,
+                # user variables and temporary tables the last borrower left behind
+                raw.reset_session()
+            except Exception:
+                reusable = False
+        if reusable:
+            with self._cond:
+                self._idle.append(raw)
+                self._in_use -= 1
+                self._cond.notify()
+        else:
+            self._discard(raw)
+            self._release_slot(overflow)
+
+    def close_all(self):
+        """Close idle connections (checked-out ones are closed when returned)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'idle': len(self._idle),
+                'in_use': self._in_use + self._overflow_in_use,
+                'overflow_in_use': self._overflow_in_use,
+            })
+        stats['total_wait_ms'] = round(stats['total_wait_ms'], 2)
+        return stats
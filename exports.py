@@ -0,0 +1,383 @@
+"""Bulk exports of admin datasets as CSV, Parquet or Arrow IPC, written batch by batch"""
+import csv
+import io
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from streaming import discard_connection
+
+EXPORT_BATCH_SIZE = 5000
+
+# format -> (mimetype, file extension); parquet and arrow need the optional pyarrow package
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+# Columns are (name, kind, sql expression); kind drives CSV formatting and the Arrow schema
+EXPORTS = {
+    'lawyers': {
+        'from': 'lawyers',
+        'date_column': 'created_at',
+        'status_column': 'status',
+        'order_by': 'id',
+        'columns': (
+            ('id', 'int', 'id'), ('name', 'str', 'name'), ('email', 'str', 'email'),
+            ('phone', 'str', 'phone'), ('specialization', 'str', 'specialization'),
+            ('years_experience', 'int', 'years_experience'), ('rating', 'float', 'rating'),
+            ('total_ratings', 'int', 'total_ratings'), ('location', 'str', 'location'),
+            ('state', 'str', 'state'), ('district', 'str', 'district'),
+            ('court_workplace', 'str', 'court_workplace'), ('consultation_fee', 'float', 'consultation_fee'),
+            ('status', 'str', 'status'), ('created_at', 'timestamp', 'created_at'),
+            ('updated_at', 'timestamp', 'updated_at'),
+        ),
+    },
+    # Same joins as /admin/api/user-cases
+    'user_cases': {
+        'from': 'user_cases uc LEFT JOIN users u ON uc.user_id = u.id LEFT JOIN lawyers l ON uc.lawyer_id = l.id',
+        'date_column': 'uc.created_at',
+        'status_column': 'uc.case_status',
+        'order_by': 'uc.id',
+        'columns': (
+            ('id', 'int', 'uc.id'), ('case_title', 'str', 'uc.case_title'), ('case_type', 'str', 'uc.case_type'),
+            ('case_description', 'str', 'uc.case_description'), ('case_status', 'str', 'uc.case_status'),
+            ('priority', 'str', 'uc.priority'), ('budget_range', 'str', 'uc.budget_range'),
+            ('timeline', 'str', 'uc.timeline'), ('incident_date', 'date', 'uc.incident_date'),
+            ('location', 'str', 'uc.location'), ('created_at', 'timestamp', 'uc.created_at'),
+            ('updated_at', 'timestamp', 'uc.updated_at'), ('user_name', 'str', 'u.name'),
+            ('user_email', 'str', 'u.email'), ('user_phone', 'str', 'u.phone'),
+            ('lawyer_name', 'str', 'l.name'), ('lawyer_email', 'str', 'l.email'),
+            ('lawyer_specialization', 'str', 'l.specialization'),
+        ),
+    },
+    'contact_messages': {
+        'from': 'contact_messages',
+        'date_column': 'created_at',
+        'status_column': 'status',
+        'order_by': 'id',
+        'columns': (
+            ('id', 'int', 'id'), ('name', 'str', 'name'), ('email', 'str', 'email'),
+            ('phone', 'str', 'phone'), ('subject', 'str', 'subject'), ('legal_area', 'str', 'legal_area'),
+            ('urgency', 'str', 'urgency'), ('status', 'str', 'status'), ('message', 'str', 'message'),
+            ('created_at', 'timestamp', 'created_at'),
+        ),
+    },
+    'application_audit_log': {
+        'from': 'application_audit_log',
+        'date_column': 'created_at',
+        'status_column': 'new_status',
+        'order_by': 'id',
+        'columns': (
+            ('id', 'int', 'id'), ('application_id', 'int', 'application_id'), ('action', 'str', 'action'),
+            ('old_status', 'str', 'old_status'), ('new_status', 'str', 'new_status'),
+            ('reason', 'str', 'reason'), ('processed_by', 'str', 'processed_by'),
+            ('created_at', 'timestamp', 'created_at'),
+        ),
+    },
+}
+
+
+class ExportError(Exception):
+    """Invalid export request or missing optional dependency"""
+
+
+def parse_export_filters(args):
+    """Read `from`/`to` (YYYY-MM-DD, inclusive) and `status` from a mapping; raises ExportError"""
+    filters = {}
+    for key in ('from', 'to'):
+        value = (args.get(key) or '').strip()
+        if value:
+            try:
+                filters[key] = date.fromisoformat(value)
+            except ValueError:
+                raise ExportError(f"Invalid '{key}' date, expected YYYY-MM-DD")
+    status = (args.get('status') or '').strip()
+    if status:
+        filters['status'] = status
+    return filters
+
+
+def build_export_query(dataset, filters):
+    """Return (sql, params) selecting the dataset's columns in primary-key order"""
+    spec = EXPORTS.get(dataset)
+    if spec is None:
+        raise ExportError(f"Unknown export '{dataset}'")
+    conditions, params = [], []
+    if filters.get('from'):
+        conditions.append(f"{spec['date_column']} >= %s")
+        params.append(filters['from'])
+    if filters.get('to'):
+        conditions.append(f"{spec['date_column']} < %s")
+        params.append(filters['to'] + timedelta(days=1))
+    if filters.get('status'):
+        conditions.append(f"{spec['status_column']} = %s")
+        params.append(filters['status'])
+    columns = ", ".join(f"{expr} AS {name}" for name, _, expr in spec['columns'])
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {columns} FROM {spec['from']}{where} ORDER BY {spec['order_by']}", params
+
+
+class ExportCursor:
+    """Executes an export query on an unbuffered cursor and hands out row batches"""
+
+    def __init__(self, connection, dataset, filters, batch_size=EXPORT_BATCH_SIZE):
+        query, params = build_export_query(dataset, filters)
+        self.connection = connection
+        self.columns = EXPORTS[dataset]['columns']
+        self.batch_size = batch_size
+        self.rows = 0
+        self._done = False
+        self._cursor = connection.cursor(buffered=False)
+        try:
+            self._cursor.execute(query, params)
+        except Exception:
+            self.close()
+            raise
+
+    def batches(self):
+        while True:
+            rows = self._cursor.fetchmany(self.batch_size)
+            if not rows:
+                self._done = True
+                return
+            self.rows += len(rows)
+            yield rows
+
+    def close(self):
+        """Release the cursor and connection; an abandoned export's connection is dropped, not drained"""
+        if not self._done:
+            discard_connection(self.connection)
+            return
+        try:
+            self._cursor.close()
+        except Exception as e:
+            logging.warning(f"Error closing export cursor: {type(e).__name__}: {e}")
+        finally:
+            self.connection.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns, batches):
+    """Header line, then one CSV text chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in columns])
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands out what has been written so far"""
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow  # optional dependency, only needed for parquet/arrow exports
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError("Parquet and Arrow exports need the 'pyarrow' package")
+    return pyarrow
+
+
+def _arrow_type(pa, kind):
+    return {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'str': pa.string(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('s'),
+    }[kind]
+
+
+def _arrow_column(kind, values):
+    if kind == 'float':
+        return [float(value) if value is not None else None for value in values]
+    if kind == 'str':
+        return [str(value) if value is not None else None for value in values]
+    return list(values)
+
+
+def columnar_chunks(fmt, columns, batches):
+    """Parquet (one row group per batch) or Arrow IPC stream bytes, yielded as they are written"""
+    pa = _load_pyarrow()
+    schema = pa.schema([(name, _arrow_type(pa, kind)) for name, kind, _ in columns])
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        writer = pa.parquet.ParquetWriter(sink, schema, compression='snappy')
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in batches:
+            arrays = [pa.array(_arrow_column(kind, (row[i] for row in rows)), type=schema.field(i).type)
+                      for i, (_, kind, _) in enumerate(columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def check_export(dataset, fmt):
+    """Raise ExportError unless `dataset` and `fmt` can be exported here"""
+    if dataset not in EXPORTS:
+        raise ExportError(f"Unknown export '{dataset}'")
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format '{fmt}'")
+    if fmt != 'csv':
+        _load_pyarrow()
+
+
+def export_chunks(export, fmt):
+    """Encoded chunks (str for CSV, bytes otherwise) for an open ExportCursor"""
+    if fmt == 'csv':
+        return csv_chunks(export.columns, export.batches())
+    if fmt in EXPORT_FORMATS:
+        _load_pyarrow()
+        return columnar_chunks(fmt, export.columns, export.batches())
+    raise ExportError(f"Unknown export format '{fmt}'")
+
+
+def write_export(export, fmt, fileobj):
+    """Write a whole export to a binary file object; returns the number of rows"""
+    for chunk in export_chunks(export, fmt):
+        fileobj.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    return export.rows
+
+
+def export_filename(dataset, fmt, filters):
+    parts = [dataset]
+    if filters.get('status'):
+        parts.append(re.sub(r'[^A-Za-z0-9_-]', '', filters['status']))
+    if filters.get('from') or filters.get('to'):
+        parts.append(f"{filters.get('from', '')}_{filters.get('to', '')}")
+    return '-'.join(parts) + '.' + EXPORT_FORMATS[fmt][1]
+
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ExportJobs:
+    """Runs large exports on a thread pool, writing files plus a JSON status sidecar.
+
+    Status lives next to the file so any worker process on the host can report it.
+    """
+
+    def __init__(self, folder, connect, workers=2, batch_size=EXPORT_BATCH_SIZE):
+        self.folder = folder
+        self._connect = connect
+        self.batch_size = batch_size
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.folder, f"{job_id}.json")
+
+    def file_path(self, job):
+        return os.path.join(self.folder, f"{job['id']}.{EXPORT_FORMATS[job['format']][1]}")
+
+    def _save(self, job):
+        tmp = self._meta_path(job['id']) + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(tmp, self._meta_path(job['id']))
+
+    def get(self, job_id):
+        if not JOB_ID_PATTERN.match(job_id or ''):
+            return None
+        try:
+            with open(self._meta_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def submit(self, dataset, fmt, filters):
+        """Validate and queue an export; returns the job record"""
+        check_export(dataset, fmt)
+        os.makedirs(self.folder, exist_ok=True)
+        job = {
+            'id': uuid.uuid4().hex,
+            'dataset': dataset,
+            'format': fmt,
+            'filters': {key: str(value) for key, value in filters.items()},
+            'filename': export_filename(dataset, fmt, filters),
+            'status': 'queued',
+            'rows': None,
+            'error': None,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self._save(job)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export')
+        self._executor.submit(self._run, job, filters)
+        return job
+
+    def _run(self, job, filters):
+        job['status'] = 'running'
+        self._save(job)
+        path = self.file_path(job)
+        try:
+            connection = self._connect()
+            if not connection:
+                raise ExportError('Database connection failed')
+            export = ExportCursor(connection, job['dataset'], filters, self.batch_size)
+            try:
+                with open(path + '.part', 'wb') as f:
+                    job['rows'] = write_export(export, job['format'], f)
+            finally:
+                export.close()
+            os.replace(path + '.part', path)
+            job['status'] = 'done'
+            job['size'] = os.path.getsize(path)
+        except Exception as e:
+            logging.error(f"Export {job['id']} failed: {type(e).__name__}: {e}")
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            try:
+                os.remove(path + '.part')
+            except OSError:
+                pass
+        job['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        self._save(job)
@@ -0,0 +1,70 @@
+"""Cache of rendered template fragments (lawyer cards, profile page bodies).
+
+Templates wrap a fragment in
+
+    {% call cached_fragment('lawyer_card', lawyer) %} ... {% endcall %}
+
+and the body is only rendered on a miss. Keys combine the fragment name, the
+lawyer's id, updated_at and rating, a per-lawyer version bumped by
+invalidate() and a hash of the templates, so an edited profile, a new rating
+or a deploy all miss. Per-user values are punched through as holes: inside a
+fragment {{ hole('user_name') }} stores a marker that is filled from the
+current template context each time the fragment is served.
+"""
+import hashlib
+import os
+import re
+
+from markupsafe import Markup, escape
+from jinja2 import pass_context
+
+HOLE = re.compile(r'<!--hole:([a-z_][a-z0-9_]*)-->')
+
+
+def templates_version(folder):
+    """Hash of the template files, so fragments from older templates are never served"""
+    digest = hashlib.sha256()
+    for root, _, names in sorted(os.walk(folder)):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, folder).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+class FragmentCache:
+    """Rendered fragments stored in a CacheNamespace"""
+
+    def __init__(self, namespace, salt=''):
+        self.namespace = namespace
+        self.salt = salt
+
+    def invalidate(self, lawyer_id=None):
+        """Drop one lawyer's fragments, or every fragment when lawyer_id is None"""
+        if lawyer_id is None:
+            self.namespace.invalidate()
+        else:
+            self.namespace.invalidate_item(f"lawyer:{lawyer_id}")
+
+    def key(self, name, lawyer):
+        version = self.namespace.item_version(f"lawyer:{lawyer['id']}")
+        if version is None:
+            return None
+        return (name, self.salt, lawyer['id'], version, str(lawyer.get('updated_at')), str(lawyer.get('rating')))
+
+    def render(self, context, name, lawyer, caller):
+        key = self.key(name, lawyer) if lawyer and lawyer.get('id') is not None else None
+        html = caller() if key is None else self.namespace.get_or_load(key, lambda: str(caller()))
+        return Markup(HOLE.sub(lambda match: str(escape(context.get(match.group(1)) or '')), html))
+
+    def install(self, app):
+        """Register the cached_fragment() and hole() template globals"""
+        @pass_context
+        def cached_fragment(context, name, lawyer, caller):
+            return self.render(context, name, lawyer, caller)
+
+        def hole(name):
+            return Markup(f"<!--hole:{name}-->")
+
+        app.jinja_env.globals.update(cached_fragment=cached_fragment, hole=hole)
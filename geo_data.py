@@ -0,0 +1,96 @@
+"""Indian states → districts reference data, parsed once and served from memory"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+
+def _json_body(payload):
+    return (json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class StatesDistricts:
+    """Immutable, indexed snapshot of the dataset with pre-serialized API responses"""
+
+    def __init__(self, raw_bytes, mtime):
+        data = json.loads(raw_bytes)
+        states = data['states']
+        self.states = tuple(states)
+        self.districts_by_state = MappingProxyType({state: tuple(districts) for state, districts in states.items()})
+        self._state_lookup = MappingProxyType({state.casefold(): state for state in self.states})
+
+        # Several district names (e.g. Aurangabad, Bilaspur) exist in more than one state
+        reverse = {}
+        for state, districts in self.districts_by_state.items():
+            for district in districts:
+                reverse.setdefault(district.casefold(), []).append(state)
+        self._district_index = MappingProxyType({name: tuple(found) for name, found in reverse.items()})
+
+        self.states_body = _json_body({'success': True, 'states': list(self.states)})
+        self._district_bodies = MappingProxyType({
+            state: _json_body({'success': True, 'districts': list(districts)})
+            for state, districts in self.districts_by_state.items()
+        })
+
+        # Strong validator: changes exactly when the file content changes
+        self.etag = hashlib.sha256(raw_bytes).hexdigest()[:32]
+        self.last_modified = datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+        self.mtime = mtime
+
+    def canonical_state(self, name):
+        """Case-insensitive state lookup; returns the dataset spelling or None"""
+        return self._state_lookup.get((name or '').strip().casefold())
+
+    def districts(self, state):
+        canonical = self.canonical_state(state)
+        return self.districts_by_state[canonical] if canonical else None
+
+    def districts_body(self, state):
+        canonical = self.canonical_state(state)
+        return self._district_bodies[canonical] if canonical else None
+
+    def states_for_district(self, district):
+        """States containing a district of that name (case-insensitive)"""
+        return self._district_index.get((district or '').strip().casefold(), ())
+
+
+class StatesDistrictsDataset:
+    """Holds the current StatesDistricts snapshot and reloads it when the file's mtime changes"""
+
+    def __init__(self, path, check_interval=2.0, clock=time.monotonic):
+        self.path = path
+        self.check_interval = check_interval
+        self._clock = clock
+        self._snapshot = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+            mtime = os.fstat(f.fileno()).st_mtime
+        return StatesDistricts(raw, mtime)
+
+    def get(self):
+        """Current snapshot; at most one stat() per check_interval on the hot path"""
+        snapshot = self._snapshot
+        if snapshot is not None and self._clock() < self._next_check:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and self._clock() < self._next_check:
+                return snapshot
+            self._next_check = self._clock() + self.check_interval
+            try:
+                if snapshot is None or os.stat(self.path).st_mtime != snapshot.mtime:
+                    self._snapshot = snapshot = self._load()
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                if snapshot is None:
+                    raise
+                # Keep serving the last good snapshot while the file is being rewritten
+                logging.error(f"Error reloading {self.path}: {type(e).__name__}: {e}")
+            return snapshot
@@ -0,0 +1,173 @@
+"""Lossless removal of EXIF, XMP, IPTC and comments from uploaded JPEG/PNG/GIF images.
+
+Works on the container structure only, so pixel data is copied byte for byte
+and no imaging library is needed. A JPEG's EXIF orientation is carried over
+in a minimal EXIF block so phone photos still display upright; ICC colour
+profiles are kept. Anything after the image's end marker is dropped.
+"""
+import struct
+
+EXIF_HEADER = b'Exif\x00\x00'
+ORIENTATION_TAG = 0x0112
+
+# JPEG APPn segments that are kept (colour handling), by marker and leading bytes
+JPEG_KEEP_APP = {
+    0xE0: (b'JFIF\x00', b'JFXX\x00'),
+    0xE2: (b'ICC_PROFILE\x00',),
+    0xEE: (b'Adobe',),
+}
+JPEG_SOS, JPEG_EOI, JPEG_COM = 0xDA, 0xD9, 0xFE
+# Markers without a length field
+JPEG_STANDALONE = {0x01, *range(0xD0, 0xD8)}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_DROP_CHUNKS = {b'eXIf', b'tEXt', b'zTXt', b'iTXt', b'tIME'}
+
+# GIF application extensions that change how the image plays (loop count)
+GIF_KEEP_APPLICATIONS = (b'NETSCAPE2.0', b'ANIMEXTS1.0')
+
+
+def strip_metadata(data, kind):
+    """`data` (a 'jpeg', 'png' or 'gif' image) without its metadata.
+
+    Raises ValueError when the image structure cannot be followed.
+    """
+    try:
+        return STRIPPERS[kind](data)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"truncated {kind} image") from e
+
+
+def _exif_orientation(tiff):
+    """Orientation tag (1-8) from an EXIF block's TIFF data, or None"""
+    order = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if order is None:
+        return None
+    offset = struct.unpack(order + 'I', tiff[4:8])[0]
+    count = struct.unpack(order + 'H', tiff[offset:offset + 2])[0]
+    for index in range(count):
+        entry = tiff[offset + 2 + index * 12:offset + 14 + index * 12]
+        tag, kind = struct.unpack(order + 'HH', entry[:4])
+        if tag == ORIENTATION_TAG and kind == 3:
+            value = struct.unpack(order + 'H', entry[8:10])[0]
+            return value if 1 <= value <= 8 else None
+    return None
+
+
+def _orientation_segment(orientation):
+    """APP1 segment holding an EXIF block with only the orientation tag"""
+    tiff = b'MM\x00\x2a' + struct.pack('>IH', 8, 1) + struct.pack('>HHIHH', ORIENTATION_TAG, 3, 1, orientation, 0)
+    payload = EXIF_HEADER + tiff + struct.pack('>I', 0)
+    return b'\xff\xe1' + struct.pack('>H', len(payload) + 2) + payload
+
+
+def _strip_jpeg(data):
+    if not data.startswith(b'\xff\xd8'):
+        raise ValueError('not a JPEG image')
+    kept = []
+    orientation = None
+    pos = 2
+    while True:
+        if data[pos] != 0xFF:
+            raise ValueError('JPEG marker expected')
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        if marker == JPEG_EOI:
+            kept.append(data[pos:pos + 2])
+            break
+        if marker in JPEG_STANDALONE:
+            kept.append(data[pos:pos + 2])
+            pos += 2
+            continue
+        end = pos + 2 + struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if end > len(data):
+            raise ValueError('truncated JPEG segment')
+        body = data[pos + 4:end]
+        if marker == JPEG_SOS:
+            # Entropy-coded data runs to the next marker other than a stuffed 0xFF00 or a restart marker
+            scan_end = end
+            while True:
+                scan_end = data.index(b'\xff', scan_end)
+                following = data[scan_end + 1]
+                if following != 0x00 and following not in JPEG_STANDALONE and following != 0xFF:
+                    break
+                scan_end += 1 if following == 0xFF else 2
+            kept.append(data[pos:scan_end])
+            pos = scan_end
+            continue
+        if 0xE0 <= marker <= 0xEF or marker == JPEG_COM:
+            if marker == 0xE1 and body.startswith(EXIF_HEADER) and orientation is None:
+                orientation = _exif_orientation(body[len(EXIF_HEADER):])
+            if body.startswith(JPEG_KEEP_APP.get(marker, ())):
+                kept.append(data[pos:end])
+        else:
+            kept.append(data[pos:end])
+        pos = end
+    if orientation and orientation != 1:
+        # JFIF wants its APP0 segment straight after the start marker
+        kept.insert(1 if kept and kept[0].startswith(b'\xff\xe0') else 0, _orientation_segment(orientation))
+    return b'\xff\xd8' + b''.join(kept)
+
+
+def _strip_png(data):
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError('not a PNG image')
+    kept = [PNG_SIGNATURE]
+    pos = len(PNG_SIGNATURE)
+    while True:
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        end = pos + 12 + length
+        if end > len(data):
+            raise ValueError('truncated PNG chunk')
+        if chunk_type not in PNG_DROP_CHUNKS:
+            kept.append(data[pos:end])
+        pos = end
+        if chunk_type == b'IEND':
+            return b''.join(kept)
+
+
+def _gif_sub_blocks(data, pos):
+    """Position just after the data sub-blocks starting at `pos`"""
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def _gif_color_table(flags):
+    """Size of the colour table announced by a screen or image descriptor's flags"""
+    return 3 << ((flags & 0x07) + 1) if flags & 0x80 else 0
+
+
+def _strip_gif(data):
+    if not data.startswith((b'GIF87a', b'GIF89a')):
+        raise ValueError('not a GIF image')
+    flags = data[10]
+    pos = 13 + _gif_color_table(flags)
+    kept = [data[:pos]]
+    while True:
+        introducer = data[pos]
+        if introducer == 0x3B:
+            kept.append(b'\x3b')
+            return b''.join(kept)
+        if introducer == 0x2C:
+            flags = data[pos + 9]
+            start = pos
+            pos += 10 + _gif_color_table(flags)
+            # LZW minimum code size, then the image data sub-blocks
+            pos = _gif_sub_blocks(data, pos + 1)
+            kept.append(data[start:pos])
+        elif introducer == 0x21:
+            label = data[pos + 1]
+            end = _gif_sub_blocks(data, pos + 2)
+            application = data[pos + 3:pos + 3 + data[pos + 2]] if label == 0xFF else b''
+            if label not in (0xFE, 0xFF) or application in GIF_KEEP_APPLICATIONS:
+                kept.append(data[pos:end])
+            pos = end
+        else:
+            raise ValueError('unknown GIF block')
+
+
+STRIPPERS = {'jpeg': _strip_jpeg, 'png': _strip_png, 'gif': _strip_gif}
@@ -0,0 +1,179 @@
+"""Resized, re-encoded variants of uploaded photos, rendered on a process pool.
+
+For a stored photo <sha256>.<ext> the worker writes <sha256>-<width>.<format>
+for each width in VARIANT_WIDTHS (no wider than the original) as JPEG, WebP
+and, when Pillow can encode it, AVIF. Variants are decoded with the EXIF
+orientation applied and saved without EXIF or other metadata; the original
+itself is public too, and had its metadata removed on upload (image_metadata.py)
+apart from the orientation tag. A manifest
+(<sha256>.variants.json) written last tells the web process which variants
+exist. Needs the optional Pillow package; without it photos are served as stored.
+"""
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from upload_store import KEY_PATTERN, blob_key
+
+VARIANT_WIDTHS = (160, 320, 640)
+VARIANT_QUALITY = {'jpg': 82, 'webp': 80, 'avif': 60}
+# Browsers pick the first <source> they support, so the best encodings come first
+SOURCE_FORMATS = ('avif', 'webp')
+VARIANT_MIMETYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'jpg': 'image/jpeg'}
+SOURCE_EXTENSIONS = ('jpg', 'png', 'gif')
+
+
+def manifest_name(digest):
+    return f"{digest}.variants.json"
+
+
+def variant_name(digest, width, fmt):
+    return f"{digest}-{width}.{fmt}"
+
+
+def _save(image, path, fmt, quality):
+    tmp = path + '.tmp'
+    options = {'quality': quality}
+    if fmt == 'jpg':
+        image.save(tmp, 'JPEG', optimize=True, progressive=True, **options)
+    elif fmt == 'webp':
+        image.save(tmp, 'WEBP', method=4, **options)
+    else:
+        image.save(tmp, 'AVIF', **options)
+    os.replace(tmp, path)
+
+
+def render_variants(source_path, widths=VARIANT_WIDTHS):
+    """Write the variants and manifest next to `source_path`; runs in a worker process"""
+    from PIL import Image, ImageOps, features  # optional dependency
+
+    folder = os.path.dirname(source_path)
+    digest = KEY_PATTERN.match(os.path.basename(source_path)).group(1)
+    formats = ['jpg', 'webp'] + (['avif'] if features.check('avif') else [])
+
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        # JPEG has no alpha channel: flatten transparent PNG/GIF photos onto white
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        width, height = image.size
+
+        targets = sorted({min(target, width) for target in widths})
+        made = {fmt: [] for fmt in formats}
+        for target in targets:
+            resized = image if target == width else image.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS)
+            for fmt in formats:
+                _save(resized, os.path.join(folder, variant_name(digest, target, fmt)), fmt, VARIANT_QUALITY[fmt])
+                made[fmt].append(target)
+
+    manifest = {'width': width, 'height': height, 'variants': made}
+    tmp = os.path.join(folder, manifest_name(digest) + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(folder, manifest_name(digest)))
+    return manifest
+
+
+class ImageVariants:
+    """Schedules variant rendering and answers which variants a photo has.
+
+    `on_ready(key)` is called once a photo's variants have been written, so
+    callers can drop cached responses that were built without them.
+    """
+
+    def __init__(self, store, workers=2, widths=VARIANT_WIDTHS, url_prefix='/uploads/', on_ready=None):
+        self.store = store
+        self.workers = workers
+        self.widths = tuple(widths)
+        self.url_prefix = url_prefix
+        self.on_ready = on_ready
+        self.available = importlib.util.find_spec('PIL') is not None
+        self._executor = None
+        self._pending = set()
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key):
+        """Queue variant rendering for a stored image key; returns False when it cannot run"""
+        match = KEY_PATTERN.match(key or '')
+        if not self.available or not match or match.group(2) not in SOURCE_EXTENSIONS:
+            return False
+        path = self.store.path_for(key)
+        with self._lock:
+            if key in self._pending:
+                return True
+            if self._executor is None:
+                # spawn: forking a threaded web process can deadlock the children
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            self._pending.add(key)
+        future = self._executor.submit(render_variants, path, self.widths)
+        future.add_done_callback(lambda done: self._finished(key, done))
+        return True
+
+    def wait(self):
+        """Block until every queued rendering has finished, then stop the pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._pending.discard(key)
+        error = future.exception()
+        if error:
+            logging.error(f"Error rendering image variants for {key}: {type(error).__name__}: {error}")
+        elif self.on_ready:
+            self.on_ready(key)
+
+    def _manifest(self, key):
+        manifest = self._manifests.get(key)
+        if manifest is not None:
+            return manifest
+        digest = KEY_PATTERN.match(key).group(1)
+        path = os.path.join(os.path.dirname(self.store.path_for(key)), manifest_name(digest))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Variants never change once written, so a found manifest can be kept
+        with self._lock:
+            self._manifests[key] = manifest
+        return manifest
+
+    def sources(self, photo):
+        """srcset-ready URLs for a photo URL, or None while it has no variants.
+
+        {'src', 'width', 'height', 'srcset': {format: "url 160w, ..."}, 'sources': [...]}
+        """
+        key = blob_key(photo)
+        manifest = self._manifest(key) if key else None
+        if not manifest:
+            return None
+        digest = KEY_PATTERN.match(key).group(1)
+        srcset = {
+            fmt: ', '.join(f"{self.url_prefix}{variant_name(digest, width, fmt)} {width}w" for width in widths)
+            for fmt, widths in manifest['variants'].items() if widths
+        }
+        jpg_widths = manifest['variants'].get('jpg') or [manifest['width']]
+        return {
+            'src': f"{self.url_prefix}{variant_name(digest, jpg_widths[0], 'jpg')}",
+            'width': manifest['width'],
+            'height': manifest['height'],
+            'srcset': srcset,
+            # <source> elements for a <picture>, best format first
+            'sources': [{'type': VARIANT_MIMETYPES[fmt], 'srcset': srcset[fmt]}
+                        for fmt in SOURCE_FORMATS if fmt in srcset],
+        }
@@ -0,0 +1,65 @@
+"""Flask JSON provider backed by orjson, with native Decimal and datetime output.
+
+Lawyer rows come from MySQL with DECIMAL (rating, fees, win rate) and
+TIMESTAMP/DATE columns. This provider writes Decimal as a JSON number and
+datetime/date as ISO 8601 whether or not orjson is installed. Naive datetimes
+are UTC, as in Flask's HTTP-date output, and are written with an explicit
++00:00 so `new Date(value)` in the browser does not read them as local time.
+With orjson the encoding itself runs in C, several times faster than the
+stdlib encoder on large lawyer lists; without it Flask's encoder is used.
+"""
+import decimal
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider, _default as flask_default
+
+try:
+    import orjson  # optional dependency
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    """Types neither encoder handles natively"""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.isoformat() + '+00:00'
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return flask_default(value)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson encoding/decoding when it is available"""
+
+    default = staticmethod(_default)
+
+    def _orjson_options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # Arguments orjson has no equivalent for (cls, separators, ...) go to the stdlib
+        if orjson is None or set(kwargs) - {'sort_keys'}:
+            return super().dumps(obj, **kwargs)
+        if kwargs.get('sort_keys', self.sort_keys) != self.sort_keys:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is None and self._app.debug or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._orjson_options(pretty))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
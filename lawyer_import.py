@@ -0,0 +1,254 @@
+"""Bulk lawyer import: parse a CSV/JSON file, validate every row, insert in batches.
+
+import_lawyers() works on the caller's connection and does not commit, so the
+whole import (lawyers, counters, activity events) lands in one transaction.
+"""
+import csv
+import io
+import json
+import re
+from decimal import Decimal, InvalidOperation
+
+from activity_log import record_activities
+from stats_counters import record_changes
+from upload_store import add_references
+from validators import normalize_indian_phone, validate_email, validate_phone
+
+IMPORT_BATCH_SIZE = 500
+# Values per IN (...) list when looking up existing emails/phones
+LOOKUP_CHUNK_SIZE = 1000
+DEFAULT_PHOTO = 'https://via.placeholder.com/300x300/3730a3/ffffff?text=Lawyer'
+IMPORT_STATUSES = ('verified', 'pending')
+
+REQUIRED_FIELDS = ('name', 'specialization', 'years_experience', 'bio', 'phone', 'email', 'location')
+FIELD_LIMITS = {
+    'name': 255, 'specialization': 255, 'email': 255, 'location': 255, 'photo': 500,
+    'state': 100, 'district': 100, 'court_workplace': 255, 'case_fee_range': 50,
+}
+
+# Insert order; matches add_lawyer_to_db
+LAWYER_COLUMNS = (
+    'name', 'specialization', 'years_experience', 'rating', 'bio', 'qualification', 'biodata', 'photo',
+    'phone', 'email', 'location', 'state', 'district', 'pincode', 'court_workplace', 'consultation_fee',
+    'case_fee_range', 'keywords', 'status',
+)
+INSERT_QUERY = (
+    f"INSERT INTO lawyers ({', '.join(LAWYER_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(LAWYER_COLUMNS))})"
+)
+
+
+class ImportFileError(Exception):
+    """The uploaded file could not be read as CSV or JSON"""
+
+
+def parse_import_file(data, filename=''):
+    """Rows (dicts) from CSV or JSON bytes; JSON may be a list or {"lawyers": [...]}"""
+    try:
+        text = data.decode('utf-8-sig') if isinstance(data, bytes) else data
+    except UnicodeDecodeError:
+        raise ImportFileError('File must be UTF-8 encoded')
+    if filename.lower().endswith('.json') or text.lstrip()[:1] in ('[', '{'):
+        try:
+            payload = json.loads(text)
+        except ValueError as e:
+            raise ImportFileError(f'Invalid JSON: {e}')
+        if isinstance(payload, dict):
+            payload = payload.get('lawyers')
+        if not isinstance(payload, list):
+            raise ImportFileError('JSON must be a list of lawyers or {"lawyers": [...]}')
+        return payload
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ImportFileError('CSV file has no header row')
+    reader.fieldnames = [(name or '').strip().lower() for name in reader.fieldnames]
+    return list(reader)
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _keywords(value):
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = _text(value).split(',')
+    return [_text(item).lower() for item in items if _text(item)]
+
+
+def _number(row, field, errors, cast, minimum=None, maximum=None, default=None):
+    value = _text(row.get(field))
+    if not value:
+        return default
+    try:
+        number = cast(value)
+    except (ValueError, InvalidOperation):
+        errors.append(f'{field} must be a number')
+        return default
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        errors.append(f'{field} must be between {minimum} and {maximum}' if maximum is not None
+                      else f'{field} cannot be below {minimum}')
+    return number
+
+
+def validate_row(row):
+    """Returns (lawyer_data, errors) for one input row"""
+    if not isinstance(row, dict):
+        return None, ['Row must be an object']
+    errors = []
+    for field in REQUIRED_FIELDS:
+        if not _text(row.get(field)):
+            errors.append(f'{field} is required')
+
+    email = _text(row.get('email')).lower()
+    if email and not validate_email(email):
+        errors.append('Invalid email address')
+    phone = _text(row.get('phone'))
+    if phone and not validate_phone(phone):
+        errors.append('Invalid phone number (10-digit Indian mobile expected)')
+    pincode = _text(row.get('pincode'))
+    if pincode and not re.fullmatch(r'\d{6}', pincode):
+        errors.append('pincode must be 6 digits')
+    status = _text(row.get('status')).lower() or 'verified'
+    if status not in IMPORT_STATUSES:
+        errors.append(f"status must be one of {', '.join(IMPORT_STATUSES)}")
+
+    lawyer = {
+        'name': _text(row.get('name')),
+        'specialization': _text(row.get('specialization')),
+        'years_experience': _number(row, 'years_experience', errors, int, minimum=0),
+        'rating': _number(row, 'rating', errors, float, minimum=0, maximum=5, default=0.0),
+        'bio': _text(row.get('bio')),
+        'qualification': _text(row.get('qualification')),
+        'biodata': _text(row.get('biodata')),
+        'photo': _text(row.get('photo')) or DEFAULT_PHOTO,
+        'phone': normalize_indian_phone(phone),
+        'email': email,
+        'location': _text(row.get('location')),
+        'state': _text(row.get('state')) or None,
+        'district': _text(row.get('district')) or None,
+        'pincode': pincode or None,
+        'court_workplace': _text(row.get('court_workplace')) or None,
+        'consultation_fee': _number(row, 'consultation_fee', errors, Decimal, minimum=0),
+        'case_fee_range': _text(row.get('case_fee_range')) or None,
+        'keywords': _keywords(row.get('keywords')),
+        'status': status,
+    }
+    for field, limit in FIELD_LIMITS.items():
+        if lawyer[field] and len(lawyer[field]) > limit:
+            errors.append(f'{field} is longer than {limit} characters')
+    return lawyer, errors
+
+
+def validate_rows(rows):
+    """Validate every row in one pass, also catching duplicates inside the file.
+
+    Returns (lawyers, errors): lawyers is a list of (row_number, lawyer_data),
+    errors a list of {'row', 'email', 'errors'}; row numbers start at 1.
+    """
+    lawyers, errors = [], []
+    seen_emails, seen_phones = {}, {}
+    for number, row in enumerate(rows, start=1):
+        lawyer, row_errors = validate_row(row)
+        if lawyer and not row_errors:
+            first = seen_emails.get(lawyer['email']) or seen_phones.get(lawyer['phone'])
+            if first:
+                row_errors.append(f'Duplicate of row {first} in this file')
+            else:
+                seen_emails[lawyer['email']] = number
+                seen_phones[lawyer['phone']] = number
+        if row_errors:
+            errors.append({'row': number, 'email': lawyer['email'] if lawyer else '', 'errors': row_errors})
+        else:
+            lawyers.append((number, lawyer))
+    return lawyers, errors
+
+
+def _phone_variants(phone):
+    """Spellings an existing row may use for a normalized +91 number"""
+    local = phone[3:] if phone.startswith('+91') else phone
+    return {phone, local, '91' + local, '0' + local}
+
+
+def find_existing(connection, lawyers, chunk_size=LOOKUP_CHUNK_SIZE):
+    """(emails, phones) among `lawyers` already in the lawyers table, one query per chunk"""
+    emails, phones = set(), set()
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(lawyers), chunk_size):
+            chunk = [lawyer for _, lawyer in lawyers[start:start + chunk_size]]
+            chunk_emails = [lawyer['email'] for lawyer in chunk]
+            chunk_phones = sorted({variant for lawyer in chunk for variant in _phone_variants(lawyer['phone'])})
+            cursor.execute(
+                f"SELECT email, phone FROM lawyers "
+                f"WHERE email IN ({', '.join(['%s'] * len(chunk_emails))}) "
+                f"OR phone IN ({', '.join(['%s'] * len(chunk_phones))})",
+                chunk_emails + chunk_phones
+            )
+            for email, phone in cursor.fetchall():
+                emails.add((email or '').lower())
+                phones.add(normalize_indian_phone(phone))
+    finally:
+        cursor.close()
+    return emails, phones
+
+
+def insert_lawyers(connection, lawyers, batch_size=IMPORT_BATCH_SIZE):
+    """executemany() the lawyers in batches; returns {email: new id}"""
+    ids = {}
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(lawyers), batch_size):
+            batch = lawyers[start:start + batch_size]
+            cursor.executemany(INSERT_QUERY, [
+                tuple(json.dumps(lawyer['keywords']) if column == 'keywords' else lawyer[column]
+                      for column in LAWYER_COLUMNS)
+                for lawyer in batch
+            ])
+            emails = [lawyer['email'] for lawyer in batch]
+            cursor.execute(
+                f"SELECT id, email FROM lawyers WHERE email IN ({', '.join(['%s'] * len(emails))})", emails
+            )
+            ids.update((email.lower(), lawyer_id) for lawyer_id, email in cursor.fetchall())
+        add_references(connection, [lawyer['photo'] for lawyer in lawyers])
+    finally:
+        cursor.close()
+    return ids
+
+
+def import_lawyers(connection, rows, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+    """Validate, dedupe and insert `rows`; returns the per-row report (the caller commits)"""
+    lawyers, errors = validate_rows(rows)
+    if lawyers:
+        existing_emails, existing_phones = find_existing(connection, lawyers)
+        fresh = []
+        for number, lawyer in lawyers:
+            if lawyer['email'] in existing_emails or lawyer['phone'] in existing_phones:
+                errors.append({'row': number, 'email': lawyer['email'],
+                               'errors': ['A lawyer with this email or phone already exists']})
+            else:
+                fresh.append((number, lawyer))
+        lawyers = fresh
+
+    imported = []
+    if lawyers and not dry_run:
+        ids = insert_lawyers(connection, [lawyer for _, lawyer in lawyers], batch_size)
+        record_changes(connection, 'lawyer', [(None, lawyer) for _, lawyer in lawyers])
+        record_activities(connection, [
+            ('lawyer', lawyer['name'], 'registered', ids.get(lawyer['email']))
+            for _, lawyer in lawyers if lawyer['status'] == 'verified'
+        ])
+        imported = [{'row': number, 'id': ids.get(lawyer['email']), 'email': lawyer['email']}
+                    for number, lawyer in lawyers]
+
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'total': len(rows),
+        'valid': len(lawyers),
+        'imported': len(imported),
+        'failed': len(errors),
+        'dry_run': dry_run,
+        'lawyers': imported,
+        'errors': errors,
+    }
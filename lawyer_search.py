@@ -0,0 +1,302 @@
+"""SQL query builder for the lawyer directory search API"""
+import base64
+import json
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+MAX_PER_PAGE = 100
+
+# Column sets must match the FULLTEXT indexes created in core.init_database
+PROFILE_TEXT_COLUMNS = ('name', 'specialization', 'bio')
+DIRECTORY_TEXT_COLUMNS = ('name', 'specialization', 'location')
+
+# InnoDB ignores tokens shorter than innodb_ft_min_token_size (default 3)
+MIN_FULLTEXT_TOKEN = 3
+
+# InnoDB's default full-text stopword list; required stopwords would match nothing
+FULLTEXT_STOPWORDS = frozenset("""
+a about an are as at be by com de en for from how i in is it la of on or that
+the this to was what when where who will with und www
+""".split())
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Sort orders as (column, direction) keys; every order ends on the unique id so
+# the last row of a page identifies a keyset cursor position unambiguously.
+SORT_KEYS = {
+    'rating': (('rating', 'DESC'), ('years_experience', 'DESC'), ('id', 'DESC')),
+    'experience': (('years_experience', 'DESC'), ('rating', 'DESC'), ('id', 'DESC')),
+    'name': (('name', 'ASC'), ('id', 'ASC')),
+    'recent': (('created_at', 'DESC'), ('id', 'DESC')),
+    'relevance': (('relevance', 'DESC'), ('rating', 'DESC'), ('id', 'DESC')),
+}
+
+SORT_ORDERS = {
+    sort: ', '.join(f'{column} {direction}' for column, direction in keys)
+    for sort, keys in SORT_KEYS.items()
+}
+
+# Relevance is computed per query, so it can only be paged by offset
+KEYSET_SORTS = frozenset(SORT_KEYS) - {'relevance'}
+
+CURSOR_KEY_TYPES = {
+    'rating': Decimal,
+    'years_experience': int,
+    'id': int,
+    'name': str,
+    'created_at': datetime.fromisoformat,
+}
+
+LAWYER_COLUMNS = (
+    'id', 'name', 'specialization', 'years_experience', 'rating', 'total_ratings',
+    'rating_sum', 'bio', 'qualification', 'biodata', 'case_win_rate', 'total_cases',
+    'won_cases', 'photo', 'phone', 'email', 'location', 'state', 'district', 'pincode',
+    'court_workplace', 'consultation_fee', 'case_fee_range', 'keywords', 'status',
+    'created_at', 'updated_at',
+)
+
+DEFAULT_SORT = 'rating'
+
+
+def escape_like(value):
+    """Escape LIKE wildcards so user input only matches literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _contains(value):
+    return f"%{escape_like(value)}%"
+
+
+def tokenize_search_query(text):
+    """Split free text into (fulltext_tokens, short_tokens), lowercased and de-duplicated"""
+    fulltext_tokens, short_tokens = [], []
+    seen = set()
+    for token in TOKEN_PATTERN.findall((text or '').lower()):
+        if token in seen or token in FULLTEXT_STOPWORDS:
+            continue
+        seen.add(token)
+        if len(token) >= MIN_FULLTEXT_TOKEN:
+            fulltext_tokens.append(token)
+        else:
+            short_tokens.append(token)
+    return fulltext_tokens, short_tokens
+
+
+def build_boolean_query(tokens):
+    """Every token is required and prefix-matched, so partial words work for typeahead"""
+    return ' '.join(f'+{token}*' for token in tokens)
+
+
+def build_text_match(text, text_columns=PROFILE_TEXT_COLUMNS):
+    """Return (match_sql, match_params, extra_conditions, extra_params) for a free-text query.
+
+    match_sql is None when no token is long enough for the FULLTEXT index; short
+    tokens fall back to prefix LIKE conditions on the indexed columns.
+    """
+    fulltext_tokens, short_tokens = tokenize_search_query(text)
+    match_sql, match_params = None, []
+    if fulltext_tokens:
+        match_sql = f"MATCH({', '.join(text_columns)}) AGAINST (%s IN BOOLEAN MODE)"
+        match_params = [build_boolean_query(fulltext_tokens)]
+
+    conditions, params = [], []
+    for token in short_tokens:
+        pattern = f"{escape_like(token)}%"
+        conditions.append("(" + " OR ".join(f"{column} LIKE %s" for column in text_columns) + ")")
+        params.extend([pattern] * len(text_columns))
+    return match_sql, match_params, conditions, params
+
+
+# Derived fields list views can request instead of whole TEXT columns
+COMPUTED_FIELDS = {
+    'bio_excerpt': 'LEFT(bio, 160) AS bio_excerpt',
+}
+
+
+def parse_fields(value):
+    """Parse a `fields=` projection into known lawyer columns (None means all columns)"""
+    if not value:
+        return None
+    requested = {field.strip() for field in value.split(',')}
+    fields = [column for column in LAWYER_COLUMNS + tuple(COMPUTED_FIELDS) if column in requested]
+    if not fields:
+        return None
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def _encode_cursor_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(sort_by, row):
+    """Opaque cursor pointing just after `row` in the given sort order"""
+    keys = [_encode_cursor_value(row[column]) for column, _ in SORT_KEYS[sort_by]]
+    payload = json.dumps({'s': sort_by, 'k': keys}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_by):
+    """Decode a cursor into typed key values; raises ValueError if it is malformed or for another sort"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        keys = SORT_KEYS[payload['s']]
+        values = payload['k']
+        if payload['s'] != sort_by or len(values) != len(keys):
+            raise ValueError('Cursor does not match the requested sort order')
+        return [CURSOR_KEY_TYPES[column](value) for (column, _), value in zip(keys, values)]
+    except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def build_keyset_condition(sort_by, values):
+    """Rows strictly after the cursor position: (a < x) OR (a = x AND b < y) OR ..."""
+    keys = SORT_KEYS[sort_by]
+    branches, params = [], []
+    for i, (column, direction) in enumerate(keys):
+        parts = [f"{prev} = %s" for prev, _ in keys[:i]]
+        parts.append(f"{column} {'<' if direction == 'DESC' else '>'} %s")
+        branches.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[:i + 1])
+    return "(" + " OR ".join(branches) + ")", params
+
+
+def resolve_sort(sort_by, has_relevance):
+    if sort_by not in SORT_KEYS or (sort_by == 'relevance' and not has_relevance):
+        return DEFAULT_SORT
+    return sort_by
+
+
+def effective_sort(filters):
+    """Sort order a query will actually use (relevance needs full-text tokens)"""
+    has_relevance = bool(tokenize_search_query(filters.get('query'))[0])
+    return resolve_sort(filters.get('sort_by'), has_relevance)
+
+
+def normalize_search_filters(args):
+    """Read and clamp search filters from a request.args-like mapping"""
+    page = args.get('page', 1, type=int) or 1
+    per_page = args.get('per_page', 10, type=int) or 10
+    return {
+        'query': args.get('q', '').strip().lower(),
+        'specialization': args.get('specialization', '').strip(),
+        'min_experience': args.get('min_experience', 0, type=int),
+        'max_experience': args.get('max_experience', 100, type=int),
+        'min_rating': args.get('min_rating', 0, type=float),
+        'location': args.get('location', '').strip().lower(),
+        'sort_by': args.get('sort', DEFAULT_SORT),
+        'page': max(page, 1),
+        'per_page': min(max(per_page, 1), MAX_PER_PAGE),
+        # Present (even empty) when the client pages by keyset cursor instead of page number
+        'cursor': args.get('cursor'),
+    }
+
+
+def build_where_clause(filters, status='verified', text_columns=PROFILE_TEXT_COLUMNS):
+    """Translate search filters into a parameterized WHERE clause.
+
+    Returns (where_sql, where_params, relevance_sql, relevance_params).
+    """
+    conditions = ["status = %s"]
+    params = [status]
+    relevance_sql, relevance_params = None, []
+
+    if filters.get('query'):
+        match_sql, match_params, extra_conditions, extra_params = build_text_match(filters['query'], text_columns)
+        if match_sql:
+            conditions.append(match_sql)
+            params.extend(match_params)
+            relevance_sql, relevance_params = match_sql, list(match_params)
+        conditions.extend(extra_conditions)
+        params.extend(extra_params)
+
+    if filters.get('specialization'):
+        conditions.append("specialization LIKE %s")
+        params.append(_contains(filters['specialization']))
+
+    if 'min_experience' in filters or 'max_experience' in filters:
+        conditions.append("years_experience BETWEEN %s AND %s")
+        params.extend([filters.get('min_experience', 0), filters.get('max_experience', 100)])
+
+    if filters.get('min_rating'):
+        conditions.append("rating >= %s")
+        params.append(filters['min_rating'])
+
+    if filters.get('location'):
+        conditions.append("location LIKE %s")
+        params.append(_contains(filters['location']))
+
+    return " AND ".join(conditions), params, relevance_sql, relevance_params
+
+
+def build_lawyer_search_query(filters, status='verified', text_columns=PROFILE_TEXT_COLUMNS, fields=None):
+    """Return (select_sql, select_params, count_sql, count_params) for one result page.
+
+    Without a per_page filter the whole match set is selected. With a `cursor`
+    filter (keyset paging) the page starts after the decoded `after` position,
+    one extra row is fetched to detect a next page, and count_sql is None.
+    """
+    where, params, relevance_sql, relevance_params = build_where_clause(filters, status, text_columns)
+    base_where, base_params = where, list(params)
+
+    sort_by = resolve_sort(filters.get('sort_by'), bool(relevance_sql))
+    order_by = SORT_ORDERS[sort_by]
+    keyset = filters.get('cursor') is not None and sort_by in KEYSET_SORTS
+
+    if keyset and filters.get('after'):
+        condition, condition_params = build_keyset_condition(sort_by, filters['after'])
+        where = f"{where} AND {condition}"
+        params = params + condition_params
+
+    if fields:
+        # Sort keys are always selected so the next cursor can be built
+        needed = list(fields) + [column for column, _ in SORT_KEYS[sort_by]
+                                 if column not in fields and column != 'relevance']
+        columns = ", ".join(COMPUTED_FIELDS.get(column, column) for column in needed)
+    else:
+        columns = "*"
+    select_params = []
+    if relevance_sql:
+        columns = f"{columns}, {relevance_sql} AS relevance"
+        select_params.extend(relevance_params)
+    select_params.extend(params)
+
+    select_sql = f"SELECT {columns} FROM lawyers WHERE {where} ORDER BY {order_by}"
+    per_page = filters.get('per_page')
+    if not per_page:
+        return select_sql, select_params, None, []
+
+    if keyset:
+        return f"{select_sql} LIMIT %s", select_params + [per_page + 1], None, []
+
+    offset = (filters['page'] - 1) * per_page
+    select_sql += " LIMIT %s OFFSET %s"
+    count_sql = f"SELECT COUNT(*) AS total FROM lawyers WHERE {base_where}"
+    return select_sql, select_params + [per_page, offset], count_sql, base_params
+
+
+def build_suggestion_query(text, limit=8, status='verified'):
+    """Typeahead query ranked by relevance; returns (sql, params) or None for empty input"""
+    match_sql, match_params, conditions, params = build_text_match(text, PROFILE_TEXT_COLUMNS)
+    if not match_sql and not conditions:
+        return None
+    where = ["status = %s"]
+    where_params = [status]
+    if match_sql:
+        where.append(match_sql)
+        where_params.extend(match_params)
+    where.extend(conditions)
+    where_params.extend(params)
+    relevance = match_sql or "0"
+    sql = (
+        f"SELECT id, name, specialization, location, {relevance} AS relevance FROM lawyers "
+        f"WHERE {' AND '.join(where)} ORDER BY relevance DESC, rating DESC, id DESC LIMIT %s"
+    )
+    return sql, list(match_params) + where_params + [limit]
@@ -0,0 +1,383 @@
+"""Outbound email queue: an outbox table drained by background SMTP workers"""
+import logging
+import random
+import smtplib
+import threading
+import time
+import uuid
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from mysql.connector import Error
+
+
+def build_message(from_email, to_email, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = from_email
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg
+
+
+def is_permanent_failure(error):
+    """5xx replies for the message or recipient will not succeed on retry; auth errors might after a config fix"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    return isinstance(error, smtplib.SMTPResponseException) and 500 <= error.smtp_code < 600
+
+
+class SMTPSender:
+    """Keeps one authenticated SMTP session open and reuses it across sends"""
+
+    def __init__(self, config, timeout=15, idle_timeout=60, smtp_class=None, smtp_ssl_class=None, clock=time.monotonic):
+        self.config = config
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._smtp_class = smtp_class or smtplib.SMTP
+        self._smtp_ssl_class = smtp_ssl_class or smtplib.SMTP_SSL
+        self._clock = clock
+        self._server = None
+        self._last_used = 0.0
+        self.sessions_opened = 0
+
+    def _connect(self):
+        server_name = self.config['smtp_server']
+        port = int(self.config['smtp_port'])
+        # Port 465 is implicit TLS; other ports upgrade with STARTTLS unless disabled
+        if port == 465:
+            server = self._smtp_ssl_class(server_name, port, timeout=self.timeout)
+        else:
+            server = self._smtp_class(server_name, port, timeout=self.timeout)
+            if self.config.get('use_tls', True):
+                server.ehlo()
+                server.starttls()
+            server.ehlo()
+        if self.config.get('password'):
+            server.login(self.config['email'], self.config['password'])
+        self.sessions_opened += 1
+        return server
+
+    def send(self, to_email, subject, body):
+        """Send one message; raises smtplib/socket errors"""
+        msg = build_message(self.config['email'], to_email, subject, body).as_string()
+        reused = self._server is not None
+        if not reused:
+            self._server = self._connect()
+        try:
+            self._server.sendmail(self.config['email'], [to_email], msg)
+        except OSError as e:
+            # SMTP replies are OSErrors too, but leave the session usable
+            dropped = isinstance(e, smtplib.SMTPServerDisconnected) or not isinstance(e, smtplib.SMTPException)
+            if not dropped:
+                raise
+            self.close()
+            if not reused:
+                raise
+            # A reused session may have timed out server-side; retry once on a fresh one
+            self._server = self._connect()
+            self._server.sendmail(self.config['email'], [to_email], msg)
+        self._last_used = self._clock()
+
+    def close_if_idle(self):
+        if self._server is not None and self._clock() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+class MySQLOutbox:
+    """email_outbox table; batches are claimed with one UPDATE so several processes can drain it"""
+
+    def __init__(self, connect, lease_seconds=300):
+        self._connect = connect
+        self.lease_seconds = lease_seconds
+
+    def _execute(self, query, params=(), result='lastrowid', many=False):
+        connection = self._connect()
+        if not connection:
+            return None
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params)
+            value = cursor.fetchall() if result == 'rows' else getattr(cursor, result)
+            connection.commit()
+            return value
+        except Error as e:
+            print(f"Error accessing email outbox: {e}")
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+            connection.close()
+
+    def add(self, to_email, subject, body):
+        """Insert a pending message (joins the caller's db_transaction when there is one)"""
+        return self._execute(
+            "INSERT INTO email_outbox (to_email, subject, body) VALUES (%s, %s, %s)",
+            (to_email, subject, body)
+        )
+
+    def add_many(self, messages):
+        """Insert (to_email, subject, body) messages with one executemany; returns how many were stored"""
+        return self._execute(
+            "INSERT INTO email_outbox (to_email, subject, body) VALUES (%s, %s, %s)",
+            [tuple(message) for message in messages], result='rowcount', many=True
+        )
+
+    def claim(self, limit):
+        token = uuid.uuid4().hex
+        claimed = self._execute("""
+            UPDATE email_outbox
+            SET status = 'sending', claim_token = %s, attempts = attempts + 1,
+                locked_until = NOW() + INTERVAL %s SECOND
+            WHERE (status = 'pending' AND next_attempt_at <= NOW())
+               OR (status = 'sending' AND locked_until < NOW())
+            ORDER BY id
+            LIMIT %s
+        """, (token, self.lease_seconds, limit), result='rowcount')
+        if not claimed:
+            return []
+        rows = self._execute(
+            "SELECT id, to_email, subject, body, attempts FROM email_outbox WHERE claim_token = %s ORDER BY id",
+            (token,), result='rows'
+        )
+        return rows or []
+
+    def mark_sent(self, ids):
+        if not ids:
+            return
+        placeholders = ', '.join(['%s'] * len(ids))
+        self._execute(f"""
+            UPDATE email_outbox
+            SET status = 'sent', sent_at = NOW(), claim_token = NULL, locked_until = NULL, last_error = NULL
+            WHERE id IN ({placeholders})
+        """, tuple(ids))
+
+    def mark_retry(self, message_id, delay, error):
+        self._execute("""
+            UPDATE email_outbox
+            SET status = 'pending', next_attempt_at = NOW() + INTERVAL %s SECOND,
+                claim_token = NULL, locked_until = NULL, last_error = %s
+            WHERE id = %s
+        """, (int(delay), error[:500], message_id))
+
+    def mark_failed(self, message_id, error):
+        self._execute("""
+            UPDATE email_outbox
+            SET status = 'failed', claim_token = NULL, locked_until = NULL, last_error = %s
+            WHERE id = %s
+        """, (error[:500], message_id))
+
+    def counts(self):
+        rows = self._execute("SELECT status, COUNT(*) AS total FROM email_outbox GROUP BY status", result='rows')
+        return {row['status']: row['total'] for row in rows} if rows is not None else None
+
+
+class MemoryOutbox:
+    """In-process outbox used while the database is unavailable (lost on restart)"""
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._rows = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def add(self, to_email, subject, body):
+        with self._lock:
+            message_id = self._next_id
+            self._next_id += 1
+            self._rows[message_id] = {'id': message_id, 'to_email': to_email, 'subject': subject, 'body': body,
+                                      'attempts': 0, 'status': 'pending', 'next_attempt_at': 0, 'last_error': None}
+            return message_id
+
+    def add_many(self, messages):
+        for to_email, subject, body in messages:
+            self.add(to_email, subject, body)
+        return len(messages)
+
+    def claim(self, limit):
+        now = self._clock()
+        with self._lock:
+            due = [row for row in self._rows.values()
+                   if row['status'] == 'pending' and row['next_attempt_at'] <= now][:limit]
+            for row in due:
+                row['status'] = 'sending'
+                row['attempts'] += 1
+            return [dict(row) for row in due]
+
+    def mark_sent(self, ids):
+        with self._lock:
+            for message_id in ids:
+                self._rows.pop(message_id, None)
+
+    def mark_retry(self, message_id, delay, error):
+        with self._lock:
+            row = self._rows.get(message_id)
+            if row:
+                row.update(status='pending', next_attempt_at=self._clock() + delay, last_error=error)
+
+    def mark_failed(self, message_id, error):
+        with self._lock:
+            row = self._rows.get(message_id)
+            if row:
+                row.update(status='failed', last_error=error)
+
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for row in self._rows.values():
+                counts[row['status']] = counts.get(row['status'], 0) + 1
+            return counts
+
+
+class MailQueue:
+    """Worker threads that drain an outbox in batches, retrying failures with exponential backoff.
+
+    Each worker holds its own SMTPSender, so one authenticated session serves a
+    whole batch (and later batches until it has been idle for a while).
+    """
+
+    def __init__(self, store, sender_factory, workers=2, batch_size=20, max_attempts=5,
+                 retry_base_delay=30, retry_max_delay=3600, poll_interval=5, fallback=None):
+        self.store = store
+        self.fallback = fallback
+        self.sender_factory = sender_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {'queued': 0, 'queued_in_memory': 0, 'sent': 0, 'retried': 0, 'failed': 0, 'batches': 0}
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'mail-worker-{number}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wake.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def notify(self):
+        """Wake idle workers, e.g. after a transaction with queued mail commits"""
+        self._wake.set()
+
+    def enqueue(self, to_email, subject, body):
+        """Store a message for delivery; returns its outbox id or None"""
+        message_id = self.store.add(to_email, subject, body)
+        if message_id:
+            self._count('queued')
+        elif self.fallback is not None:
+            logging.warning('Email outbox unavailable; queueing message in memory')
+            message_id = self.fallback.add(to_email, subject, body)
+            self._count('queued_in_memory')
+        return message_id
+
+    def enqueue_many(self, messages):
+        """Store several (to_email, subject, body) messages in one write; returns how many were queued"""
+        messages = list(messages)
+        if not messages:
+            return 0
+        stored = self.store.add_many(messages)
+        if stored:
+            self._count('queued', stored)
+        elif self.fallback is not None:
+            logging.warning('Email outbox unavailable; queueing messages in memory')
+            stored = self.fallback.add_many(messages)
+            self._count('queued_in_memory', stored)
+        return stored or 0
+
+    def retry_delay(self, attempts):
+        delay = min(self.retry_base_delay * 2 ** (attempts - 1), self.retry_max_delay)
+        return delay * random.uniform(0.8, 1.2)
+
+    def process_batch(self, sender):
+        """Claim and deliver one batch from each store; returns the number of messages handled"""
+        handled = 0
+        for store in (self.store, self.fallback):
+            if store is None:
+                continue
+            batch = store.claim(self.batch_size)
+            if not batch:
+                continue
+            self._count('batches')
+            sent = []
+            for message in batch:
+                try:
+                    sender.send(message['to_email'], message['subject'], message['body'])
+                    sent.append(message['id'])
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    logging.error(f"Error sending email #{message['id']} to {message['to_email']}: {error}")
+                    if is_permanent_failure(e) or message['attempts'] >= self.max_attempts:
+                        store.mark_failed(message['id'], error)
+                        self._count('failed')
+                    else:
+                        store.mark_retry(message['id'], self.retry_delay(message['attempts']), error)
+                        self._count('retried')
+            store.mark_sent(sent)
+            self._count('sent', len(sent))
+            handled += len(batch)
+        return handled
+
+    def _run(self):
+        sender = self.sender_factory()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    handled = self.process_batch(sender)
+                except Exception as e:
+                    logging.error(f"Mail worker error: {type(e).__name__}: {e}")
+                    handled = 0
+                if handled:
+                    continue
+                sender.close_if_idle()
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        finally:
+            sender.close()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['workers_running'] = sum(thread.is_alive() for thread in self._threads)
+        stats['outbox'] = self.store.counts()
+        if self.fallback is not None:
+            stats['memory_outbox'] = self.fallback.counts()
+        return stats
@@ -1,4 +1,4 @@
-from flask import render_template, request, jsonify, redirect, url_for, flash, send_from_directory
+from flask import render_template, request, jsonify, redirect, url_for, flash, send_from_directory, Response
 import os
 import json
 import uuid
@@ -6,7 +6,14 @@ from datetime import datetime
 from mysql.connector import Error
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from core import app, csrf, limiter, EMAIL_CONFIG, send_email, get_db_connection, is_admin_authenticated, get_current_lawyer_id, sanitize_input, validate_email, validate_phone, normalize_indian_phone, check_duplicate_lawyer, add_contact_message, add_lawyer_application, add_lawyer_application_fallback, get_lawyer_by_id, add_lawyer_to_db, add_rating, get_all_lawyers_from_db, get_lawyer_applications_fallback, create_lawyer_from_application, log_application_action, SEND_APPROVAL_EMAIL, SEND_REJECTION_EMAIL, UPLOAD_FOLDER
+from core import app, csrf, limiter, EMAIL_CONFIG, send_email, queue_email, queue_emails, get_db_connection, get_db_pool_stats, get_cache_stats, get_mail_queue_stats, invalidate_admin_stats, admin_stats_cache, get_dashboard_counters, get_recent_activity, export_jobs, import_lawyers_to_db, DataUnavailable, db_transaction, is_admin_authenticated, get_current_lawyer_id, sanitize_input, validate_email, validate_phone, normalize_indian_phone, check_duplicate_lawyer, add_contact_message, add_lawyer_application, add_lawyer_application_fallback, get_lawyer_by_id, add_lawyer_to_db, add_rating, get_all_lawyers_from_db, get_lawyer_applications_fallback, create_lawyer_from_application, lawyer_data_from_application, log_application_action, log_application_actions, invalidate_lawyer_directory, SEND_APPROVAL_EMAIL, SEND_REJECTION_EMAIL, UPLOAD_FOLDER
+from stats_counters import record_change, record_changes, snapshot_row
+from upload_store import release_references
+from activity_log import clamp_limit, record_activities
+from streaming import stream_query, wants_ndjson
+from config import IMPORT_CONFIG
+from lawyer_import import ImportFileError, find_existing, insert_lawyers, parse_import_file
+from exports import ExportCursor, ExportError, EXPORT_FORMATS, check_export, export_chunks, export_filename, parse_export_filters
 
 def _require_admin_api():
     if not is_admin_authenticated():
@@ -45,12 +52,8 @@ def admin_api_applications():
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM lawyer_applications WHERE status='pending'")
-    data = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return jsonify(data)
+    return stream_query(conn, "SELECT * FROM lawyer_applications WHERE status='pending'",
+                        ndjson=wants_ndjson(request))
 
 @app.route('/admin/api/users')
 def admin_api_users():
@@ -59,11 +62,8 @@ def admin_api_users():
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT id, name, email, phone, created_at FROM users ORDER BY created_at DESC")
-    users = cur.fetchall()
-    cur.close(); conn.close()
-    return jsonify(users)
+    return stream_query(conn, "SELECT id, name, email, phone, created_at FROM users ORDER BY created_at DESC",
+                        ndjson=wants_ndjson(request))
 
 @app.route('/admin/api/lawyers')
 def admin_api_lawyers():
@@ -72,11 +72,8 @@ def admin_api_lawyers():
     conn = get_db_connection()
     if not conn:
         return jsonify({'error': 'Database connection failed'}), 500
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT id, name, email, phone, specialization, years_experience, status, created_at FROM lawyers ORDER BY created_at DESC")
-    lawyers = cur.fetchall()
-    cur.close(); conn.close()
-    return jsonify(lawyers)
+    return stream_query(conn, "SELECT id, name, email, phone, specialization, years_experience, status, created_at FROM lawyers ORDER BY created_at DESC",
+                        ndjson=wants_ndjson(request))
 
 @app.route('/admin/users')
 def admin_users():
@@ -110,7 +107,6 @@ def admin_api_user_cases():
         return jsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cur = conn.cursor(dictionary=True)
         query = """
         SELECT 
             uc.id,
@@ -136,28 +132,22 @@ def admin_api_user_cases():
         LEFT JOIN lawyers l ON uc.lawyer_id = l.id
         ORDER BY uc.created_at DESC
         """
-        cur.execute(query)
-        cases = cur.fetchall()
-        
-        # Convert JSON fields
-        for case in cases:
-            if case.get('documents'):
-                try:
-                    case['documents'] = json.loads(case['documents'])
-                except:
-                    case['documents'] = []
-            else:
-                case['documents'] = []
-        
-        cur.close()
-        conn.close()
-        return jsonify(cases)
+        return stream_query(conn, query, transform=_decode_case_documents, ndjson=wants_ndjson(request))
         
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
+def _decode_case_documents(case):
+    """Convert JSON fields"""
+    if case.get('documents'):
+        try:
+            case['documents'] = json.loads(case['documents'])
+        except:
+            case['documents'] = []
+    else:
+        case['documents'] = []
+    return case
+
 @app.route('/admin/api/users-detailed')
 def admin_api_users_detailed():
     """API endpoint to get all users with their case counts"""
@@ -169,7 +159,6 @@ def admin_api_users_detailed():
         return jsonify({'error': 'Database connection failed'}), 500
     
     try:
-        cur = conn.cursor(dictionary=True)
         query = """
         SELECT 
             u.id,
@@ -186,16 +175,9 @@ def admin_api_users_detailed():
         GROUP BY u.id, u.name, u.email, u.phone, u.created_at
         ORDER BY u.created_at DESC
         """
-        cur.execute(query)
-        users = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        return jsonify(users)
+        return stream_query(conn, query, ndjson=wants_ndjson(request))
         
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
 @app.route('/api/contact-messages')
@@ -209,22 +191,13 @@ def get_contact_messages():
         return jsonify({'success': False, 'error': 'Database connection failed'}), 500
     
     try:
-        cursor = connection.cursor(dictionary=True)
         query = "SELECT * FROM contact_messages ORDER BY created_at DESC"
-        cursor.execute(query)
-        messages = cursor.fetchall()
-        
-        return jsonify({
-            'success': True,
-            'messages': messages
-        })
+        # Streamed as {"success": true, "messages": [...]}; the connection is released when it ends
+        return stream_query(connection, query, key='messages', head={'success': True},
+                            ndjson=wants_ndjson(request))
         
     except Error as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
 
 @app.route('/api/lawyer-applications')
 def get_lawyer_applications():
@@ -242,15 +215,9 @@ def get_lawyer_applications():
         })
     
     try:
-        cursor = connection.cursor(dictionary=True)
         query = "SELECT * FROM lawyer_applications ORDER BY created_at DESC"
-        cursor.execute(query)
-        applications = cursor.fetchall()
-        
-        return jsonify({
-            'success': True,
-            'applications': applications
-        })
+        return stream_query(connection, query, key='applications', head={'success': True},
+                            ndjson=wants_ndjson(request))
         
     except Error as e:
         # Fallback to in-memory storage on database error
@@ -259,10 +226,6 @@ def get_lawyer_applications():
             'success': True,
             'applications': applications
         })
-    finally:
-        if connection and connection.is_connected():
-            cursor.close()
-            connection.close()
 
 @app.route('/api/applications/<int:application_id>')
 def get_application(application_id):
@@ -295,6 +258,30 @@ def get_application(application_id):
             cursor.close()
             connection.close()
 
+def _approval_email(application):
+    """(subject, body) of the approval email"""
+    return ("LegalMatch Application Approved - Welcome!", f"""
+                <html><body>
+                    <h2>Congratulations!</h2>
+                    <p>Dear {application['name']}, your application has been <strong>approved</strong>.</p>
+                    <p>Your profile is live and visible to clients.</p>
+                    <p>Details: {application['specialization']} • {application['years_experience']} years • {application['location']}</p>
+                    <p>- LegalMatch Team</p>
+                </body></html>
+                """)
+
+def _rejection_email(application, reason):
+    """(subject, body) of the rejection email"""
+    return ("LegalMatch Application Update", f"""
+                <html><body>
+                    <h2>Application Update</h2>
+                    <p>Dear {application['name']}, your application was <strong>rejected</strong>.</p>
+                    {f'<p>Reason: {reason}</p>' if reason else ''}
+                    <p>You can reapply after addressing the reason above.</p>
+                    <p>- LegalMatch Team</p>
+                </body></html>
+                """)
+
 @app.route('/api/applications/<int:application_id>/status', methods=['PUT'])
 @csrf.exempt
 def update_application_status(application_id):
@@ -302,149 +289,279 @@ def update_application_status(application_id):
     auth_error = _require_admin_api()
     if auth_error:
         return auth_error
-    connection = get_db_connection()
-    if not connection:
-        return jsonify({'success': False, 'error': 'Database connection failed'}), 500
     
-    try:
-        data = request.get_json()
-        status = data.get('status')
-        reason = data.get('reason', '').strip()
-        processed_by = data.get('processed_by', 'Admin')
-        
-        if status not in ['approved', 'rejected']:
-            return jsonify({'success': False, 'error': 'Invalid status. Must be approved or rejected'}), 400
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get current application details
-        cursor.execute("SELECT * FROM lawyer_applications WHERE id = %s", (application_id,))
-        application = cursor.fetchone()
-        
-        if not application:
-            return jsonify({'success': False, 'error': 'Application not found'}), 404
-        
-        if application['status'] != 'pending':
-            return jsonify({'success': False, 'error': f'Application already {application["status"]}'}), 400
-        
-        old_status = application['status']
-        
-        success_message = f'Application {status} successfully!'
-        lawyer_id = None
-        
-        # If approved, create lawyer profile first then mark application approved (no rollback to pending)
-        if status == 'approved':
-            try:
-                # Check for existing lawyer with same email
-                if check_duplicate_lawyer(application['email'], application['phone']):
-                    return jsonify({
-                        'success': False, 
-                        'error': 'A lawyer with this email or phone number already exists'
-                    }), 400
-                
-                # Create lawyer profile
-                lawyer_id = create_lawyer_from_application(application)
-                
-                if lawyer_id:
-                    success_message += f' Lawyer profile created successfully (ID: {lawyer_id}).'
-                    # Mark application as approved now
-                    cursor.execute("""
-                        UPDATE lawyer_applications 
-                        SET status = 'approved', rejection_reason = NULL, processed_by = %s, processed_at = NOW(), updated_at = NOW() 
-                        WHERE id = %s
-                    """, (processed_by, application_id))
-                    connection.commit()
+    # One connection and one transaction for the whole approval: the helpers
+    # below (duplicate check, lawyer creation, audit log) join it via flask.g,
+    # so a failure part-way leaves neither a lawyer nor a status change behind.
+    with db_transaction() as connection:
+        if not connection:
+            return jsonify({'success': False, 'error': 'Database connection failed'}), 500
+        
+        cursor = None
+        try:
+            data = request.get_json()
+            status = data.get('status')
+            reason = data.get('reason', '').strip()
+            processed_by = data.get('processed_by', 'Admin')
+            
+            if status not in ['approved', 'rejected']:
+                return jsonify({'success': False, 'error': 'Invalid status. Must be approved or rejected'}), 400
+            
+            cursor = connection.cursor(dictionary=True)
+            
+            # Get current application details (locked until the transaction ends)
+            cursor.execute("SELECT * FROM lawyer_applications WHERE id = %s FOR UPDATE", (application_id,))
+            application = cursor.fetchone()
+            
+            if not application:
+                return jsonify({'success': False, 'error': 'Application not found'}), 404
+            
+            if application['status'] != 'pending':
+                return jsonify({'success': False, 'error': f'Application already {application["status"]}'}), 400
+            
+            old_status = application['status']
+            
+            success_message = f'Application {status} successfully!'
+            lawyer_id = None
+            email = None
+            
+            # If approved, create lawyer profile and mark application approved atomically
+            if status == 'approved':
+                try:
+                    # Check for existing lawyer with same email
+                    if check_duplicate_lawyer(application['email'], application['phone']):
+                        return jsonify({
+                            'success': False, 
+                            'error': 'A lawyer with this email or phone number already exists'
+                        }), 400
                     
-                    # Send approval email (optional)
-                    approval_email_body = f"""
-                    <html><body>
-                        <h2>Congratulations!</h2>
-                        <p>Dear {application['name']}, your application has been <strong>approved</strong>.</p>
-                        <p>Your profile is live and visible to clients.</p>
-                        <p>Details: {application['specialization']} • {application['years_experience']} years • {application['location']}</p>
-                        <p>- LegalMatch Team</p>
-                    </body></html>
-                    """
-                    if SEND_APPROVAL_EMAIL:
-                        send_email(
-                            application['email'], 
-                            "LegalMatch Application Approved - Welcome!",
-                            approval_email_body
-                        )
+                    # Create lawyer profile
+                    lawyer_id = create_lawyer_from_application(application)
                     
-                else:
+                    if not lawyer_id:
+                        connection.rollback()
+                        return jsonify({
+                            'success': False, 
+                            'error': 'Failed to create lawyer profile. Please try again.'
+                        }), 500
+                        
+                except Exception as e:
+                    print(f"Error during lawyer creation: {e}")
+                    connection.rollback()
                     return jsonify({
                         'success': False, 
-                        'error': 'Failed to create lawyer profile. Please try again.'
+                        'error': f'Error creating lawyer profile: {str(e)}'
                     }), 500
-                    
-            except Exception as e:
-                print(f"Error during lawyer creation: {e}")
-                return jsonify({
-                    'success': False, 
-                    'error': f'Error creating lawyer profile: {str(e)}'
-                }), 500
-        
-        # If rejected, send rejection email
-        elif status == 'rejected':
-            cursor.execute("""
-                UPDATE lawyer_applications 
-                SET status = 'rejected', rejection_reason = %s, processed_by = %s, processed_at = NOW(), updated_at = NOW() 
-                WHERE id = %s
-            """, (reason, processed_by, application_id))
-            connection.commit()
-            rejection_email_body = f"""
-            <html><body>
-                <h2>Application Update</h2>
-                <p>Dear {application['name']}, your application was <strong>rejected</strong>.</p>
-                {f'<p>Reason: {reason}</p>' if reason else ''}
-                <p>You can reapply after addressing the reason above.</p>
-                <p>- LegalMatch Team</p>
-            </body></html>
-            """
-            if SEND_REJECTION_EMAIL:
-                send_email(
-                    application['email'], 
-                    "LegalMatch Application Update",
-                    rejection_email_body
-                )
-        
-        # Log the action
-        log_application_action(
-            application_id, 
-            f'status_changed_to_{status}', 
-            old_status, 
-            status, 
-            reason, 
-            processed_by
-        )
-        
-        connection.commit()
-        
-        response_data = {
-            'success': True, 
-            'message': success_message,
-            'application_id': application_id,
-            'new_status': status
-        }
-        
-        if lawyer_id:
-            response_data['lawyer_id'] = lawyer_id
-        
-        return jsonify(response_data)
-        
-    except Error as e:
-        print(f"Database error in update_application_status: {e}")
-        if connection.is_connected():
+                
+                success_message += f' Lawyer profile created successfully (ID: {lawyer_id}).'
+                cursor.execute("""
+                    UPDATE lawyer_applications 
+                    SET status = 'approved', rejection_reason = NULL, processed_by = %s, processed_at = NOW(), updated_at = NOW() 
+                    WHERE id = %s
+                """, (processed_by, application_id))
+                
+                # Approval email (optional), queued below with the status change
+                if SEND_APPROVAL_EMAIL:
+                    email = _approval_email(application)
+            
+            # If rejected, send rejection email
+            elif status == 'rejected':
+                cursor.execute("""
+                    UPDATE lawyer_applications 
+                    SET status = 'rejected', rejection_reason = %s, processed_by = %s, processed_at = NOW(), updated_at = NOW() 
+                    WHERE id = %s
+                """, (reason, processed_by, application_id))
+                if SEND_REJECTION_EMAIL:
+                    email = _rejection_email(application, reason)
+            
+            # Log the action
+            log_application_action(
+                application_id, 
+                f'status_changed_to_{status}', 
+                old_status, 
+                status, 
+                reason, 
+                processed_by,
+                title=application['name']
+            )
+            
+            record_change(connection, 'application', application, {'status': status})
+            
+            # Queued in the same transaction, so mail only goes out if the status change commits
+            if email:
+                queue_email(application['email'], *email)
+            
+        except Error as e:
+            print(f"Database error in update_application_status: {e}")
             connection.rollback()
-        return jsonify({'success': False, 'error': f'Database error: {str(e)}'}), 500
-    except Exception as e:
-        print(f"General error in update_application_status: {e}")
-        return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
+            return jsonify({'success': False, 'error': f'Database error: {str(e)}'}), 500
+        except Exception as e:
+            print(f"General error in update_application_status: {e}")
+            connection.rollback()
+            return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
+        finally:
+            if cursor:
+                cursor.close()
+    
+    response_data = {
+        'success': True, 
+        'message': success_message,
+        'application_id': application_id,
+        'new_status': status
+    }
+    
+    if lawyer_id:
+        response_data['lawyer_id'] = lawyer_id
+    
+    return jsonify(response_data)
+
+MAX_BATCH_DECISIONS = 500
+
+def _parse_decisions(data):
+    """[(application_id, status, reason)] from {"decisions": [{id, status, reason}]} or {"ids": [...], "status", "reason"}"""
+    if not isinstance(data, dict):
+        raise ValueError('Expected a JSON object')
+    if 'decisions' in data:
+        items = data['decisions']
+    else:
+        items = [{'id': application_id, 'status': data.get('status'), 'reason': data.get('reason')}
+                 for application_id in data.get('ids') or []]
+    if not isinstance(items, list) or not items:
+        raise ValueError('No decisions given')
+    if len(items) > MAX_BATCH_DECISIONS:
+        raise ValueError(f'At most {MAX_BATCH_DECISIONS} applications per batch')
+    decisions, seen = [], set()
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError('Each decision must be an object')
+        try:
+            application_id = int(item.get('id'))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid application id: {item.get('id')!r}")
+        if item.get('status') not in ('approved', 'rejected'):
+            raise ValueError(f'Invalid status for application {application_id}. Must be approved or rejected')
+        if application_id in seen:
+            raise ValueError(f'Application {application_id} appears more than once')
+        seen.add(application_id)
+        decisions.append((application_id, item['status'], (item.get('reason') or '').strip()))
+    return decisions
+
+@app.route('/api/applications/batch-status', methods=['POST'])
+@csrf.exempt
+def batch_update_application_status():
+    """Approve/reject many applications in one transaction; returns a result per application id"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    
+    data = request.get_json(silent=True)
+    try:
+        decisions = _parse_decisions(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    processed_by = data.get('processed_by', 'Admin')
+    
+    results = {application_id: {'id': application_id, 'success': False} for application_id, _, _ in decisions}
+    with db_transaction() as connection:
+        if not connection:
+            return jsonify({'success': False, 'error': 'Database connection failed'}), 500
+        
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            ids = [application_id for application_id, _, _ in decisions]
+            cursor.execute(
+                f"SELECT * FROM lawyer_applications WHERE id IN ({', '.join(['%s'] * len(ids))}) FOR UPDATE", ids
+            )
+            applications = {row['id']: row for row in cursor.fetchall()}
+            
+            approved, rejected = [], []
+            for application_id, status, reason in decisions:
+                application = applications.get(application_id)
+                if not application:
+                    results[application_id]['error'] = 'Application not found'
+                elif application['status'] != 'pending':
+                    results[application_id]['error'] = f'Application already {application["status"]}'
+                elif status == 'approved':
+                    approved.append((application, lawyer_data_from_application(application)))
+                else:
+                    rejected.append((application, reason))
+            
+            # Set-based duplicate check against existing lawyers and within the batch
+            if approved:
+                existing_emails, existing_phones = find_existing(
+                    connection, [(None, lawyer) for _, lawyer in approved])
+                fresh, seen_emails, seen_phones = [], set(), set()
+                for application, lawyer in approved:
+                    phone = normalize_indian_phone(lawyer['phone'])
+                    if (lawyer['email'] in existing_emails or phone in existing_phones
+                            or lawyer['email'] in seen_emails or phone in seen_phones):
+                        results[application['id']]['error'] = 'A lawyer with this email or phone number already exists'
+                        continue
+                    seen_emails.add(lawyer['email'])
+                    seen_phones.add(phone)
+                    fresh.append((application, lawyer))
+                approved = fresh
+            
+            emails = []
+            if approved:
+                lawyer_ids = insert_lawyers(connection, [lawyer for _, lawyer in approved])
+                record_changes(connection, 'lawyer', [(None, lawyer) for _, lawyer in approved])
+                record_activities(connection, [('lawyer', lawyer['name'], 'registered', lawyer_ids.get(lawyer['email']))
+                                               for _, lawyer in approved])
+                approved_ids = [application['id'] for application, _ in approved]
+                cursor.execute(f"""
+                    UPDATE lawyer_applications 
+                    SET status = 'approved', rejection_reason = NULL, processed_by = %s, processed_at = NOW(), updated_at = NOW() 
+                    WHERE id IN ({', '.join(['%s'] * len(approved_ids))})
+                """, [processed_by] + approved_ids)
+                for application, lawyer in approved:
+                    results[application['id']].update(success=True, new_status='approved',
+                                                      lawyer_id=lawyer_ids.get(lawyer['email']))
+                    if SEND_APPROVAL_EMAIL:
+                        emails.append((application['email'],) + _approval_email(application))
+                invalidate_lawyer_directory()
+            
+            if rejected:
+                cursor.executemany("""
+                    UPDATE lawyer_applications 
+                    SET status = 'rejected', rejection_reason = %s, processed_by = %s, processed_at = NOW(), updated_at = NOW() 
+                    WHERE id = %s
+                """, [(reason, processed_by, application['id']) for application, reason in rejected])
+                for application, reason in rejected:
+                    results[application['id']].update(success=True, new_status='rejected')
+                    if SEND_REJECTION_EMAIL:
+                        emails.append((application['email'],) + _rejection_email(application, reason))
+            
+            decided = [(application, 'approved', None) for application, _ in approved] + \
+                      [(application, 'rejected', reason) for application, reason in rejected]
+            if not log_application_actions([
+                (application['id'], f'status_changed_to_{status}', application['status'], status,
+                 reason, processed_by, application['name'])
+                for application, status, reason in decided
+            ]):
+                raise Error('Failed to write the application audit log')
+            record_changes(connection, 'application',
+                           [(application, {'status': status}) for application, status, _ in decided])
+            
+            # Queued in the same transaction, so mail only goes out if the status changes commit
+            queue_emails(emails)
+            
+        except Error as e:
+            print(f"Database error in batch_update_application_status: {e}")
+            connection.rollback()
+            return jsonify({'success': False, 'error': f'Database error: {str(e)}'}), 500
+        finally:
+            if cursor:
+                cursor.close()
+    
+    results = list(results.values())
+    return jsonify({
+        'success': True,
+        'processed': sum(result['success'] for result in results),
+        'failed': sum(not result['success'] for result in results),
+        'results': results
+    })
 
 @app.route('/api/applications/<int:application_id>', methods=['DELETE'])
 def delete_application(application_id):
@@ -458,13 +575,17 @@ def delete_application(application_id):
     
     try:
         cursor = connection.cursor()
+        before = snapshot_row(connection, 'application', application_id)
+        if not before:
+            return jsonify({'success': False, 'error': 'Application not found'}), 404
+        
         query = "DELETE FROM lawyer_applications WHERE id = %s"
         cursor.execute(query, (application_id,))
-        
-        if cursor.rowcount == 0:
-            return jsonify({'success': False, 'error': 'Application not found'}), 404
+        record_change(connection, 'application', before, None)
+        release_references(connection, [before.get('document_path'), before.get('photo_path')])
         
         connection.commit()
+        invalidate_admin_stats()
         return jsonify({'success': True, 'message': 'Application deleted successfully'})
         
     except Error as e:
@@ -492,13 +613,16 @@ def update_message_status(message_id):
             return jsonify({'success': False, 'error': 'Invalid status'}), 400
         
         cursor = connection.cursor()
+        before = snapshot_row(connection, 'message', message_id)
+        if not before:
+            return jsonify({'success': False, 'error': 'Message not found'}), 404
+        
         query = "UPDATE contact_messages SET status = %s WHERE id = %s"
         cursor.execute(query, (status, message_id))
-        
-        if cursor.rowcount == 0:
-            return jsonify({'success': False, 'error': 'Message not found'}), 404
+        record_change(connection, 'message', before, {'status': status})
         
         connection.commit()
+        invalidate_admin_stats()
         return jsonify({'success': True, 'message': f'Message status updated to {status}'})
         
     except Error as e:
@@ -520,13 +644,16 @@ def delete_message(message_id):
     
     try:
         cursor = connection.cursor()
+        before = snapshot_row(connection, 'message', message_id)
+        if not before:
+            return jsonify({'success': False, 'error': 'Message not found'}), 404
+        
         query = "DELETE FROM contact_messages WHERE id = %s"
         cursor.execute(query, (message_id,))
-        
-        if cursor.rowcount == 0:
-            return jsonify({'success': False, 'error': 'Message not found'}), 404
+        record_change(connection, 'message', before, None)
         
         connection.commit()
+        invalidate_admin_stats()
         return jsonify({'success': True, 'message': 'Message deleted successfully'})
         
     except Error as e:
@@ -542,71 +669,176 @@ def get_admin_stats():
     auth_error = _require_admin_api()
     if auth_error:
         return auth_error
-    connection = get_db_connection()
-    if not connection:
+    
+    try:
+        stats = admin_stats_cache.get_or_load('dashboard', _load_admin_stats)
+    except DataUnavailable:
         return jsonify({'success': False, 'error': 'Database connection failed'}), 500
+    except Error as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({
+        'success': True,
+        'stats': stats
+    })
+
+def _load_admin_stats():
+    # Counters are maintained by the write paths, so this is O(1) in table size
+    stats = get_dashboard_counters()
+    stats['recent_activities'], _ = get_recent_activity(limit=10)
+    return stats
+
+@app.route('/api/admin/activity')
+def get_admin_activity():
+    """Activity feed: `before=<id>` loads older events, `since=<id>` polls for newer ones"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
     
+    limit = clamp_limit(request.args.get('limit', 20, type=int))
+    before = request.args.get('before', type=int)
+    since = request.args.get('since', type=int)
     try:
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get counts for different entities
-        stats = {}
-        
-        # Total verified lawyers
-        cursor.execute("SELECT COUNT(*) as count FROM lawyers WHERE status = 'verified'")
-        stats['verified_lawyers'] = cursor.fetchone()['count']
-        
-        # Pending applications
-        cursor.execute("SELECT COUNT(*) as count FROM lawyer_applications WHERE status = 'pending'")
-        stats['pending_applications'] = cursor.fetchone()['count']
-        
-        # New contact messages
-        cursor.execute("SELECT COUNT(*) as count FROM contact_messages WHERE status = 'new'")
-        stats['new_messages'] = cursor.fetchone()['count']
-        
-        # Total contact messages
-        cursor.execute("SELECT COUNT(*) as count FROM contact_messages")
-        stats['total_messages'] = cursor.fetchone()['count']
-        
-        # Average rating
-        cursor.execute("SELECT AVG(rating) as avg_rating FROM lawyers WHERE status = 'verified' AND total_ratings > 0")
-        result = cursor.fetchone()
-        stats['average_rating'] = round(float(result['avg_rating'] or 0), 1)
-        
-        # Lawyers by specialization
-        cursor.execute("""
-        SELECT specialization, COUNT(*) as count 
-        FROM lawyers 
-        WHERE status = 'verified' 
-        GROUP BY specialization
-        """)
-        stats['specialization_distribution'] = cursor.fetchall()
-        
-        # Recent activities (last 10)
-        cursor.execute("""
-        SELECT 'lawyer' as type, name as title, created_at, 'registered' as action
-        FROM lawyers 
-        WHERE status = 'verified'
-        UNION ALL
-        SELECT 'application' as type, name as title, created_at, 'applied' as action
-        FROM lawyer_applications
-        UNION ALL
-        SELECT 'message' as type, name as title, created_at, 'contacted' as action
-        FROM contact_messages
-        ORDER BY created_at DESC
-        LIMIT 10
-        """)
-        stats['recent_activities'] = cursor.fetchall()
-        
-        return jsonify({
-            'success': True,
-            'stats': stats
-        })
-        
+        events, has_more = get_recent_activity(limit, before, since)
+    except DataUnavailable:
+        return jsonify({'success': False, 'error': 'Database connection failed'}), 500
     except Error as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
+    
+    return jsonify({
+        'success': True,
+        'events': events,
+        'has_more': has_more,
+        'next_cursor': events[-1]['id'] if has_more else None
+    })
+
+@app.route('/api/admin/db-pool')
+def get_db_pool_metrics():
+    """Get database connection pool metrics"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    return jsonify({
+        'success': True,
+        'pool': get_db_pool_stats()
+    })
+
+@app.route('/api/admin/cache-stats')
+def get_cache_metrics():
+    """Get cache hit/miss counters per namespace"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    return jsonify({
+        'success': True,
+        'cache': get_cache_stats()
+    })
+
+@app.route('/api/admin/email-queue')
+def get_email_queue_metrics():
+    """Get outbound mail queue counters and outbox delivery status"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    return jsonify({
+        'success': True,
+        'queue': get_mail_queue_stats()
+    })
+
+@app.route('/api/admin/exports/<dataset>')
+def export_dataset(dataset):
+    """Stream an export: ?format=csv|parquet|arrow&from=YYYY-MM-DD&to=YYYY-MM-DD&status=..."""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    
+    fmt = request.args.get('format', 'csv')
+    try:
+        filters = parse_export_filters(request.args)
+        check_export(dataset, fmt)
+        connection = get_db_connection()
+        if not connection:
+            return jsonify({'success': False, 'error': 'Database connection failed'}), 500
+        export = ExportCursor(connection, dataset, filters)
+        chunks = export_chunks(export, fmt)
+    except ExportError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Error as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    response = Response(chunks, mimetype=EXPORT_FORMATS[fmt][0])
+    response.headers['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, fmt, filters)}"'
+    response.call_on_close(export.close)
+    return response
+
+@app.route('/api/admin/exports', methods=['POST'])
+def start_export_job():
+    """Run a large export in the background; poll the returned job for its file"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        job = export_jobs.submit(data.get('dataset'), data.get('format', 'csv'), parse_export_filters(data))
+    except ExportError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'job': job}), 202
+
+@app.route('/api/admin/exports/jobs/<job_id>')
+def get_export_job(job_id):
+    """Get the status of a background export"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    job = export_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Export not found'}), 404
+    return jsonify({'success': True, 'job': job})
 
+@app.route('/api/admin/exports/jobs/<job_id>/download')
+def download_export_job(job_id):
+    """Download the file of a finished background export"""
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    job = export_jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'error': 'Export not found'}), 404
+    if job['status'] != 'done':
+        return jsonify({'success': False, 'error': f"Export is {job['status']}"}), 409
+    path = export_jobs.file_path(job)
+    return send_from_directory(os.path.dirname(path), os.path.basename(path), as_attachment=True,
+                               download_name=job['filename'], mimetype=EXPORT_FORMATS[job['format']][0])
+
+@app.route('/api/admin/lawyers/import', methods=['POST'])
+def import_lawyers_endpoint():
+    """Bulk import lawyers from an uploaded CSV/JSON file (field `file`) or a JSON body.
+
+    `?dry_run=1` validates without inserting. Returns a per-row report.
+    """
+    auth_error = _require_admin_api()
+    if auth_error:
+        return auth_error
+    
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    try:
+        upload = request.files.get('file')
+        if upload:
+            data = upload.stream.read(IMPORT_CONFIG['max_bytes'] + 1)
+            if len(data) > IMPORT_CONFIG['max_bytes']:
+                raise ImportFileError(f"File is larger than {IMPORT_CONFIG['max_bytes']} bytes")
+            rows = parse_import_file(data, upload.filename or '')
+        elif request.is_json:
+            rows = parse_import_file(request.get_data(), 'upload.json')
+        else:
+            raise ImportFileError('Upload a CSV or JSON file as `file`, or send a JSON body')
+    except ImportFileError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if len(rows) > IMPORT_CONFIG['max_rows']:
+        return jsonify({'success': False, 'error': f"At most {IMPORT_CONFIG['max_rows']} rows per import"}), 400
+    
+    report = import_lawyers_to_db(rows, dry_run=dry_run)
+    if report is None:
+        return jsonify({'success': False, 'error': 'Import failed; no lawyers were imported'}), 500
+    return jsonify({'success': True, 'report': report})
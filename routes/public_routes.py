@@ -2,12 +2,18 @@ from flask import render_template, request, jsonify, redirect, url_for, flash, s
 import os
 import json
 import uuid
+import hashlib
 from datetime import datetime
 from mysql.connector import Error
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from core import app, csrf, limiter, EMAIL_CONFIG, send_email, get_db_connection, is_admin_authenticated, get_current_lawyer_id, sanitize_input, validate_email, validate_phone, sanitize_phone, normalize_indian_phone, allowed_file, add_contact_message, add_lawyer_application, add_lawyer_application_fallback, get_lawyer_by_id, add_lawyer_to_db, add_rating, get_all_lawyers_from_db, get_lawyer_applications_fallback, create_lawyer_from_application, log_application_action, SEND_APPROVAL_EMAIL, SEND_REJECTION_EMAIL, UPLOAD_FOLDER
-from config import MAX_FILE_SIZE
+from core import app, csrf, limiter, EMAIL_CONFIG, send_email, queue_email, get_db_connection, is_admin_authenticated, get_current_lawyer_id, sanitize_input, validate_email, validate_phone, sanitize_phone, normalize_indian_phone, allowed_file, add_contact_message, add_lawyer_application, add_lawyer_application_fallback, has_pending_application, get_lawyer_by_id, add_lawyer_to_db, add_rating, get_all_lawyers_from_db, search_lawyers_in_db, lawyer_data_version, suggest_lawyers_from_db, invalidate_lawyer_directory, states_dataset, assets, PRECACHE_ASSETS, PRECACHE_URLS, upload_store, image_variants, with_photo_sources, get_lawyer_applications_fallback, create_lawyer_from_application, log_application_action, SEND_APPROVAL_EMAIL, SEND_REJECTION_EMAIL, UPLOAD_FOLDER
+from config import MAX_FILE_SIZE, MAX_PHOTO_SIZE, MAX_CLIENT_DOCUMENT_SIZE, UPLOAD_SERVING_CONFIG, API_CACHE_CONFIG
+from uploads import UploadField, discard_unstored, upload_limits, DOCUMENT_KINDS, IMAGE_KINDS
+from upload_store import add_references, release_references
+from upload_serving import send_upload
+from stats_counters import record_change, snapshot_row
+from lawyer_search import normalize_search_filters, parse_fields, decode_cursor, effective_sort, DIRECTORY_TEXT_COLUMNS, MAX_PER_PAGE
 
 @app.route('/')
 def home():
@@ -83,7 +89,14 @@ def lawyer_registration():
 
 @app.route('/apply', methods=['POST'])
 @limiter.limit("3 per hour")
+@upload_limits(
+    document=UploadField(MAX_FILE_SIZE, DOCUMENT_KINDS + IMAGE_KINDS),
+    photo=UploadField(MAX_PHOTO_SIZE, IMAGE_KINDS, prefix='photo_', strip_metadata=True),
+)
 def submit_application():
+    if request.upload_error:
+        flash(request.upload_error.message, 'error')
+        return render_template('lawyer_registration.html', data=request.form.to_dict()), request.upload_error.status
     try:
         phone_raw = sanitize_input(request.form['phone'])
         phone_clean = sanitize_phone(phone_raw)
@@ -110,55 +123,6 @@ def submit_application():
             application_data['phone'] = phone_raw  # Show original input on error
             return render_template('lawyer_registration.html', data=application_data)
 
-        # Handle file uploads
-        document_path = None
-        photo_path = None
-        
-        # Handle document upload
-        if 'document' in request.files:
-            file = request.files['document']
-            if file and file.filename and allowed_file(file.filename):
-                # Check file size
-                file.seek(0, os.SEEK_END)
-                file_size = file.tell()
-                file.seek(0)
-
-                if file_size <= MAX_FILE_SIZE:
-                    filename = secure_filename(file.filename)
-                    file_ext = filename.rsplit('.', 1)[1].lower()
-                    unique_filename = f"{uuid.uuid4().hex}.{file_ext}"
-                    file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-                    file.save(file_path)
-                    application_data['document_path'] = file_path
-                else:
-                    flash('Document file size must be less than 5MB', 'error')
-                    return render_template('lawyer_registration.html', data=application_data)
-        
-        # Handle photo upload
-        if 'photo' in request.files:
-            photo = request.files['photo']
-            if photo and photo.filename:
-                # Validate image file
-                if not photo.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                    flash('Photo must be a valid image file (JPG, PNG, GIF)', 'error')
-                    return render_template('lawyer_registration.html', data=application_data)
-                
-                # Check file size (2MB max for photos)
-                photo.seek(0, os.SEEK_END)
-                photo_size = photo.tell()
-                photo.seek(0)
-
-                if photo_size <= 2 * 1024 * 1024:  # 2MB max
-                    filename = secure_filename(photo.filename)
-                    file_ext = filename.rsplit('.', 1)[1].lower()
-                    unique_filename = f"photo_{uuid.uuid4().hex}.{file_ext}"
-                    photo_file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-                    photo.save(photo_file_path)
-                    application_data['photo_path'] = photo_file_path
-                else:
-                    flash('Photo file size must be less than 2MB', 'error')
-                    return render_template('lawyer_registration.html', data=application_data)
-                    
         # Enhanced validation
         required_fields = ['name', 'email', 'phone', 'license_number', 'degree', 'specialization', 'bio', 'location']
         if not all([application_data[field] for field in required_fields]):
@@ -183,9 +147,21 @@ def submit_application():
             flash('Bio must be at least 50 characters long', 'error')
             return render_template('lawyer_registration.html', data=application_data)
         
+        if has_pending_application(application_data['email']):
+            flash('An application for this email address is already under review.', 'error')
+            return render_template('lawyer_registration.html', data=application_data)
+        
+        # Files were streamed to UPLOAD_FOLDER while the form was parsed (uploads.py);
+        # only a validated application moves them into the store and keeps their keys
+        for upload in request.files.getlist('document'):
+            application_data['document_path'] = upload_store.put(upload)
+        for upload in request.files.getlist('photo'):
+            application_data['photo_path'] = upload_store.put(upload)
+        
         application_id = add_lawyer_application(application_data)
         
         if application_id:
+            image_variants.submit(application_data.get('photo_path'))
             flash('Application submitted successfully! We will review your application and get back to you within 5-7 business days.', 'success')
             
             # Send confirmation email to applicant
@@ -214,7 +190,7 @@ def submit_application():
             </html>
             """
             
-            send_email(
+            queue_email(
                 application_data['email'],
                 "LegalMatch Application Received",
                 confirmation_email
@@ -225,6 +201,7 @@ def submit_application():
             # If database is not available, store in memory as fallback
             application_id = add_lawyer_application_fallback(application_data)
             if application_id:
+                image_variants.submit(application_data.get('photo_path'))
                 flash('Application submitted successfully! (Note: Database temporarily unavailable, but your application has been recorded.)', 'success')
                 return redirect(url_for('lawyer_registration'))
             else:
@@ -237,6 +214,9 @@ def submit_application():
     except Exception as e:
         flash(f'An error occurred: {str(e)}', 'error')
         return render_template('lawyer_registration.html')
+    finally:
+        # Files are saved before validation runs; drop them unless the application kept them
+        discard_unstored(request.files)
 
 @app.route('/lawyer/<int:lawyer_id>')
 def lawyer_detail(lawyer_id):
@@ -310,13 +290,12 @@ def rate_lawyer():
         if not (1 <= rating <= 5):
             return jsonify({'error': 'Rating must be between 1 and 5'}), 400
         
-        if add_rating(lawyer_id, rating, user_ip):
-            # Get updated lawyer info
-            lawyer = get_lawyer_by_id(lawyer_id)
+        aggregate = add_rating(lawyer_id, rating, user_ip)
+        if aggregate:
             return jsonify({
                 'success': True,
-                'new_rating': float(lawyer['rating']),
-                'total_ratings': lawyer['total_ratings']
+                'new_rating': aggregate['rating'],
+                'total_ratings': aggregate['total_ratings']
             })
         else:
             return jsonify({'error': 'Error saving rating'}), 500
@@ -324,51 +303,98 @@ def rate_lawyer():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _api_etag(*parts):
+    return hashlib.sha1('|'.join(map(str, parts)).encode('utf-8')).hexdigest()[:32]
+
+def _with_validator(response, etag, max_age):
+    """Attach the ETag and this endpoint's Cache-Control (max_age 0: revalidate every time)"""
+    if etag:
+        response.set_etag(etag)
+    response.cache_control.public = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+def _not_modified(etag, max_age):
+    """304 when If-None-Match matches, checked before any query or serialization runs"""
+    if etag and request.if_none_match.contains_weak(etag):
+        return _with_validator(app.response_class(status=304), etag, max_age)
+    return None
+
+def _directory_etag():
+    """Validator for directory/search responses: lawyer data version plus the query string"""
+    version = lawyer_data_version('verified')
+    return _api_etag(version, request.path, request.query_string.decode('latin-1')) if version else None
+
 @app.route('/api/lawyers')
 def get_all_lawyers_api():
+    etag = _directory_etag()
+    max_age = API_CACHE_CONFIG['directory_max_age']
+    not_modified = _not_modified(etag, max_age)
+    if not_modified:
+        return not_modified
     try:
-        specialty = request.args.get('specialty', '').lower()
         sort_by = request.args.get('sort', 'rating')
-        search = request.args.get('search', '').lower()
-        
-        lawyers = get_all_lawyers_from_db()
-        
-        # Filter by search term
-        if search:
-            lawyers = [l for l in lawyers if
-                      search in l['name'].lower() or
-                      search in l['specialization'].lower() or
-                      search in l['location'].lower()]
-        
-        # Filter by specialty
-        if specialty:
-            lawyers = [l for l in lawyers if specialty in l['specialization'].lower()]
-        
-        # Sort lawyers
-        if sort_by == 'experience':
-            lawyers.sort(key=lambda x: x['years_experience'], reverse=True)
-        elif sort_by == 'name':
-            lawyers.sort(key=lambda x: x['name'])
-        else:
-            lawyers.sort(key=lambda x: float(x['rating']), reverse=True)
-        
-        return jsonify({
+        filters = {
+            'query': request.args.get('search', '').lower(),
+            'specialization': request.args.get('specialty', '').lower(),
+            'sort_by': sort_by if sort_by in ('experience', 'name', 'relevance') else 'rating'
+        }
+        fields = parse_fields(request.args.get('fields'))
+        
+        # Keyset pagination when the client asks for it (limit and/or cursor);
+        # without either the whole directory is returned as before
+        paginated = 'limit' in request.args or 'cursor' in request.args
+        if paginated:
+            limit = request.args.get('limit', 20, type=int) or 20
+            filters['per_page'] = min(max(limit, 1), MAX_PER_PAGE)
+            filters['cursor'] = request.args.get('cursor', '')
+            if filters['cursor']:
+                filters['after'] = decode_cursor(filters['cursor'], effective_sort(filters))
+        
+        # Full-text search over name/specialization/location runs in MySQL
+        lawyers, _, next_cursor = search_lawyers_in_db(filters, 'verified', DIRECTORY_TEXT_COLUMNS, fields)
+        
+        response = {
             'success': True,
-            'lawyers': lawyers
-        })
+            'lawyers': [with_photo_sources(lawyer) for lawyer in lawyers]
+        }
+        if paginated:
+            response['next_cursor'] = next_cursor
+            response['has_more'] = next_cursor is not None
+        return _with_validator(jsonify(response), etag, max_age)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/lawyers/suggest')
+def suggest_lawyers():
+    """Typeahead suggestions (prefix matching, ranked by relevance)"""
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 8, type=int) or 8, 1), 20)
+    return jsonify({
+        'success': True,
+        'suggestions': suggest_lawyers_from_db(query, limit)
+    })
+
 @app.route('/api/lawyers/<int:lawyer_id>')
 def get_lawyer_api(lawyer_id):
     """Get specific lawyer by ID"""
+    # Served from the profile cache, so the validator costs no query on a hit
     lawyer = get_lawyer_by_id(lawyer_id)
     if lawyer:
-        return jsonify({
+        lawyer = with_photo_sources(lawyer)
+        etag = _api_etag('lawyer', lawyer_id, lawyer.get('updated_at'), lawyer.get('rating'), lawyer.get('status'),
+                         lawyer.get('photo_sources') is not None)
+        max_age = API_CACHE_CONFIG['profile_max_age']
+        return _not_modified(etag, max_age) or _with_validator(jsonify({
             'success': True,
             'lawyer': lawyer
-        })
+        }), etag, max_age)
     else:
         return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
 
@@ -389,6 +415,10 @@ def update_lawyer(lawyer_id):
             if not data.get(field):
                 return jsonify({'success': False, 'error': f'{field} is required'}), 400
         
+        before = snapshot_row(connection, 'lawyer', lawyer_id)
+        if not before:
+            return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
+        
         query = """
         UPDATE lawyers 
         SET name = %s, email = %s, specialization = %s, years_experience = %s, bio = %s, updated_at = NOW()
@@ -405,11 +435,10 @@ def update_lawyer(lawyer_id):
         )
         
         cursor.execute(query, values)
-        
-        if cursor.rowcount == 0:
-            return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
+        record_change(connection, 'lawyer', before, dict(before, specialization=values[2]))
         
         connection.commit()
+        invalidate_lawyer_directory(lawyer_id)
         return jsonify({'success': True, 'message': 'Lawyer updated successfully'})
         
     except ValueError:
@@ -430,13 +459,17 @@ def delete_lawyer(lawyer_id):
     
     try:
         cursor = connection.cursor()
+        before = snapshot_row(connection, 'lawyer', lawyer_id)
+        if not before:
+            return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
+        
         query = "DELETE FROM lawyers WHERE id = %s"
         cursor.execute(query, (lawyer_id,))
-        
-        if cursor.rowcount == 0:
-            return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
+        record_change(connection, 'lawyer', before, None)
+        release_references(connection, [before.get('photo')])
         
         connection.commit()
+        invalidate_lawyer_directory(lawyer_id)
         return jsonify({'success': True, 'message': 'Lawyer deleted successfully'})
         
     except Error as e:
@@ -461,13 +494,16 @@ def update_lawyer_status(lawyer_id):
             return jsonify({'success': False, 'error': 'Invalid status'}), 400
         
         cursor = connection.cursor()
+        before = snapshot_row(connection, 'lawyer', lawyer_id)
+        if not before:
+            return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
+        
         query = "UPDATE lawyers SET status = %s, updated_at = NOW() WHERE id = %s"
         cursor.execute(query, (status, lawyer_id))
-        
-        if cursor.rowcount == 0:
-            return jsonify({'success': False, 'error': 'Lawyer not found'}), 404
+        record_change(connection, 'lawyer', before, dict(before, status=status))
         
         connection.commit()
+        invalidate_lawyer_directory(lawyer_id)
         return jsonify({'success': True, 'message': f'Lawyer status updated to {status}'})
         
     except Error as e:
@@ -495,10 +531,13 @@ def verify_email():
 
         lawyer_id = row['lawyer_id']
         # Activate lawyer
+        before = snapshot_row(connection, 'lawyer', lawyer_id)
         cursor.execute("UPDATE lawyers SET status = 'verified', updated_at = NOW() WHERE id = %s", (lawyer_id,))
+        record_change(connection, 'lawyer', before, before and dict(before, status='verified'))
         # Remove token
         cursor.execute("DELETE FROM verification_tokens WHERE token = %s", (token,))
         connection.commit()
+        invalidate_lawyer_directory(lawyer_id)
         return jsonify({'success': True, 'message': 'Email verified. Profile activated.'})
     except Error as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -513,8 +552,14 @@ def about():
 
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    """Serve uploaded files"""
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    """Serve uploaded files: store keys from the content-addressed store, older names from UPLOAD_FOLDER"""
+    offload = UPLOAD_SERVING_CONFIG['offload']
+    path = upload_store.path_for(filename)
+    if path:
+        return send_upload(upload_store.folder, os.path.relpath(path, upload_store.folder), offload,
+                           UPLOAD_SERVING_CONFIG['store_accel_prefix'])
+    return send_upload(UPLOAD_FOLDER, filename, offload, UPLOAD_SERVING_CONFIG['accel_prefix'],
+                       UPLOAD_SERVING_CONFIG['max_age'])
 
 @app.route('/manifest.json')
 def manifest():
@@ -526,9 +571,12 @@ def manifest():
 
 @app.route('/service-worker.js')
 def service_worker():
-    """Serve service worker with proper headers"""
-    response = send_from_directory('static', 'service-worker.js')
-    response.headers['Content-Type'] = 'application/javascript'
+    """Serve the service worker, versioned and with a precache list from the asset manifest"""
+    precache_files = ['/', url_for('manifest')] + assets.urls(PRECACHE_ASSETS) + PRECACHE_URLS
+    response = app.response_class(
+        render_template('service-worker.js', version=assets.version, precache_files=precache_files),
+        mimetype='application/javascript'
+    )
     response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'  # Don't cache service worker
     response.headers['Service-Worker-Allowed'] = '/'
     return response
@@ -552,7 +600,11 @@ def serve_icons(filename):
 
 @app.route('/api/lawyers/<int:lawyer_id>/messages', methods=['POST'])
 @csrf.exempt
+@upload_limits(documents=UploadField(MAX_CLIENT_DOCUMENT_SIZE, DOCUMENT_KINDS + IMAGE_KINDS,
+                                     prefix='client_doc_', max_files=10))
 def submit_message_to_lawyer(lawyer_id):
+    if request.upload_error:
+        return jsonify({'success': False, 'error': request.upload_error.message}), request.upload_error.status
     connection = None
     try:
         # Handle both JSON and FormData requests
@@ -570,31 +622,12 @@ def submit_message_to_lawyer(lawyer_id):
             client_phone = normalize_indian_phone(sanitize_input(request.form.get('client_phone', '')))
             message = sanitize_input(request.form.get('message', ''))
             
-            # Handle uploaded documents
-            uploaded_files = []
-            files = request.files.getlist('documents')
-            for file in files:
-                if file and file.filename:
-                    # Validate file type
-                    if not file.filename.lower().endswith(('.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png')):
-                        continue
-                    
-                    # Check file size (10MB max)
-                    file.seek(0, os.SEEK_END)
-                    file_size = file.tell()
-                    file.seek(0)
-                    
-                    if file_size <= 10 * 1024 * 1024:  # 10MB max
-                        filename = secure_filename(file.filename)
-                        file_ext = filename.rsplit('.', 1)[1].lower()
-                        unique_filename = f"client_doc_{uuid.uuid4().hex}.{file_ext}"
-                        file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-                        file.save(file_path)
-                        uploaded_files.append({
-                            'original_name': filename,
-                            'saved_path': file_path,
-                            'size': file_size
-                        })
+            # Documents were streamed to UPLOAD_FOLDER while the form was parsed (uploads.py)
+            uploaded_files = [{
+                'original_name': upload.filename,
+                'key': upload_store.put(upload),
+                'size': upload.size
+            } for upload in request.files.getlist('documents')]
         
         if not client_name or not client_email or not message:
             return jsonify({'success': False, 'error': 'client_name, client_email and message are required'}), 400
@@ -609,18 +642,20 @@ def submit_message_to_lawyer(lawyer_id):
         if uploaded_files:
             file_info = "\n\nUploaded Documents:\n"
             for file in uploaded_files:
-                file_info += f"- {file['original_name']} ({(file['size'] / 1024 / 1024):.2f} MB)\n"
+                file_info += f"- {file['original_name']} ({(file['size'] / 1024 / 1024):.2f} MB): /uploads/{file['key']}\n"
             message += file_info
         
         cursor.execute("""
             INSERT INTO lawyer_client_messages (lawyer_id, client_name, client_email, client_phone, message)
             VALUES (%s, %s, %s, %s, %s)
         """, (lawyer_id, client_name, client_email, client_phone or None, message))
+        add_references(connection, [file['key'] for file in uploaded_files])
         connection.commit()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
     finally:
+        discard_unstored(request.files)
         try:
             if connection and connection.is_connected():
                 cursor.close()
@@ -628,116 +663,99 @@ def submit_message_to_lawyer(lawyer_id):
         except Exception:
             pass
 
+def _reference_data_response(body, dataset):
+    """Serve a pre-serialized dataset response, answering conditional requests with 304"""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(dataset.etag)
+    response.last_modified = dataset.last_modified
+    # Clients keep the body but revalidate, so a reloaded file is picked up at once
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/api/states')
 def get_states():
     """Get all Indian states"""
     try:
-        with open('static/data/indian_states_districts.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        states = list(data['states'].keys())
-        return jsonify({
-            'success': True,
-            'states': states
-        })
+        dataset = states_dataset.get()
+        return _reference_data_response(dataset.states_body, dataset)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/districts/<state>')
 def get_districts(state):
-    """Get districts for a specific state"""
+    """Get districts for a specific state (state name is case-insensitive)"""
     try:
-        with open('static/data/indian_states_districts.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if state in data['states']:
-            districts = data['states'][state]
-            return jsonify({
-                'success': True,
-                'districts': districts
-            })
-        else:
+        dataset = states_dataset.get()
+        body = dataset.districts_body(state)
+        if body is None:
             return jsonify({'success': False, 'error': 'State not found'}), 404
+        return _reference_data_response(body, dataset)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/district-states/<district>')
+def get_district_states(district):
+    """Get the states that contain a district with this name"""
+    try:
+        states = states_dataset.get().states_for_district(district)
+        if not states:
+            return jsonify({'success': False, 'error': 'District not found'}), 404
+        return jsonify({'success': True, 'states': list(states)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/lawyers/search')
 def search_lawyers():
     """Advanced lawyer search with multiple filters"""
+    etag = _directory_etag()
+    max_age = API_CACHE_CONFIG['directory_max_age']
+    not_modified = _not_modified(etag, max_age)
+    if not_modified:
+        return not_modified
     try:
-        # Get query parameters
-        query = request.args.get('q', '').lower()
-        specialization = request.args.get('specialization', '')
-        min_experience = request.args.get('min_experience', 0, type=int)
-        max_experience = request.args.get('max_experience', 100, type=int)
-        min_rating = request.args.get('min_rating', 0, type=float)
-        location = request.args.get('location', '').lower()
-        sort_by = request.args.get('sort', 'rating')
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        
-        lawyers = get_all_lawyers_from_db('verified')
-        
-        # Apply filters
-        filtered_lawyers = []
-        for lawyer in lawyers:
-            # Text search in name, bio, specialization
-            if query and not any(query in str(lawyer[field]).lower() 
-                               for field in ['name', 'bio', 'specialization'] if lawyer[field]):
-                continue
-            
-            # Specialization filter
-            if specialization and specialization.lower() not in lawyer['specialization'].lower():
-                continue
-            
-            # Experience range filter
-            if not (min_experience <= lawyer['years_experience'] <= max_experience):
-                continue
-            
-            # Rating filter
-            if lawyer['rating'] < min_rating:
-                continue
-            
-            # Location filter
-            if location and location not in lawyer['location'].lower():
-                continue
-            
-            filtered_lawyers.append(lawyer)
-        
-        # Sort results
-        if sort_by == 'name':
-            filtered_lawyers.sort(key=lambda x: x['name'])
-        elif sort_by == 'experience':
-            filtered_lawyers.sort(key=lambda x: x['years_experience'], reverse=True)
-        elif sort_by == 'rating':
-            filtered_lawyers.sort(key=lambda x: float(x['rating']), reverse=True)
-        elif sort_by == 'recent':
-            filtered_lawyers.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        
-        # Pagination
-        total = len(filtered_lawyers)
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_lawyers = filtered_lawyers[start:end]
-        
-        return jsonify({
-            'success': True,
-            'lawyers': paginated_lawyers,
-            'pagination': {
+        # Filtering, sorting and pagination all run in SQL; only one page is fetched
+        filters = normalize_search_filters(request.args)
+        page = filters['page']
+        per_page = filters['per_page']
+        fields = parse_fields(request.args.get('fields'))
+        
+        # `cursor` switches from page numbers to keyset pagination
+        if filters['cursor']:
+            try:
+                filters['after'] = decode_cursor(filters['cursor'], effective_sort(filters))
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+        
+        paginated_lawyers, total, next_cursor = search_lawyers_in_db(filters, 'verified', fields=fields)
+        
+        pagination = {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        if total is not None:
+            pagination.update({
                 'page': page,
-                'per_page': per_page,
                 'total': total,
-                'pages': (total + per_page - 1) // per_page
-            },
+                'pages': (total + per_page - 1) // per_page,
+                'has_more': page * per_page < total
+            })
+        
+        return _with_validator(jsonify({
+            'success': True,
+            'lawyers': [with_photo_sources(lawyer) for lawyer in paginated_lawyers],
+            'pagination': pagination,
             'filters_applied': {
-                'query': query,
-                'specialization': specialization,
-                'min_experience': min_experience,
-                'max_experience': max_experience,
-                'min_rating': min_rating,
-                'location': location,
-                'sort_by': sort_by
+                'query': filters['query'],
+                'specialization': filters['specialization'],
+                'min_experience': filters['min_experience'],
+                'max_experience': filters['max_experience'],
+                'min_rating': filters['min_rating'],
+                'location': filters['location'],
+                'sort_by': filters['sort_by']
             }
-        })
+        }), etag, max_age)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -9,30 +9,57 @@ let filteredLawyers = [];
 let selectedRating = 0;
 let currentRatingLawyerId = null;
 
+// Directory paging: only list-view columns are fetched, one keyset page at a time
+const LAWYERS_PAGE_SIZE = 24;
+const LAWYER_LIST_FIELDS = 'id,name,specialization,years_experience,rating,total_ratings,photo,phone,email,location,keywords,bio_excerpt';
+let nextCursor = null;
+let isLoadingPage = false;
+let loadGeneration = 0;
+
 function initializeLawyersPage() {
     loadLawyers();
     initializeFilters();
     initializeRatingSystem();
+    initializeInfiniteScroll();
 }
 
-// Load lawyers from API
+function buildLawyersUrl(cursor) {
+    const params = new URLSearchParams({
+        limit: LAWYERS_PAGE_SIZE,
+        fields: LAWYER_LIST_FIELDS,
+        cursor: cursor || ''
+    });
+    const searchTerm = document.getElementById('searchInput')?.value.trim();
+    const selectedSpecialty = document.getElementById('specialtyFilter')?.value;
+    const sortBy = document.getElementById('sortFilter')?.value;
+    if (searchTerm) params.set('search', searchTerm);
+    if (selectedSpecialty) params.set('specialty', selectedSpecialty);
+    if (sortBy) params.set('sort', sortBy);
+    return `/api/lawyers?${params.toString()}`;
+}
+
+// Load the first page of lawyers from the API (filters are applied server-side)
 async function loadLawyers() {
     const grid = document.getElementById('lawyersGrid');
     const loading = document.getElementById('loadingSpinner');
     const noResults = document.getElementById('noResults');
+    const generation = ++loadGeneration;
     
     try {
         loading.classList.remove('d-none');
         grid.style.display = 'none';
+        isLoadingPage = true;
         
-        const response = await fetch('/api/lawyers');
+        const response = await fetch(buildLawyersUrl(null));
         const data = await response.json();
+        if (generation !== loadGeneration) return;
         
         if (data.success) {
             allLawyers = data.lawyers;
             filteredLawyers = [...allLawyers];
+            nextCursor = data.next_cursor;
             renderLawyers(filteredLawyers);
-            updateLawyerCount(filteredLawyers.length);
+            updateLawyerCount(filteredLawyers.length, Boolean(nextCursor));
         } else {
             throw new Error(data.error || 'Failed to load lawyers');
         }
@@ -41,11 +68,57 @@ async function loadLawyers() {
         showError('Failed to load lawyers. Please try again.');
         noResults.classList.remove('d-none');
     } finally {
-        loading.classList.add('d-none');
-        grid.style.display = 'block';
+        if (generation === loadGeneration) {
+            isLoadingPage = false;
+            loading.classList.add('d-none');
+            grid.style.display = 'block';
+        }
+    }
+}
+
+// Fetch the page after the current cursor and append it to the grid
+async function loadMoreLawyers() {
+    if (!nextCursor || isLoadingPage) return;
+    const generation = loadGeneration;
+    isLoadingPage = true;
+    
+    try {
+        const response = await fetch(buildLawyersUrl(nextCursor));
+        const data = await response.json();
+        if (generation !== loadGeneration) return;
+        
+        if (data.success) {
+            allLawyers = allLawyers.concat(data.lawyers);
+            filteredLawyers = [...allLawyers];
+            nextCursor = data.next_cursor;
+            appendLawyers(data.lawyers);
+            updateLawyerCount(filteredLawyers.length, Boolean(nextCursor));
+        }
+    } catch (error) {
+        console.error('Error loading more lawyers:', error);
+    } finally {
+        if (generation === loadGeneration) {
+            isLoadingPage = false;
+        }
     }
 }
 
+function initializeInfiniteScroll() {
+    const grid = document.getElementById('lawyersGrid');
+    if (!grid || !('IntersectionObserver' in window)) return;
+    
+    const sentinel = document.createElement('div');
+    sentinel.id = 'lawyersSentinel';
+    grid.insertAdjacentElement('afterend', sentinel);
+    
+    const observer = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadMoreLawyers();
+        }
+    }, { rootMargin: '600px 0px' });
+    observer.observe(sentinel);
+}
+
 // Initialize search and filter functionality
 function initializeFilters() {
     const searchInput = document.getElementById('searchInput');
@@ -68,43 +141,10 @@ function initializeFilters() {
     });
 }
 
-// Filter and render lawyers based on current filters
+// Re-query the directory with the current filters, starting from the first page
 function filterAndRenderLawyers() {
-    const searchTerm = document.getElementById('searchInput').value.toLowerCase().trim();
-    const selectedSpecialty = document.getElementById('specialtyFilter').value.toLowerCase();
-    const sortBy = document.getElementById('sortFilter').value;
-    
-    // Filter lawyers
-    filteredLawyers = allLawyers.filter(lawyer => {
-        const matchesSearch = !searchTerm || 
-            lawyer.name.toLowerCase().includes(searchTerm) ||
-            lawyer.specialization.toLowerCase().includes(searchTerm) ||
-            lawyer.location.toLowerCase().includes(searchTerm) ||
-            (lawyer.keywords && lawyer.keywords.some(keyword => 
-                keyword.toLowerCase().includes(searchTerm)
-            ));
-            
-        const matchesSpecialty = !selectedSpecialty ||
-            lawyer.specialization.toLowerCase().includes(selectedSpecialty);
-            
-        return matchesSearch && matchesSpecialty;
-    });
-    
-    // Sort lawyers
-    filteredLawyers.sort((a, b) => {
-        switch (sortBy) {
-            case 'experience':
-                return b.years_experience - a.years_experience;
-            case 'name':
-                return a.name.localeCompare(b.name);
-            case 'rating':
-            default:
-                return b.rating - a.rating;
-        }
-    });
-    
-    renderLawyers(filteredLawyers);
-    updateLawyerCount(filteredLawyers.length);
+    nextCursor = null;
+    loadLawyers();
 }
 
 // Render lawyers in the grid
@@ -123,9 +163,19 @@ function renderLawyers(lawyers) {
     noResults.classList.add('d-none');
     
     grid.innerHTML = lawyers.map(lawyer => createLawyerCard(lawyer)).join('');
-    
+    animateCards(grid.querySelectorAll('.lawyer-card'));
+}
+
+// Append a further page of cards without re-rendering the existing ones
+function appendLawyers(lawyers) {
+    const grid = document.getElementById('lawyersGrid');
+    const start = grid.querySelectorAll('.lawyer-card').length;
+    grid.insertAdjacentHTML('beforeend', lawyers.map(lawyer => createLawyerCard(lawyer)).join(''));
+    animateCards(Array.from(grid.querySelectorAll('.lawyer-card')).slice(start));
+}
+
+function animateCards(cards) {
     // Add staggered animation
-    const cards = grid.querySelectorAll('.lawyer-card');
     cards.forEach((card, index) => {
         card.style.opacity = '0';
         card.style.transform = 'translateY(20px)';
@@ -188,7 +238,7 @@ function createLawyerCard(lawyer) {
                     ` : ''}
                     
                     <p class="card-text text-muted small flex-grow-1">
-                        ${truncateText(lawyer.bio, 120)}
+                        ${truncateText(lawyer.bio_excerpt || lawyer.bio || '', 120)}
                     </p>
                     
                     <div class="mt-auto">
@@ -243,10 +293,10 @@ function truncateText(text, maxLength) {
 }
 
 // Update lawyer count display
-function updateLawyerCount(count) {
+function updateLawyerCount(count, hasMore = false) {
     const countElement = document.getElementById('lawyerCount');
     if (countElement) {
-        countElement.textContent = `${count} lawyer${count !== 1 ? 's' : ''} found`;
+        countElement.textContent = `${count}${hasMore ? '+' : ''} lawyer${count !== 1 ? 's' : ''} found`;
     }
 }
 
@@ -0,0 +1,207 @@
+"""Admin dashboard counters kept in the stats_counters table.
+
+Write paths snapshot the row they change (snapshot_row) and call
+record_change() in the same transaction; the difference between the row's
+contribution before and after is added to the counters. Each counter is
+spread over COUNTER_SLOTS rows so concurrent writers rarely wait on the same
+row. reconcile_counters() rebuilds everything from the base tables.
+"""
+import logging
+import random
+import threading
+
+from mysql.connector import Error
+
+COUNTER_SLOTS = 8
+SPECIALIZATION_PREFIX = 'specialization:'
+# Present once the counters have been built from the base tables
+INITIALIZED_COUNTER = 'initialized'
+
+SNAPSHOT_QUERIES = {
+    # photo / document_path / photo_path let deletes release their stored uploads
+    'lawyer': "SELECT status, specialization, rating, total_ratings, photo FROM lawyers WHERE id = %s FOR UPDATE",
+    'application': "SELECT status, document_path, photo_path FROM lawyer_applications WHERE id = %s FOR UPDATE",
+    'message': "SELECT status FROM contact_messages WHERE id = %s FOR UPDATE",
+}
+
+
+def lawyer_contribution(row):
+    if not row or row.get('status', 'verified') != 'verified':
+        return {}
+    counts = {'verified_lawyers': 1, SPECIALIZATION_PREFIX + row['specialization']: 1}
+    # The dashboard average covers verified lawyers that have been rated
+    if (row.get('total_ratings') or 0) > 0:
+        counts['rated_lawyers'] = 1
+        counts['rating_tenths'] = int(round(float(row.get('rating') or 0) * 10))
+    return counts
+
+
+def application_contribution(row):
+    return {'pending_applications': 1} if row and row.get('status', 'pending') == 'pending' else {}
+
+
+def message_contribution(row):
+    if not row:
+        return {}
+    counts = {'total_messages': 1}
+    if row.get('status', 'new') == 'new':
+        counts['new_messages'] = 1
+    return counts
+
+
+CONTRIBUTIONS = {
+    'lawyer': lawyer_contribution,
+    'application': application_contribution,
+    'message': message_contribution,
+}
+
+
+def counter_deltas(kind, before, after):
+    """Counter changes for one row going from `before` to `after` (None = row absent)"""
+    contribution = CONTRIBUTIONS[kind]
+    deltas = dict(contribution(after))
+    for name, value in contribution(before).items():
+        deltas[name] = deltas.get(name, 0) - value
+    return {name: value for name, value in deltas.items() if value}
+
+
+def snapshot_row(connection, kind, row_id):
+    """Lock a row and return the columns its counters depend on (None if missing)"""
+    cursor = connection.cursor(dictionary=True, buffered=True)
+    try:
+        cursor.execute(SNAPSHOT_QUERIES[kind], (row_id,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def add_to_counters(connection, deltas):
+    if not deltas:
+        return
+    slot = random.randrange(COUNTER_SLOTS)
+    rows = sorted(deltas.items())
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO stats_counters (name, slot, value) VALUES "
+            + ", ".join(["(%s, %s, %s)"] * len(rows))
+            # Row alias instead of VALUES(value), which MySQL 8.0.20+ deprecates
+            + " AS new ON DUPLICATE KEY UPDATE value = stats_counters.value + new.value",
+            [param for name, value in rows for param in (name, slot, value)]
+        )
+    finally:
+        cursor.close()
+
+
+def record_change(connection, kind, before, after):
+    """Apply the counter changes of one write; call before the write's commit"""
+    add_to_counters(connection, counter_deltas(kind, before, after))
+
+
+def record_changes(connection, kind, changes):
+    """record_change() for many rows at once: one counter update for (before, after) pairs"""
+    totals = {}
+    for before, after in changes:
+        for name, value in counter_deltas(kind, before, after).items():
+            totals[name] = totals.get(name, 0) + value
+    add_to_counters(connection, {name: value for name, value in totals.items() if value})
+
+
+def read_counters(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT name, SUM(value) FROM stats_counters GROUP BY name")
+        return {name: int(value) for name, value in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def summarize(counters):
+    """Dashboard stats in the shape /api/admin/stats has always returned"""
+    rated = counters.get('rated_lawyers', 0)
+    return {
+        'verified_lawyers': counters.get('verified_lawyers', 0),
+        'pending_applications': counters.get('pending_applications', 0),
+        'new_messages': counters.get('new_messages', 0),
+        'total_messages': counters.get('total_messages', 0),
+        'average_rating': round(counters.get('rating_tenths', 0) / rated / 10, 1) if rated else 0.0,
+        'specialization_distribution': [
+            {'specialization': name[len(SPECIALIZATION_PREFIX):], 'count': count}
+            for name, count in sorted(counters.items())
+            if name.startswith(SPECIALIZATION_PREFIX) and count > 0
+        ],
+    }
+
+
+def reconcile_counters(connection):
+    """Rebuild every counter from the base tables in one transaction.
+
+    Deleting the counter rows first locks them, so writers that commit while
+    the counts run block on their counter update and are applied afterwards.
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("DELETE FROM stats_counters")
+        counters = {INITIALIZED_COUNTER: 1}
+
+        cursor.execute("""
+            SELECT specialization, COUNT(*) AS lawyers,
+                   SUM(total_ratings > 0) AS rated, SUM(IF(total_ratings > 0, ROUND(rating * 10), 0)) AS rating_tenths
+            FROM lawyers WHERE status = 'verified' GROUP BY specialization
+        """)
+        for row in cursor.fetchall():
+            counters[SPECIALIZATION_PREFIX + row['specialization']] = int(row['lawyers'])
+            for name, value in (('verified_lawyers', row['lawyers']), ('rated_lawyers', row['rated']),
+                                ('rating_tenths', row['rating_tenths'])):
+                counters[name] = counters.get(name, 0) + int(value or 0)
+
+        cursor.execute("SELECT COUNT(*) AS total FROM lawyer_applications WHERE status = 'pending'")
+        counters['pending_applications'] = cursor.fetchone()['total']
+        cursor.execute("SELECT COUNT(*) AS total, COALESCE(SUM(status = 'new'), 0) AS new FROM contact_messages")
+        row = cursor.fetchone()
+        counters['total_messages'] = int(row['total'])
+        counters['new_messages'] = int(row['new'])
+
+        rows = [(name, 0, value) for name, value in sorted(counters.items()) if value]
+        cursor.executemany("INSERT INTO stats_counters (name, slot, value) VALUES (%s, %s, %s)", rows)
+        connection.commit()
+        return counters
+    finally:
+        cursor.close()
+
+
+class Reconciler:
+    """Daemon thread that calls reconcile_counters() every `interval` seconds"""
+
+    def __init__(self, connect, interval=3600):
+        self._connect = connect
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._thread or not self.interval:
+                return
+            self._thread = threading.Thread(target=self._run, name='stats-reconciler', daemon=True)
+            self._thread.start()
+
+    def run_once(self):
+        connection = self._connect()
+        if not connection:
+            return None
+        try:
+            return reconcile_counters(connection)
+        except Error as e:
+            print(f"Error reconciling stats counters: {e}")
+            return None
+        finally:
+            connection.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Stats reconciler error: {type(e).__name__}: {e}")
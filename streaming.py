@@ -0,0 +1,107 @@
+"""Stream large query results as JSON or NDJSON without materializing them"""
+import logging
+
+from flask import Response, current_app
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson(request):
+    """`?format=ndjson` or an Accept header preferring NDJSON"""
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _json_chunks(rows, dumps, key, head):
+    """[row, row, ...] or {..head, "key": [row, ...]} built piece by piece"""
+    if key is None:
+        prefix, suffix = '[', ']'
+    else:
+        opening = dumps(dict(head or {}))
+        prefix = (opening[:-1] + ',' if len(opening) > 2 else '{') + dumps(key) + ':['
+        suffix = ']}'
+    yield prefix
+    first = True
+    for batch in rows:
+        if not batch:
+            continue
+        body = ','.join(dumps(row) for row in batch)
+        yield body if first else ',' + body
+        first = False
+    yield suffix
+
+
+def _ndjson_chunks(rows, dumps):
+    for batch in rows:
+        if batch:
+            yield ''.join(dumps(row) + '\n' for row in batch)
+
+
+def discard_connection(connection):
+    """Close a connection that still has an unread result set without draining it"""
+    try:
+        discard = getattr(connection, 'discard', None)
+        if discard is not None:
+            discard()
+        else:
+            connection.close()
+    except Exception as e:
+        logging.warning(f"Error discarding streamed connection: {type(e).__name__}: {e}")
+
+
+def stream_query(connection, query, params=(), key=None, head=None, ndjson=False, transform=None,
+                 batch_size=STREAM_BATCH_SIZE):
+    """Run `query` on an unbuffered cursor and stream the rows as they arrive.
+
+    The query is executed before this returns, so SQL errors still surface as a
+    normal error response. Rows are pulled with fetchmany(batch_size); the
+    cursor and connection are released when the response is closed.
+    """
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute(query, params)
+    except Exception:
+        cursor.close()
+        connection.close()
+        raise
+
+    state = {'done': False}
+
+    def batches():
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                state['done'] = True
+                return
+            if transform:
+                rows = [transform(row) for row in rows]
+            yield rows
+
+    def release():
+        if not state['done']:
+            # Client went away mid-stream: reading the rest of the result could take
+            # minutes, so drop the connection and let the pool open a new one
+            discard_connection(connection)
+            return
+        try:
+            cursor.close()
+        except Exception as e:
+            logging.warning(f"Error closing streamed cursor: {type(e).__name__}: {e}")
+        finally:
+            connection.close()
+
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            chunks = _ndjson_chunks(batches(), dumps) if ndjson else _json_chunks(batches(), dumps, key, head)
+            yield from chunks
+        except Exception as e:
+            # Headers are already sent; a truncated body is the only signal left
+            logging.error(f"Error while streaming query results: {type(e).__name__}: {e}")
+
+    response = Response(generate(), mimetype=NDJSON_MIMETYPE if ndjson else 'application/json')
+    response.call_on_close(release)
+    return response
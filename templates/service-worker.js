@@ -1,33 +1,28 @@
 // Service Worker for LegalMatch PWA
-// Version 1.0.0
-
-const CACHE_NAME = 'legalmatch-v1.0.0';
-const STATIC_CACHE_NAME = 'legalmatch-static-v1.0.0';
-const DYNAMIC_CACHE_NAME = 'legalmatch-dynamic-v1.0.0';
-
-// Files to cache immediately
-const STATIC_FILES = [
-  '/',
-  '/static/style.css',
-  '/static/main.js',
-  '/static/components.js',
-  '/static/lawyers.js',
-  '/static/filter-utils.js',
-  '/static/js/state-district.js',
-  '/static/data/indian_states_districts.json',
-  '/static/manifest.json',
-  // Bootstrap CDN files (cached for offline use)
-  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
-  'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.0/font/bootstrap-icons.css',
-  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'
-];
-
-// API routes to cache dynamically
-const API_ROUTES = [
-  '/api/lawyers',
-  '/api/states',
-  '/api/districts/',
-  '/api/lawyers/search'
+// Rendered by the /service-worker.js route: the cache version and precache list
+// come from the static asset manifest (asset_manifest.py), so any asset change
+// installs a new worker and its activate step drops the old caches.
+
+const CACHE_VERSION = {{ version | tojson }};
+const CACHE_NAME = `legalmatch-${CACHE_VERSION}`;
+const STATIC_CACHE_NAME = `legalmatch-static-${CACHE_VERSION}`;
+// Public API responses only; activate drops the older dynamic caches, which
+// could hold pages from before the fetch handler was limited
+const DYNAMIC_CACHE_NAME = `legalmatch-api-${CACHE_VERSION}`;
+
+// Files to cache immediately (fingerprinted static URLs plus CDN files)
+const STATIC_FILES = {{ precache_files | tojson }};
+
+// Public GET endpoints whose responses may be kept for offline use. Nothing
+// else under the worker's root scope (admin and lawyer dashboards, admin APIs,
+// account pages) is ever written to Cache Storage.
+const PUBLIC_API_ROUTES = [
+  /^\/api\/lawyers$/,
+  /^\/api\/lawyers\/(search|suggest)$/,
+  /^\/api\/lawyers\/\d+$/,
+  /^\/api\/states$/,
+  /^\/api\/districts\/[^/]+$/,
+  /^\/api\/district-states\/[^/]+$/
 ];
 
 // Install event - cache static files
@@ -73,7 +68,8 @@ self.addEventListener('activate', event => {
   );
 });
 
-// Fetch event - serve from cache, fallback to network
+// Fetch event - precached assets from cache, public API reads network first;
+// every other request is left to the browser
 self.addEventListener('fetch', event => {
   const { request } = event;
   const url = new URL(request.url);
@@ -83,19 +79,15 @@ self.addEventListener('fetch', event => {
     return;
   }
   
-  // Handle different types of requests
-  if (isStaticFile(request.url)) {
-    // Static files - cache first strategy
+  if (isStaticFile(url)) {
+    // Fingerprinted static files and CDN files - cache first strategy
     event.respondWith(cacheFirst(request));
-  } else if (isAPIRequest(request.url)) {
-    // API requests - network first, cache fallback
-    event.respondWith(networkFirst(request));
-  } else if (isHTMLRequest(request)) {
-    // HTML pages - network first, cache fallback
+  } else if (isPublicAPIRequest(url)) {
+    // Public API requests - network first, cache fallback
     event.respondWith(networkFirst(request));
-  } else {
-    // Other requests - network only
-    event.respondWith(fetch(request));
+  } else if (request.mode === 'navigate') {
+    // Pages are never cached; offline, fall back to the precached home page
+    event.respondWith(fetch(request).catch(() => offlinePage()));
   }
 });
 
@@ -141,11 +133,6 @@ async function networkFirst(request) {
       return cachedResponse;
     }
     
-    // Return offline page for HTML requests
-    if (isHTMLRequest(request)) {
-      return caches.match('/');
-    }
-    
     return new Response('Offline - Resource not available', {
       status: 503,
       statusText: 'Service Unavailable'
@@ -153,27 +140,23 @@ async function networkFirst(request) {
   }
 }
 
-// Helper functions
-function isStaticFile(url) {
-  return url.includes('/static/') || 
-         url.includes('.css') || 
-         url.includes('.js') || 
-         url.includes('.json') ||
-         url.includes('.png') ||
-         url.includes('.jpg') ||
-         url.includes('.jpeg') ||
-         url.includes('.gif') ||
-         url.includes('.svg') ||
-         url.includes('bootstrap') ||
-         url.includes('bootstrap-icons');
+async function offlinePage() {
+  const cachedResponse = await caches.match('/');
+  return cachedResponse || new Response('Offline - Page not available', {
+    status: 503,
+    statusText: 'Service Unavailable'
+  });
 }
 
-function isAPIRequest(url) {
-  return url.includes('/api/');
+// Helper functions
+function isStaticFile(url) {
+  return STATIC_FILES.includes(url.href) ||
+         (url.origin === self.location.origin && url.pathname.startsWith('/static/'));
 }
 
-function isHTMLRequest(request) {
-  return request.headers.get('accept').includes('text/html');
+function isPublicAPIRequest(url) {
+  return url.origin === self.location.origin &&
+         PUBLIC_API_ROUTES.some(route => route.test(url.pathname));
 }
 
 // Background sync for offline actions
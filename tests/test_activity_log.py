@@ -0,0 +1,54 @@
+import unittest
+
+from activity_log import clamp_limit, fetch_activity
+
+
+class FakeCursor:
+    def __init__(self, rows, log):
+        self.rows = rows
+        self.log = log
+
+    def execute(self, query, params=()):
+        self.log.append((" ".join(query.split()), list(params)))
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.rows, self.queries)
+
+
+class FetchActivityTests(unittest.TestCase):
+    def test_first_page_reads_newest_by_primary_key(self):
+        connection = FakeConnection([{"id": n} for n in (9, 8, 7)])
+        events, has_more = fetch_activity(connection, limit=2)
+        self.assertEqual([e["id"] for e in events], [9, 8])
+        self.assertTrue(has_more)
+        query, params = connection.queries[0]
+        self.assertTrue(query.endswith("FROM activity_events ORDER BY id DESC LIMIT %s"))
+        self.assertEqual(params, [3])
+
+    def test_before_and_since_bound_the_id_range(self):
+        connection = FakeConnection([])
+        self.assertEqual(fetch_activity(connection, limit=10, before=50, since=40), ([], False))
+        query, params = connection.queries[0]
+        self.assertIn("WHERE id < %s AND id > %s", query)
+        self.assertEqual(params, [50, 40, 11])
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(clamp_limit(None), 20)
+        self.assertEqual(clamp_limit(-5), 1)
+        self.assertEqual(clamp_limit(10000), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import datetime
+import unittest
+from unittest import mock
+
+import core
+from core import app
+import routes.public_routes  # noqa: F401
+
+LAWYER = {"id": 3, "name": "Asha Rao", "rating": 4.5, "status": "verified",
+          "updated_at": datetime.datetime(2026, 1, 1, 10, 0), "photo": "https://example.com/a.jpg"}
+
+
+class LawyerApiConditionalTests(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.version = "12-2026-01-01T10:00:00"
+        self.addCleanup(mock.patch.stopall)
+        mock.patch("routes.public_routes.lawyer_data_version", side_effect=lambda status: self.version).start()
+        self.search = mock.patch("routes.public_routes.search_lawyers_in_db", return_value=([LAWYER], 1, None)).start()
+
+    def test_directory_revalidates_without_querying(self):
+        first = self.client.get("/api/lawyers?sort=name")
+        etag = first.headers["ETag"]
+        self.assertIn("no-cache", first.headers["Cache-Control"])
+
+        cached = self.client.get("/api/lawyers?sort=name", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.search.call_count, 1)
+
+        # Another query string or a data change gets a new validator
+        self.assertEqual(self.client.get("/api/lawyers?sort=rating", headers={"If-None-Match": etag}).status_code, 200)
+        self.version = "13-2026-01-01T10:05:00"
+        self.assertEqual(self.client.get("/api/lawyers?sort=name", headers={"If-None-Match": etag}).status_code, 200)
+
+    def test_search_accepts_weak_validators(self):
+        etag = self.client.get("/api/lawyers/search?q=tax").headers["ETag"]
+        weak = "W/" + etag
+        self.assertEqual(self.client.get("/api/lawyers/search?q=tax", headers={"If-None-Match": weak}).status_code, 304)
+
+    def test_profile_validator_follows_the_row(self):
+        with mock.patch("routes.public_routes.get_lawyer_by_id", return_value=LAWYER):
+            first = self.client.get("/api/lawyers/3")
+            self.assertEqual(first.headers["Cache-Control"], "public, max-age=60")
+            etag = first.headers["ETag"]
+            self.assertEqual(self.client.get("/api/lawyers/3", headers={"If-None-Match": etag}).status_code, 304)
+        with mock.patch("routes.public_routes.get_lawyer_by_id", return_value=dict(LAWYER, rating=4.6)):
+            self.assertEqual(self.client.get("/api/lawyers/3", headers={"If-None-Match": etag}).status_code, 200)
+
+    def test_profile_validator_changes_when_photo_variants_appear(self):
+        sources = {"src": "/uploads/x-160.jpg"}
+        with mock.patch("routes.public_routes.get_lawyer_by_id", return_value=LAWYER):
+            etag = self.client.get("/api/lawyers/3").headers["ETag"]
+            with mock.patch("routes.public_routes.with_photo_sources", side_effect=lambda lawyer: dict(lawyer, photo_sources=sources)):
+                response = self.client.get("/api/lawyers/3", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["lawyer"]["photo_sources"], sources)
+
+
+class LawyerDataVersionTests(unittest.TestCase):
+    def test_writes_within_one_second_change_the_version(self):
+        # COUNT(*) and MAX(updated_at) are identical for two updates in the same second
+        with mock.patch.object(core, "_fetch_lawyer_data_version", return_value="12-2026-01-01T10:00:00"):
+            first = core.lawyer_data_version("verified")
+            core.directory_cache.invalidate()
+            second = core.lawyer_data_version("verified")
+        self.assertIsNotNone(first)
+        self.assertNotEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
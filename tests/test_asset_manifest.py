@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from flask import Flask, url_for
+
+from asset_manifest import IMMUTABLE_MAX_AGE, AssetManifest, build_manifest
+from compression import Compression
+
+
+class AssetManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.static = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static.cleanup)
+        os.makedirs(os.path.join(self.static.name, "js"))
+        self.write("js/app.js", b"console.log('v1');")
+        self.write("service-worker.js", b"self.skipWaiting();")
+
+        self.app = Flask(__name__, static_folder=self.static.name, static_url_path="/static")
+        Compression(self.app)
+        self.assets = AssetManifest(self.app, auto_reload=True)
+        self.client = self.app.test_client()
+
+    def write(self, name, data):
+        with open(os.path.join(self.static.name, name), "wb") as f:
+            f.write(data)
+
+    def url(self, filename):
+        with self.app.test_request_context():
+            return url_for("static", filename=filename)
+
+    def test_url_for_emits_content_hashed_names(self):
+        url = self.url("js/app.js")
+        self.assertRegex(url, r"^/static/js/app\.[0-9a-f]{10}\.js$")
+        self.assertEqual(self.url("service-worker.js"), "/static/service-worker.js")
+        self.assertNotIn("service-worker.js", build_manifest(self.static.name))
+
+    def test_fingerprinted_urls_are_immutable(self):
+        with self.client.get(self.url("js/app.js")) as response:
+            self.assertEqual(response.data, b"console.log('v1');")
+            self.assertTrue(response.cache_control.immutable)
+            self.assertEqual(response.cache_control.max_age, IMMUTABLE_MAX_AGE)
+        with self.client.get("/static/js/app.js") as response:
+            self.assertFalse(response.cache_control.immutable)
+
+    def test_changed_asset_gets_new_url_and_version(self):
+        old_url, old_version = self.url("js/app.js"), self.assets.version
+        self.write("js/app.js", b"console.log('v2');")
+        os.utime(os.path.join(self.static.name, "js/app.js"), (1e10, 1e10))
+        self.assertNotEqual(self.url("js/app.js"), old_url)
+        self.assertNotEqual(self.assets.version, old_version)
+        # Pages rendered before the change still get the file, without the immutable promise
+        with self.client.get(old_url) as response:
+            self.assertEqual(response.data, b"console.log('v2');")
+            self.assertFalse(response.cache_control.immutable)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import core
+from cache import CacheNamespace, MemoryBackend, RedisBackend, create_cache_backend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Just enough of the redis-py client API for RedisBackend"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+
+class CacheNamespaceTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = MemoryBackend(maxsize=2, clock=self.clock)
+        self.cache = CacheNamespace(self.backend, "things", ttl=10)
+
+    def test_hits_until_ttl_expires(self):
+        calls = []
+        loader = lambda: calls.append(1) or len(calls)
+        self.assertEqual(self.cache.get_or_load("a", loader), 1)
+        self.assertEqual(self.cache.get_or_load("a", loader), 1)
+        self.clock.now = 11
+        self.assertEqual(self.cache.get_or_load("a", loader), 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.get_or_load("a", lambda: "A")
+        self.cache.get_or_load("b", lambda: "B")
+        self.cache.get_or_load("a", lambda: "A2")
+        self.cache.get_or_load("c", lambda: "C")
+        self.assertEqual(self.cache.get_or_load("a", lambda: "A3"), "A")
+        self.assertEqual(self.cache.get_or_load("b", lambda: "B2"), "B2")
+        self.assertEqual(self.backend.info()["evictions"], 2)
+
+    def test_invalidate_and_delete(self):
+        self.cache.get_or_load("a", lambda: "old")
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get_or_load("a", lambda: "new"), "new")
+        self.cache.delete("a")
+        self.assertEqual(self.cache.get_or_load("a", lambda: "newer"), "newer")
+
+    def test_failed_and_empty_loads_are_not_cached(self):
+        def boom():
+            raise RuntimeError("db down")
+
+        with self.assertRaises(RuntimeError):
+            self.cache.get_or_load("a", boom)
+        self.assertIsNone(self.cache.get_or_load("a", lambda: None))
+        self.assertEqual(self.cache.get_or_load("a", lambda: "ok"), "ok")
+        self.assertEqual(self.cache.stats()["load_errors"], 1)
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = CacheNamespace(MemoryBackend(), "slow", ttl=60)
+        started = threading.Event()
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            started.set()
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", slow_loader)))
+                   for _ in range(5)]
+        threads[0].start()
+        started.wait(1)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join(1)
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_load_racing_an_invalidation_is_not_served(self):
+        def loader():
+            self.cache.invalidate()
+            return "stale"
+
+        self.assertEqual(self.cache.get_or_load("a", loader), "stale")
+        self.assertEqual(self.cache.get_or_load("a", lambda: "fresh"), "fresh")
+
+    def test_memory_versions_start_from_a_process_seed(self):
+        other = CacheNamespace(MemoryBackend(), "things", ttl=10)
+        self.assertNotEqual(self.cache.version(), 0)
+        self.assertIsNotNone(other.version())
+
+
+class SharedBackendTests(unittest.TestCase):
+    def test_invalidation_in_one_worker_evicts_everywhere(self):
+        client = FakeRedis()
+        worker_a = CacheNamespace(RedisBackend("redis://unused", client=client), "lawyers", ttl=60)
+        worker_b = CacheNamespace(RedisBackend("redis://unused", client=client), "lawyers", ttl=60)
+
+        self.assertEqual(worker_a.get_or_load(7, lambda: {"rating": 4}), {"rating": 4})
+        self.assertEqual(worker_b.get_or_load(7, lambda: {"rating": 0}), {"rating": 4})
+
+        worker_a.invalidate()
+        self.assertEqual(worker_b.get_or_load(7, lambda: {"rating": 5}), {"rating": 5})
+
+    def test_backend_errors_fall_back_to_loader(self):
+        class BrokenClient(FakeRedis):
+            def get(self, key):
+                raise ConnectionError("refused")
+
+        cache = CacheNamespace(RedisBackend("redis://unused", client=BrokenClient()), "x", ttl=60)
+        self.assertEqual(cache.get_or_load("k", lambda: "direct"), "direct")
+        self.assertEqual(cache.stats()["backend_errors"], 1)
+
+    def test_memory_backend_is_the_default(self):
+        self.assertIsInstance(create_cache_backend({}), MemoryBackend)
+
+
+class ProfileCacheTests(unittest.TestCase):
+    def test_profile_read_before_a_write_commits_is_not_served_after_it(self):
+        lawyer_id = 9001
+        rows = iter([{"id": lawyer_id, "rating": 4.0}, {"id": lawyer_id, "rating": 4.5}])
+
+        def fetch_during_write(_):
+            row = next(rows)
+            if row["rating"] == 4.0:
+                # The write commits while this request still holds the old row
+                core.profile_cache.invalidate_item(lawyer_id)
+            return row
+
+        with mock.patch.object(core, "_fetch_lawyer", side_effect=fetch_during_write):
+            self.assertEqual(core.get_lawyer_by_id(lawyer_id)["rating"], 4.0)
+            self.assertEqual(core.get_lawyer_by_id(lawyer_id)["rating"], 4.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from flask import Flask, Response, jsonify
+
+from compression import Compression, accepted_encodings, precompress_static
+
+CSS = b"body { color: #333; }\n" * 100
+
+
+class CompressionTests(unittest.TestCase):
+    def setUp(self):
+        self.static = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static.cleanup)
+        with open(os.path.join(self.static.name, "style.css"), "wb") as f:
+            f.write(CSS)
+
+        app = Flask(__name__, static_folder=self.static.name, static_url_path="/static")
+
+        @app.route("/big")
+        def big():
+            return jsonify({"lawyers": [{"name": "Asha", "city": "Pune"}] * 100})
+
+        @app.route("/small")
+        def small():
+            return jsonify({"ok": True})
+
+        @app.route("/stream")
+        def stream():
+            return Response((b"a,b\n" for _ in range(500)), mimetype="text/csv")
+
+        Compression(app, min_size=500)
+        self.client = app.test_client()
+
+    def test_large_json_is_gzipped_when_accepted(self):
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertIn(b'"Asha"', gzip.decompress(response.data))
+
+        self.assertNotIn("Content-Encoding", self.client.get("/big").headers)
+        self.assertNotIn("Content-Encoding", self.client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers)
+
+    def test_small_and_streamed_responses_are_left_alone(self):
+        self.assertNotIn("Content-Encoding", self.client.get("/small", headers={"Accept-Encoding": "gzip"}).headers)
+        response = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(len(response.data), 2000)
+
+    def test_precompressed_static_files_are_sent_as_is(self):
+        stats = precompress_static(self.static.name)
+        self.assertGreaterEqual(stats["written"], 1)
+        with self.client.get("/static/style.css", headers={"Accept-Encoding": "gzip"}) as response:
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(response.mimetype, "text/css")
+            self.assertEqual(gzip.decompress(response.data), CSS)
+        with self.client.get("/static/style.css") as response:
+            self.assertEqual(response.data, CSS)
+
+    def test_accept_encoding_parsing(self):
+        self.assertEqual(accepted_encodings("identity"), [])
+        self.assertIn("gzip", accepted_encodings("*"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import threading
+import unittest
+from unittest import mock
+
+from db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.resets = 0
+        self.shut_down = False
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise OSError("gone away")
+
+    def is_connected(self):
+        return self.alive and not self.closed
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def reset_session(self):
+        self.resets += 1
+        self.in_transaction = False
+
+    def shutdown(self):
+        self.shut_down = True
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+
+        def connect(**kwargs):
+            conn = FakeConnection()
+            self.created.append(conn)
+            return conn
+
+        self.connect = connect
+
+    def make_pool(self, **kwargs):
+        options = {"size": 2, "max_overflow": 1, "timeout": 0.05}
+        options.update(kwargs)
+        return ConnectionPool({}, connect=self.connect, **options)
+
+    def test_connections_are_reused(self):
+        pool = self.make_pool()
+        first = pool.get_connection()
+        first.close()
+        second = pool.get_connection()
+        second.close()
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(pool.stats()["checkouts"], 2)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_session_is_reset_on_return(self):
+        # Rolls back an open transaction and drops e.g. SET SESSION lock_wait_timeout
+        pool = self.make_pool()
+        conn = pool.get_connection()
+        self.created[0].in_transaction = True
+        conn.close()
+        self.assertEqual(self.created[0].resets, 1)
+        self.assertFalse(self.created[0].in_transaction)
+        self.assertFalse(conn.is_connected())
+
+    def test_connection_that_cannot_be_reset_is_discarded(self):
+        pool = self.make_pool()
+        conn = pool.get_connection()
+        self.created[0].reset_session = mock.Mock(side_effect=OSError("unread result"))
+        conn.close()
+        self.assertTrue(self.created[0].closed)
+        self.assertEqual(pool.stats()["idle"], 0)
+        self.assertEqual(pool.stats()["in_use"], 0)
+
+    def test_dead_connection_is_replaced_on_checkout(self):
+        pool = self.make_pool()
+        pool.get_connection().close()
+        self.created[0].alive = False
+        pool.get_connection().close()
+        self.assertEqual(len(self.created), 2)
+        self.assertEqual(pool.stats()["failed_health_checks"], 1)
+
+    def test_overflow_connections_are_not_kept(self):
+        pool = self.make_pool()
+        held = [pool.get_connection() for _ in range(3)]
+        self.assertEqual(pool.stats()["overflow_in_use"], 1)
+        for conn in held:
+            conn.close()
+        stats = pool.stats()
+        self.assertEqual(stats["idle"], 2)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertEqual(stats["connections_discarded"], 1)
+
+    def test_discarded_connection_is_shut_down_and_replaced(self):
+        pool = self.make_pool(size=1, max_overflow=0)
+        conn = pool.get_connection()
+        conn.discard()
+        self.assertTrue(self.created[0].shut_down)
+        self.assertFalse(self.created[0].closed)
+        self.assertEqual(pool.stats()["in_use"], 0)
+        pool.get_connection().close()
+        self.assertEqual(len(self.created), 2)
+
+    def test_checkout_times_out_when_exhausted(self):
+        pool = self.make_pool(size=1, max_overflow=0)
+        held = pool.get_connection()
+        with self.assertRaises(PoolTimeoutError):
+            pool.get_connection()
+        held.close()
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(size=1, max_overflow=0, timeout=2)
+        held = pool.get_connection()
+        result = {}
+
+        def waiter():
+            conn = pool.get_connection()
+            result["conn"] = conn
+            conn.close()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        held.close()
+        thread.join(2)
+        self.assertIn("conn", result)
+        self.assertEqual(len(self.created), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+
+from mysql.connector import Error
+
+import core
+from core import app
+
+
+class FakeCursor:
+    lastrowid = 42
+
+    def execute(self, query, params=None):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor()
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def is_connected(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+LAWYER = {
+    "name": "Asha Rao", "specialization": "Family Law", "years_experience": 8, "rating": 0, "bio": "b" * 60,
+    "photo": "", "phone": "+919876543210", "email": "asha@example.com", "location": "Pune", "keywords": [],
+}
+
+
+class AddLawyerTransactionTests(unittest.TestCase):
+    def test_failure_after_insert_rolls_back(self):
+        connection = FakeConnection()
+        with app.test_request_context(), \
+                mock.patch.object(core, "get_db_connection", return_value=connection), \
+                mock.patch.object(core, "check_duplicate_lawyer", return_value=False), \
+                mock.patch.object(core, "add_references"), \
+                mock.patch.object(core, "record_change", side_effect=Error("counter update failed")):
+            self.assertFalse(core.add_lawyer_to_db(dict(LAWYER)))
+        self.assertEqual(connection.commits, 0)
+        self.assertGreaterEqual(connection.rollbacks, 1)
+        self.assertTrue(connection.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from datetime import date, datetime
+
+from exports import (EXPORTS, ExportCursor, ExportError, ExportJobs, build_export_query, check_export,
+                     csv_chunks, export_filename, parse_export_filters, write_export)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.executed = None
+        self.closed = False
+
+    def execute(self, query, params=()):
+        self.executed = (query, params)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+        self.closed = False
+        self.consumed = False
+        self.discarded = False
+
+    def cursor(self, **kwargs):
+        assert kwargs.get("buffered") is False
+        return self.cursor_obj
+
+    def consume_results(self):
+        self.consumed = True
+
+    def discard(self):
+        self.discarded = True
+
+    def close(self):
+        self.closed = True
+
+
+def message_rows(count):
+    return [(i, f"Name {i}", f"n{i}@example.com", None, "Subject", "Civil", "low", "new", "Hi, there",
+             datetime(2024, 1, 2, 3, 4, 5)) for i in range(1, count + 1)]
+
+
+class ExportQueryTests(unittest.TestCase):
+    def test_filters_become_parameters(self):
+        filters = parse_export_filters({"from": "2024-01-01", "to": "2024-01-31", "status": "new"})
+        query, params = build_export_query("contact_messages", filters)
+        self.assertIn("created_at >= %s", query)
+        self.assertIn("created_at < %s", query)
+        self.assertIn("status = %s", query)
+        # `to` is inclusive, so the bound is the next day
+        self.assertEqual(params, [date(2024, 1, 1), date(2024, 2, 1), "new"])
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ExportError):
+            parse_export_filters({"from": "yesterday"})
+        with self.assertRaises(ExportError):
+            build_export_query("users", {})
+        with self.assertRaises(ExportError):
+            check_export("lawyers", "xlsx")
+
+    def test_filename(self):
+        filters = {"status": "new", "from": date(2024, 1, 1)}
+        self.assertEqual(export_filename("contact_messages", "csv", filters),
+                         "contact_messages-new-2024-01-01_.csv")
+
+
+class ExportWriterTests(unittest.TestCase):
+    def test_csv_streams_every_batch(self):
+        connection = FakeConnection(message_rows(5))
+        export = ExportCursor(connection, "contact_messages", {}, batch_size=2)
+        body = io.BytesIO()
+        self.assertEqual(write_export(export, "csv", body), 5)
+        export.close()
+        lines = body.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(lines[0], ",".join(name for name, _, _ in EXPORTS["contact_messages"]["columns"]))
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[1], '1,Name 1,n1@example.com,,Subject,Civil,low,new,"Hi, there",2024-01-02T03:04:05')
+        self.assertFalse(connection.consumed)
+        self.assertTrue(connection.closed)
+
+    def test_abandoned_export_discards_connection_without_draining(self):
+        connection = FakeConnection(message_rows(5))
+        export = ExportCursor(connection, "contact_messages", {}, batch_size=2)
+        chunks = csv_chunks(export.columns, export.batches())
+        next(chunks)
+        next(chunks)
+        export.close()
+        self.assertFalse(connection.consumed)
+        self.assertTrue(connection.discarded)
+
+    def test_columnar_formats_need_pyarrow(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            with self.assertRaises(ExportError):
+                check_export("lawyers", "parquet")
+        else:
+            check_export("lawyers", "parquet")
+
+
+class ExportJobsTests(unittest.TestCase):
+    def test_job_writes_file_and_status(self):
+        with tempfile.TemporaryDirectory() as folder:
+            jobs = ExportJobs(folder, lambda: FakeConnection(message_rows(3)), workers=1)
+            job = jobs.submit("contact_messages", "csv", {})
+            deadline = time.time() + 5
+            while jobs.get(job["id"])["status"] in ("queued", "running") and time.time() < deadline:
+                time.sleep(0.01)
+            job = jobs.get(job["id"])
+            self.assertEqual(job["status"], "done")
+            self.assertEqual(job["rows"], 3)
+            self.assertTrue(os.path.exists(jobs.file_path(job)))
+            self.assertIsNone(jobs.get("../etc/passwd"))
+
+
+if __name__ == "__main__":
+    unittest.main()
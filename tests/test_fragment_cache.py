@@ -0,0 +1,50 @@
+import unittest
+
+from flask import Flask, render_template_string
+
+from cache import CacheNamespace, MemoryBackend
+from fragment_cache import FragmentCache
+
+TEMPLATE = (
+    "{% for lawyer in lawyers %}"
+    "{% call cached_fragment('card', lawyer) %}"
+    "[{{ render(lawyer) }} {{ hole('user_name') }}]"
+    "{% endcall %}"
+    "{% endfor %}"
+)
+
+
+class FragmentCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.fragments = FragmentCache(CacheNamespace(MemoryBackend(), "fragments", 60), salt="t1")
+        self.fragments.install(self.app)
+        self.renders = []
+
+    def render(self, lawyers, user_name=None):
+        def render_lawyer(lawyer):
+            self.renders.append(lawyer["id"])
+            return lawyer["name"]
+
+        with self.app.test_request_context():
+            return render_template_string(TEMPLATE, lawyers=lawyers, user_name=user_name, render=render_lawyer)
+
+    def test_fragments_render_once_and_fill_holes_per_request(self):
+        lawyers = [{"id": 1, "name": "Asha", "rating": 4.5}, {"id": 2, "name": "Ravi", "rating": 4.0}]
+        self.assertEqual(self.render(lawyers, "<Meera>"), "[Asha &lt;Meera&gt;][Ravi &lt;Meera&gt;]")
+        self.assertEqual(self.render(lawyers), "[Asha ][Ravi ]")
+        self.assertEqual(self.renders, [1, 2])
+
+    def test_rating_change_and_invalidation_rerender_one_lawyer(self):
+        lawyers = [{"id": 1, "name": "Asha", "rating": 4.5}, {"id": 2, "name": "Ravi", "rating": 4.0}]
+        self.render(lawyers)
+        self.render([dict(lawyers[0], rating=4.6), lawyers[1]])
+        self.assertEqual(self.renders, [1, 2, 1])
+
+        self.fragments.invalidate(2)
+        self.render([dict(lawyers[0], rating=4.6), dict(lawyers[1], name="Ravi K")])
+        self.assertEqual(self.renders, [1, 2, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+import unittest
+
+from geo_data import StatesDistrictsDataset
+
+
+class StatesDistrictsDatasetTests(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.write({"Bihar": ["Patna", "Aurangabad"], "Maharashtra": ["Pune", "Aurangabad"]}, mtime=1000)
+        self.dataset = StatesDistrictsDataset(self.path, check_interval=0)
+
+    def write(self, states, mtime):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"states": states}, f)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_indexes(self):
+        data = self.dataset.get()
+        self.assertEqual(data.canonical_state(" bihar "), "Bihar")
+        self.assertEqual(data.districts("MAHARASHTRA"), ("Pune", "Aurangabad"))
+        self.assertEqual(data.states_for_district("aurangabad"), ("Bihar", "Maharashtra"))
+        self.assertIsNone(data.districts_body("Goa"))
+        self.assertEqual(json.loads(data.states_body), {"success": True, "states": ["Bihar", "Maharashtra"]})
+
+    def test_reloads_when_mtime_changes(self):
+        first = self.dataset.get()
+        self.assertIs(self.dataset.get(), first)
+
+        self.write({"Goa": ["North Goa"]}, mtime=2000)
+        second = self.dataset.get()
+        self.assertEqual(second.states, ("Goa",))
+        self.assertNotEqual(second.etag, first.etag)
+
+    def test_broken_rewrite_keeps_last_good_snapshot(self):
+        first = self.dataset.get()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{truncated")
+        os.utime(self.path, (3000, 3000))
+        self.assertIs(self.dataset.get(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
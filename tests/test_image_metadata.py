@@ -0,0 +1,78 @@
+import struct
+import unittest
+import zlib
+
+from image_metadata import strip_metadata
+
+
+def jpeg_segment(marker, body):
+    return bytes([0xFF, marker]) + struct.pack(">H", len(body) + 2) + body
+
+
+def exif_block(orientation):
+    # Little-endian TIFF with IFD0: orientation, then a GPS IFD pointer whose target carries the coordinates
+    entries = struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack("<HHII", 0x8825, 4, 1, 38)
+    return b"Exif\x00\x00" + b"II*\x00" + struct.pack("<IH", 8, 2) + entries + struct.pack("<I", 0) + b"GPS 18.52N 73.85E"
+
+
+JFIF = jpeg_segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+ICC = jpeg_segment(0xE2, b"ICC_PROFILE\x00\x01\x01profile")
+DQT = jpeg_segment(0xDB, b"\x00" + bytes(range(64)))
+# Entropy-coded data with a stuffed 0xFF00 and a restart marker, which are not segment boundaries
+SCAN = jpeg_segment(0xDA, b"\x01\x01\x00\x00\x3f\x00") + b"\x12\xff\x00\x34\xff\xd0\x56"
+
+
+def jpeg(*segments):
+    return b"\xff\xd8" + b"".join(segments) + SCAN + b"\xff\xd9"
+
+
+def png_chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+PNG_IHDR = png_chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+PNG_IDAT = png_chunk(b"IDAT", zlib.compress(b"\x00\xff\x00\x00"))
+PNG_IEND = png_chunk(b"IEND", b"")
+
+
+class JpegTests(unittest.TestCase):
+    def test_exif_and_comments_are_removed(self):
+        original = jpeg(JFIF, jpeg_segment(0xE1, exif_block(1)),
+                        jpeg_segment(0xE1, b"http://ns.adobe.com/xap/1.0/\x00<x:xmpmeta/>"),
+                        ICC, jpeg_segment(0xED, b"Photoshop 3.0\x00IPTC"), jpeg_segment(0xFE, b"taken at home"), DQT)
+        stripped = strip_metadata(original + b"trailing thumbnail", "jpeg")
+        self.assertEqual(stripped, jpeg(JFIF, ICC, DQT))
+        self.assertNotIn(b"GPS", stripped)
+
+    def test_orientation_is_kept(self):
+        stripped = strip_metadata(jpeg(JFIF, jpeg_segment(0xE1, exif_block(6)), DQT), "jpeg")
+        self.assertTrue(stripped.startswith(b"\xff\xd8" + JFIF + b"\xff\xe1"))
+        self.assertNotIn(b"GPS", stripped)
+        self.assertIn(struct.pack(">HHIH", 0x0112, 3, 1, 6), stripped)
+        self.assertTrue(stripped.endswith(DQT + SCAN + b"\xff\xd9"))
+
+    def test_truncated_image_is_rejected(self):
+        with self.assertRaises(ValueError):
+            strip_metadata(jpeg(JFIF, DQT)[:-30], "jpeg")
+
+
+class PngAndGifTests(unittest.TestCase):
+    def test_png_text_chunks_are_removed(self):
+        original = b"\x89PNG\r\n\x1a\n" + PNG_IHDR + png_chunk(b"tEXt", b"Comment\x00GPS 18.52N") \
+            + png_chunk(b"eXIf", b"MM\x00*") + png_chunk(b"iCCP", b"icc\x00\x00data") + PNG_IDAT + PNG_IEND
+        stripped = strip_metadata(original, "png")
+        self.assertEqual(stripped, b"\x89PNG\r\n\x1a\n" + PNG_IHDR + png_chunk(b"iCCP", b"icc\x00\x00data")
+                         + PNG_IDAT + PNG_IEND)
+
+    def test_gif_comments_and_xmp_are_removed(self):
+        header = b"GIF89a" + struct.pack("<HHBBB", 1, 1, 0x80, 0, 0) + b"\x00\x00\x00\xff\xff\xff"
+        loop = b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+        xmp = b"\x21\xff\x0bXMP DataXMP\x05GPS 1\x00"
+        comment = b"\x21\xfe\x05hello\x00"
+        image = b"\x2c" + struct.pack("<HHHHB", 0, 0, 1, 1, 0) + b"\x02\x02\x4c\x01\x00"
+        stripped = strip_metadata(header + loop + xmp + comment + image + b"\x3b", "gif")
+        self.assertEqual(stripped, header + loop + image + b"\x3b")
+
+
+if __name__ == "__main__":
+    unittest.main()
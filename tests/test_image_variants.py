@@ -0,0 +1,73 @@
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+
+from image_variants import ImageVariants, manifest_name, variant_name
+from upload_store import UploadStore
+
+DIGEST = hashlib.sha256(b"photo").hexdigest()
+KEY = f"{DIGEST}.jpg"
+
+
+class ImageVariantsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = UploadStore(self.tmp.name)
+        self.folder = os.path.dirname(self.store.path_for(KEY))
+        os.makedirs(self.folder)
+        with open(self.store.path_for(KEY), "wb") as f:
+            f.write(b"\xff\xd8\xff photo")
+        self.variants = ImageVariants(self.store)
+
+    def write_manifest(self, variants):
+        for fmt, widths in variants.items():
+            for width in widths:
+                with open(os.path.join(self.folder, variant_name(DIGEST, width, fmt)), "wb") as f:
+                    f.write(b"variant")
+        with open(os.path.join(self.folder, manifest_name(DIGEST)), "w") as f:
+            json.dump({"width": 900, "height": 1200, "variants": variants}, f)
+
+    def test_no_sources_until_variants_exist(self):
+        self.assertIsNone(self.variants.sources(f"/uploads/{KEY}"))
+        self.assertIsNone(self.variants.sources("https://via.placeholder.com/300x300"))
+
+    def test_sources_list_best_formats_first(self):
+        self.write_manifest({"jpg": [160, 320], "webp": [160, 320], "avif": [160, 320]})
+        sources = self.variants.sources(f"/uploads/{KEY}")
+        self.assertEqual(sources["src"], f"/uploads/{DIGEST}-160.jpg")
+        self.assertEqual(sources["srcset"]["webp"], f"/uploads/{DIGEST}-160.webp 160w, /uploads/{DIGEST}-320.webp 320w")
+        self.assertEqual([source["type"] for source in sources["sources"]], ["image/avif", "image/webp"])
+        self.assertEqual((sources["width"], sources["height"]), (900, 1200))
+
+    def test_variants_resolve_in_the_store_and_go_with_their_photo(self):
+        self.write_manifest({"jpg": [160], "webp": [160]})
+        self.assertEqual(self.store.path_for(f"{DIGEST}-160.webp"), os.path.join(self.folder, f"{DIGEST}-160.webp"))
+        self.assertIsNone(self.store.path_for(f"{DIGEST}-160.exe"))
+        self.store._remove(self.store.path_for(KEY))
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_submit_skips_documents_and_missing_pillow(self):
+        self.assertFalse(self.variants.submit(f"{DIGEST}.pdf"))
+        if importlib.util.find_spec("PIL") is None:
+            self.assertFalse(self.variants.submit(KEY))
+
+    def test_on_ready_runs_only_after_a_successful_render(self):
+        ready = []
+        variants = ImageVariants(self.store, on_ready=ready.append)
+        failed = Future()
+        failed.set_exception(OSError("cannot identify image file"))
+        with self.assertLogs(level="ERROR"):
+            variants._finished(KEY, failed)
+        done = Future()
+        done.set_result({})
+        variants._finished(KEY, done)
+        self.assertEqual(ready, [KEY])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from flask import Flask
+
+import json_provider
+from json_provider import FastJSONProvider
+
+LAWYER = {"id": 1, "rating": Decimal("4.50"), "consultation_fee": Decimal("1500.00"),
+          "created_at": datetime(2026, 1, 2, 3, 4, 5), "enrolled_on": date(2010, 6, 1), "keywords": ["tax"]}
+EXPECTED = {"id": 1, "rating": 4.5, "consultation_fee": 1500.0, "created_at": "2026-01-02T03:04:05+00:00",
+            "enrolled_on": "2010-06-01", "keywords": ["tax"]}
+
+
+class FastJSONProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+
+    def encode(self):
+        with self.app.test_request_context():
+            return self.app.json.dumps(LAWYER), self.app.json.response({"lawyers": [LAWYER]}).get_data()
+
+    def test_decimal_and_dates_are_native(self):
+        text, body = self.encode()
+        self.assertEqual(json.loads(text), EXPECTED)
+        self.assertEqual(json.loads(body), {"lawyers": [EXPECTED]})
+        self.assertEqual(self.app.json.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+
+    def test_stdlib_fallback_gives_the_same_values(self):
+        fast = self.encode()
+        with mock.patch.object(json_provider, "orjson", None):
+            slow = self.encode()
+        self.assertEqual([json.loads(part) for part in fast], [json.loads(part) for part in slow])
+
+    def test_naive_datetimes_are_sent_as_utc(self):
+        value = {"created_at": datetime(2026, 1, 2, 3, 4, 5)}
+        for orjson in (json_provider.orjson, None):
+            with mock.patch.object(json_provider, "orjson", orjson):
+                text = self.app.json.dumps(value)
+            self.assertEqual(json.loads(text)["created_at"], "2026-01-02T03:04:05+00:00")
+            self.assertEqual(datetime.fromisoformat(json.loads(text)["created_at"]).utcoffset(), timedelta(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import unittest
+
+from lawyer_import import ImportFileError, import_lawyers, parse_import_file, validate_rows
+
+
+def lawyer_row(number, **overrides):
+    row = {
+        "name": f"Advocate {number}",
+        "specialization": "Criminal Law",
+        "years_experience": "5",
+        "bio": "Practising advocate",
+        "phone": f"98765{number:05d}",
+        "email": f"Advocate{number}@Example.com",
+        "location": "Pune",
+    }
+    row.update(overrides)
+    return row
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.result = []
+
+    def execute(self, query, params=()):
+        self.connection.queries.append((query, list(params)))
+        if query.startswith("SELECT email, phone FROM lawyers"):
+            self.result = list(self.connection.existing)
+        elif query.startswith("SELECT id, email FROM lawyers"):
+            self.result = [(self.connection.ids[email], email) for email in params if email in self.connection.ids]
+        else:
+            self.result = []
+
+    def executemany(self, query, rows):
+        self.connection.executemany.append((query, list(rows)))
+        if query.startswith("INSERT INTO lawyers"):
+            for row in rows:
+                self.connection.ids[row[9]] = len(self.connection.ids) + 100
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, existing=()):
+        self.existing = list(existing)
+        self.queries = []
+        self.executemany = []
+        self.ids = {}
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+
+class ParseImportFileTests(unittest.TestCase):
+    def test_csv_headers_are_normalized(self):
+        rows = parse_import_file(b"\xef\xbb\xbfName, Email\nA,a@example.com\n", "lawyers.csv")
+        self.assertEqual(rows, [{"name": "A", "email": "a@example.com"}])
+
+    def test_json_list_or_envelope(self):
+        self.assertEqual(parse_import_file(b'[{"name": "A"}]'), [{"name": "A"}])
+        self.assertEqual(parse_import_file(b'{"lawyers": [{"name": "A"}]}'), [{"name": "A"}])
+        with self.assertRaises(ImportFileError):
+            parse_import_file(b'{"name": "A"}', "lawyers.json")
+
+
+class ValidateRowsTests(unittest.TestCase):
+    def test_reports_every_problem_per_row(self):
+        lawyers, errors = validate_rows([
+            lawyer_row(1),
+            lawyer_row(2, email="not-an-email", years_experience="-1"),
+            lawyer_row(3, phone="12345", rating="7"),
+            lawyer_row(4, email="advocate1@example.com"),
+            "not a row",
+        ])
+        self.assertEqual([number for number, _ in lawyers], [1])
+        self.assertEqual(lawyers[0][1]["phone"], "+919876500001")
+        self.assertEqual(lawyers[0][1]["email"], "advocate1@example.com")
+        by_row = {error["row"]: error["errors"] for error in errors}
+        self.assertEqual(len(by_row[2]), 2)
+        self.assertEqual(len(by_row[3]), 2)
+        self.assertEqual(by_row[4], ["Duplicate of row 1 in this file"])
+        self.assertIn(5, by_row)
+
+
+class ImportLawyersTests(unittest.TestCase):
+    def test_skips_existing_and_inserts_in_batches(self):
+        connection = FakeConnection(existing=[("other@example.com", "9876500002")])
+        rows = [lawyer_row(number) for number in range(1, 6)]
+        report = import_lawyers(connection, rows, batch_size=2)
+
+        self.assertEqual(report["imported"], 4)
+        self.assertEqual([error["row"] for error in report["errors"]], [2])
+        lookups = [query for query, _ in connection.queries if query.startswith("SELECT email, phone")]
+        self.assertEqual(len(lookups), 1)
+        inserts = [rows for query, rows in connection.executemany if query.startswith("INSERT INTO lawyers")]
+        self.assertEqual([len(batch) for batch in inserts], [2, 2])
+        self.assertEqual(json.loads(inserts[0][0][17]), [])
+        activity = [rows for query, rows in connection.executemany if "activity_events" in query]
+        self.assertEqual(len(activity[0]), 4)
+        self.assertTrue(all(lawyer["id"] for lawyer in report["lawyers"]))
+        # One counter update for the whole import
+        counters = [query for query, _ in connection.queries if query.startswith("INSERT INTO stats_counters")]
+        self.assertEqual(len(counters), 1)
+
+    def test_dry_run_writes_nothing(self):
+        connection = FakeConnection()
+        report = import_lawyers(connection, [lawyer_row(1)], dry_run=True)
+        self.assertEqual((report["valid"], report["imported"]), (1, 0))
+        self.assertEqual(connection.executemany, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from werkzeug.datastructures import MultiDict
+
+from lawyer_search import (
+    DIRECTORY_TEXT_COLUMNS,
+    build_lawyer_search_query,
+    build_suggestion_query,
+    decode_cursor,
+    encode_cursor,
+    escape_like,
+    normalize_search_filters,
+    parse_fields,
+    tokenize_search_query,
+)
+
+
+def filters_for(**args):
+    return normalize_search_filters(MultiDict(args))
+
+
+class LawyerSearchQueryTests(unittest.TestCase):
+    def test_defaults_only_filter_on_status_and_experience(self):
+        select_sql, select_params, count_sql, count_params = build_lawyer_search_query(filters_for())
+        self.assertIn("WHERE status = %s AND years_experience BETWEEN %s AND %s", select_sql)
+        self.assertIn("ORDER BY rating DESC, years_experience DESC, id DESC LIMIT %s OFFSET %s", select_sql)
+        self.assertEqual(select_params, ["verified", 0, 100, 10, 0])
+        self.assertEqual(count_params, ["verified", 0, 100])
+        self.assertTrue(count_sql.startswith("SELECT COUNT(*) AS total FROM lawyers WHERE"))
+
+    def test_filters_become_parameters(self):
+        filters = filters_for(q="Tax", specialization="Corporate", location="Pune",
+                              min_rating="4", sort="name", page="3", per_page="20")
+        select_sql, select_params, _, count_params = build_lawyer_search_query(filters)
+        self.assertIn("MATCH(name, specialization, bio) AGAINST (%s IN BOOLEAN MODE)", select_sql)
+        self.assertIn("rating >= %s", select_sql)
+        self.assertIn("ORDER BY name ASC, id ASC", select_sql)
+        self.assertEqual(count_params, ["verified", "+tax*", "%Corporate%", 0, 100, 4.0, "%pune%"])
+        self.assertEqual(select_params, ["+tax*"] + count_params + [20, 40])
+        self.assertNotIn("Tax", select_sql)
+
+    def test_query_is_tokenized_for_fulltext(self):
+        self.assertEqual(tokenize_search_query("The Tax, tax & IP law!"), (["tax", "law"], ["ip"]))
+        select_sql, select_params, _, _ = build_lawyer_search_query(filters_for(q="tax law ip"))
+        self.assertEqual(select_params[0], "+tax* +law*")
+        self.assertIn("(name LIKE %s OR specialization LIKE %s OR bio LIKE %s)", select_sql)
+        self.assertIn("ip%", select_params)
+
+    def test_relevance_sort_needs_a_fulltext_query(self):
+        with_query = build_lawyer_search_query(filters_for(q="divorce", sort="relevance"))[0]
+        self.assertIn("AS relevance FROM lawyers", with_query)
+        self.assertIn("ORDER BY relevance DESC", with_query)
+        without_query = build_lawyer_search_query(filters_for(sort="relevance"))[0]
+        self.assertNotIn("relevance", without_query)
+
+    def test_directory_listing_is_unpaginated(self):
+        filters = {"query": "mumbai", "sort_by": "name"}
+        select_sql, select_params, count_sql, _ = build_lawyer_search_query(filters, "verified", DIRECTORY_TEXT_COLUMNS)
+        self.assertIn("MATCH(name, specialization, location)", select_sql)
+        self.assertNotIn("LIMIT", select_sql)
+        self.assertIsNone(count_sql)
+        self.assertEqual(select_params, ["+mumbai*", "verified", "+mumbai*"])
+
+    def test_suggestions_use_prefix_matching(self):
+        self.assertIsNone(build_suggestion_query("  "))
+        sql, params = build_suggestion_query("crimi", limit=5)
+        self.assertIn("ORDER BY relevance DESC", sql)
+        self.assertEqual(params, ["+crimi*", "verified", "+crimi*", 5])
+
+    def test_cursor_round_trip(self):
+        row = {"rating": Decimal("4.5"), "years_experience": 12, "id": 7}
+        cursor = encode_cursor("rating", row)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor, "rating"), [Decimal("4.5"), 12, 7])
+
+        recent = encode_cursor("recent", {"created_at": datetime(2024, 5, 1, 10, 30), "id": 3})
+        self.assertEqual(decode_cursor(recent, "recent"), [datetime(2024, 5, 1, 10, 30), 3])
+
+    def test_bad_cursors_are_rejected(self):
+        cursor = encode_cursor("name", {"name": "Asha", "id": 2})
+        for bad, sort in [(cursor, "rating"), ("not-a-cursor", "rating"), ("", "rating")]:
+            with self.assertRaises(ValueError):
+                decode_cursor(bad, sort)
+
+    def test_keyset_page_continues_after_cursor(self):
+        filters = filters_for(cursor="x", per_page="10")
+        filters["after"] = [Decimal("4.5"), 12, 7]
+        select_sql, select_params, count_sql, _ = build_lawyer_search_query(filters)
+        self.assertIn(
+            "((rating < %s) OR (rating = %s AND years_experience < %s) "
+            "OR (rating = %s AND years_experience = %s AND id < %s))",
+            select_sql,
+        )
+        self.assertNotIn("OFFSET", select_sql)
+        self.assertIsNone(count_sql)
+        self.assertEqual(select_params[-7:], [Decimal("4.5"), Decimal("4.5"), 12, Decimal("4.5"), 12, 7, 11])
+
+    def test_field_projection_keeps_sort_keys(self):
+        fields = parse_fields("name, photo,bio_excerpt,password")
+        self.assertEqual(fields, ["id", "name", "photo", "bio_excerpt"])
+        self.assertIsNone(parse_fields("nope"))
+        select_sql = build_lawyer_search_query(filters_for(sort="experience"), fields=fields)[0]
+        self.assertTrue(select_sql.startswith(
+            "SELECT id, name, photo, LEFT(bio, 160) AS bio_excerpt, years_experience, rating FROM lawyers"
+        ))
+
+    def test_paging_is_clamped(self):
+        filters = filters_for(page="-4", per_page="5000")
+        self.assertEqual(filters["page"], 1)
+        self.assertEqual(filters["per_page"], 100)
+
+    def test_unknown_sort_falls_back_to_rating(self):
+        select_sql = build_lawyer_search_query(filters_for(sort="drop table"))[0]
+        self.assertIn("ORDER BY rating DESC", select_sql)
+
+    def test_like_wildcards_are_escaped(self):
+        self.assertEqual(escape_like("100%_a\\b"), "100\\%\\_a\\\\b")
+
+
+if __name__ == "__main__":
+    unittest.main()
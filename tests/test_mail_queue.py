@@ -0,0 +1,120 @@
+import smtplib
+import time
+import unittest
+
+from mail_queue import MailQueue, MemoryOutbox, SMTPSender
+
+CONFIG = {"smtp_server": "localhost", "smtp_port": 2525, "email": "noreply@example.com",
+          "password": "secret", "use_tls": False}
+
+
+class FakeSMTP:
+    """Stand-in SMTP session recording what the sender does"""
+
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.logins = 0
+        self.fail_with = []
+        FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        pass
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if self.fail_with:
+            raise self.fail_with.pop(0)
+        self.sent.append((to_addrs[0], msg))
+
+    def quit(self):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_sender():
+    return SMTPSender(CONFIG, smtp_class=FakeSMTP)
+
+
+class MailQueueTests(unittest.TestCase):
+    def setUp(self):
+        FakeSMTP.instances = []
+        self.clock = FakeClock()
+        self.outbox = MemoryOutbox(clock=self.clock)
+        self.queue = MailQueue(self.outbox, make_sender, workers=1, max_attempts=3,
+                               retry_base_delay=10, poll_interval=0.01)
+
+    def test_batch_reuses_one_authenticated_session(self):
+        for n in range(3):
+            self.queue.enqueue(f"user{n}@example.com", "Hi", "<p>Hello</p>")
+        sender = make_sender()
+        self.assertEqual(self.queue.process_batch(sender), 3)
+        self.assertEqual(len(FakeSMTP.instances), 1)
+        self.assertEqual(FakeSMTP.instances[0].logins, 1)
+        self.assertEqual(len(FakeSMTP.instances[0].sent), 3)
+        self.assertEqual(self.outbox.counts(), {})
+
+    def test_enqueue_many_falls_back_to_memory(self):
+        class DownOutbox(MemoryOutbox):
+            def add_many(self, messages):
+                return None
+
+        queue = MailQueue(DownOutbox(), make_sender, fallback=self.outbox)
+        messages = [(f"user{n}@example.com", "Hi", "body") for n in range(3)]
+        self.assertEqual(queue.enqueue_many(messages), 3)
+        self.assertEqual(queue.stats()["queued_in_memory"], 3)
+        self.assertEqual(self.outbox.counts(), {"pending": 3})
+        self.assertEqual(queue.enqueue_many([]), 0)
+
+    def test_transient_failures_back_off_then_fail(self):
+        self.queue.enqueue("user@example.com", "Hi", "body")
+        sender = make_sender()
+        sender._server = FakeSMTP("localhost", 2525)
+        for attempt in range(3):
+            sender._server.fail_with = [smtplib.SMTPResponseException(451, b"try later")]
+            self.assertEqual(self.queue.process_batch(sender), 1)
+            # Not due again until the backoff delay has passed
+            self.assertEqual(self.queue.process_batch(sender), 0)
+            self.clock.now += 10 * 2 ** attempt * 1.2
+        self.assertEqual(self.outbox.counts(), {"failed": 1})
+        self.assertEqual(self.queue.stats()["retried"], 2)
+
+    def test_permanent_failure_is_not_retried(self):
+        self.queue.enqueue("nobody@example.com", "Hi", "body")
+        sender = make_sender()
+        sender._server = FakeSMTP("localhost", 2525)
+        sender._server.fail_with = [smtplib.SMTPRecipientsRefused({"nobody@example.com": (550, b"no such user")})]
+        self.queue.process_batch(sender)
+        self.assertEqual(self.outbox.counts(), {"failed": 1})
+
+    def test_dropped_session_is_reopened(self):
+        sender = make_sender()
+        sender.send("a@example.com", "Hi", "body")
+        FakeSMTP.instances[0].fail_with = [smtplib.SMTPServerDisconnected()]
+        sender.send("b@example.com", "Hi", "body")
+        self.assertEqual(sender.sessions_opened, 2)
+        self.assertEqual(FakeSMTP.instances[1].sent[0][0], "b@example.com")
+
+    def test_workers_deliver_in_background(self):
+        self.queue.start()
+        self.addCleanup(self.queue.stop)
+        self.queue.enqueue("user@example.com", "Hi", "body")
+        self.queue.notify()
+        deadline = time.monotonic() + 2
+        while self.queue.stats()["sent"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.queue.stats()["sent"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import random
+import threading
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+# Needs a disposable MySQL database configured through the usual DB_* variables
+RUN_MYSQL_TESTS = os.getenv('RUN_MYSQL_TESTS', '').lower() in ('1', 'true', 'yes')
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params=()):
+        self.connection.statements.append((" ".join(query.split()), params))
+
+    def fetchone(self):
+        return dict(self.connection.snapshot)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def close(self):
+        pass
+
+
+class AddRatingTests(unittest.TestCase):
+    def rate(self, rating, old_rating):
+        import core
+        snapshot = {"status": "verified", "specialization": "Civil Law", "rating": Decimal("4.0"),
+                    "total_ratings": 3, "photo": "", "rating_sum": 12, "old_rating": old_rating}
+        connection = FakeConnection(snapshot)
+        with mock.patch.object(core, "get_db_connection", return_value=connection), \
+                mock.patch.object(core, "record_change") as record_change, \
+                mock.patch.object(core, "invalidate_lawyer_directory"):
+            result = core.add_rating(7, rating, "10.0.0.1")
+        self.assertEqual(connection.commits, 1)
+        return result, connection.statements, record_change.call_args[0]
+
+    def test_first_rating_adds_to_the_aggregate(self):
+        result, statements, (_, _, before, after) = self.rate(5, None)
+        self.assertEqual(result, {"rating": 4.3, "total_ratings": 4})
+        # Snapshot and lock, upsert, aggregate: no session variables or VALUES()
+        self.assertEqual(len(statements), 3)
+        self.assertTrue(all("@" not in query and "VALUES(" not in query for query, _ in statements))
+        self.assertEqual(statements[2][1], (4, 17, Decimal("4.3"), 7))
+        self.assertNotIn("old_rating", before)
+        self.assertEqual(after["total_ratings"], 4)
+
+    def test_rerating_replaces_the_previous_rating(self):
+        result, statements, _ = self.rate(1, 4)
+        self.assertEqual(result, {"rating": 3.0, "total_ratings": 3})
+        self.assertEqual(statements[1][1], (7, "10.0.0.1", 1, 1))
+
+
+@unittest.skipUnless(RUN_MYSQL_TESTS, "set RUN_MYSQL_TESTS=1 to run against a MySQL database")
+class RatingConcurrencyTests(unittest.TestCase):
+    def setUp(self):
+        import core
+        self.core = core
+        self.assertTrue(core.init_database())
+        connection = core.get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("""
+            INSERT INTO lawyers (name, specialization, years_experience, bio, phone, email, location)
+            VALUES ('Stress Test', 'Civil Law', 5, 'Rating stress test', '+910000000000', %s, 'Pune')
+        """, (f"stress-{os.getpid()}-{random.getrandbits(32)}@example.com",))
+        connection.commit()
+        self.lawyer_id = cursor.lastrowid
+        cursor.close()
+        connection.close()
+
+    def tearDown(self):
+        connection = self.core.get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("DELETE FROM lawyers WHERE id = %s", (self.lawyer_id,))
+        connection.commit()
+        cursor.close()
+        connection.close()
+
+    def test_concurrent_ratings_keep_aggregates_consistent(self):
+        # 40 voters rate 5 times each from 8 threads, so inserts and re-rates race
+        voters = [f"10.0.0.{n}" for n in range(40)]
+        jobs = [(ip, random.randint(1, 5)) for ip in voters for _ in range(5)]
+        random.shuffle(jobs)
+        failures = []
+
+        def worker(chunk):
+            for ip, rating in chunk:
+                if not self.core.add_rating(self.lawyer_id, rating, ip):
+                    failures.append((ip, rating))
+
+        threads = [threading.Thread(target=worker, args=(jobs[n::8],)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+        connection = self.core.get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*), SUM(rating) FROM lawyer_ratings WHERE lawyer_id = %s", (self.lawyer_id,))
+        count, total = cursor.fetchone()
+        cursor.execute("SELECT total_ratings, rating_sum FROM lawyers WHERE id = %s", (self.lawyer_id,))
+        self.assertEqual(cursor.fetchone(), (count, total))
+        self.assertEqual(count, len(voters))
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,12 @@ class SmokeRouteTests(unittest.TestCase):
 
         service_worker = self.client.get("/service-worker.js")
         self.assertEqual(service_worker.status_code, 200)
+        body = service_worker.get_data(as_text=True)
+        self.assertNotIn("{{", body)
+        self.assertRegex(body, r'"/static/style\.[0-9a-f]{10}\.css"')
+        # The worker runs at root scope but only caches assets and public API reads
+        self.assertNotIn("isHTMLRequest", body)
+        self.assertIn("PUBLIC_API_ROUTES", body)
 
     def test_states_api_works(self):
         response = self.client.get("/api/states")
@@ -31,6 +37,34 @@ class SmokeRouteTests(unittest.TestCase):
         self.assertTrue(data.get("success"))
         self.assertIsInstance(data.get("states"), list)
 
+    def test_states_api_answers_revalidation_with_304(self):
+        first = self.client.get("/api/states")
+        etag = first.headers.get("ETag")
+        self.assertTrue(etag)
+        self.assertIsNotNone(first.headers.get("Last-Modified"))
+
+        cached = self.client.get("/api/states", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b"")
+
+    def test_districts_lookup_is_case_insensitive(self):
+        response = self.client.get("/api/districts/andhra%20pradesh")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Chittoor", response.get_json()["districts"])
+        self.assertEqual(self.client.get("/api/districts/Atlantis").status_code, 404)
+
+    def test_batch_status_validates_decisions(self):
+        self.client.set_cookie("is_admin", "1")
+        for body in [{}, {"ids": [1, 2], "status": "archived"}, {"decisions": [{"id": 1, "status": "approved"},
+                                                                               {"id": 1, "status": "rejected"}]}]:
+            response = self.client.post("/api/applications/batch-status", json=body)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertFalse(response.get_json()["success"])
+
+    def test_batch_status_requires_admin(self):
+        response = self.client.post("/api/applications/batch-status", json={"ids": [1], "status": "approved"})
+        self.assertEqual(response.status_code, 403)
+
 
 if __name__ == "__main__":
     unittest.main()
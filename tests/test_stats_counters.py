@@ -0,0 +1,72 @@
+import unittest
+from decimal import Decimal
+
+from stats_counters import add_to_counters, counter_deltas, summarize
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=()):
+        self.statements.append((query, params))
+
+    def close(self):
+        pass
+
+
+class CounterDeltaTests(unittest.TestCase):
+    def test_new_verified_lawyer(self):
+        deltas = counter_deltas("lawyer", None, {"status": "verified", "specialization": "Tax Law", "total_ratings": 0})
+        self.assertEqual(deltas, {"verified_lawyers": 1, "specialization:Tax Law": 1})
+
+    def test_first_rating_and_rerating(self):
+        before = {"status": "verified", "specialization": "Tax Law", "rating": Decimal("0.0"), "total_ratings": 0}
+        rated = dict(before, rating=Decimal("4.0"), total_ratings=1)
+        self.assertEqual(counter_deltas("lawyer", before, rated), {"rated_lawyers": 1, "rating_tenths": 40})
+        rerated = dict(rated, rating=Decimal("3.5"), total_ratings=2)
+        self.assertEqual(counter_deltas("lawyer", rated, rerated), {"rating_tenths": -5})
+
+    def test_specialization_change_and_unverify(self):
+        before = {"status": "verified", "specialization": "Tax Law", "rating": Decimal("4.5"), "total_ratings": 3}
+        moved = dict(before, specialization="Civil Law")
+        self.assertEqual(counter_deltas("lawyer", before, moved),
+                         {"specialization:Tax Law": -1, "specialization:Civil Law": 1})
+        self.assertEqual(counter_deltas("lawyer", before, dict(before, status="pending")),
+                         {"verified_lawyers": -1, "specialization:Tax Law": -1,
+                          "rated_lawyers": -1, "rating_tenths": -45})
+
+    def test_messages_and_applications(self):
+        self.assertEqual(counter_deltas("message", None, {"status": "new"}), {"total_messages": 1, "new_messages": 1})
+        self.assertEqual(counter_deltas("message", {"status": "new"}, {"status": "read"}), {"new_messages": -1})
+        self.assertEqual(counter_deltas("message", {"status": "read"}, None), {"total_messages": -1})
+        self.assertEqual(counter_deltas("application", {"status": "pending"}, {"status": "approved"}),
+                         {"pending_applications": -1})
+
+
+class SummarizeTests(unittest.TestCase):
+    def test_dashboard_shape(self):
+        stats = summarize({"verified_lawyers": 3, "rated_lawyers": 2, "rating_tenths": 85,
+                           "specialization:Tax Law": 2, "specialization:Civil Law": 1,
+                           "specialization:Family Law": 0, "initialized": 1})
+        self.assertEqual(stats["verified_lawyers"], 3)
+        self.assertEqual(stats["average_rating"], 4.2)
+        self.assertEqual(stats["pending_applications"], 0)
+        self.assertEqual(stats["specialization_distribution"],
+                         [{"specialization": "Civil Law", "count": 1}, {"specialization": "Tax Law", "count": 2}])
+
+    def test_counter_upsert_uses_a_row_alias(self):
+        connection = RecordingConnection()
+        add_to_counters(connection, {"verified_lawyers": 1, "messages_total": 2})
+        [(query, params)] = connection.statements
+        self.assertNotIn("VALUES(", query)
+        self.assertIn("AS new ON DUPLICATE KEY UPDATE value = stats_counters.value + new.value", query)
+        self.assertEqual(params[0::3], ["messages_total", "verified_lawyers"])
+        self.assertEqual(params[2::3], [2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
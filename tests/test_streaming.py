@@ -0,0 +1,92 @@
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from core import app
+from streaming import stream_query
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.closed = False
+
+    def execute(self, query, params=()):
+        pass
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+        self.closed = False
+        self.consumed = False
+        self.discarded = False
+
+    def cursor(self, **kwargs):
+        assert kwargs.get("buffered") is False
+        return self.cursor_obj
+
+    def consume_results(self):
+        self.consumed = True
+
+    def discard(self):
+        self.discarded = True
+
+    def close(self):
+        self.closed = True
+
+
+ROWS = [{"id": n, "rating": Decimal("4.5"), "created_at": datetime(2024, 1, n + 1)} for n in range(5)]
+
+
+class StreamQueryTests(unittest.TestCase):
+    def stream(self, rows, **kwargs):
+        connection = FakeConnection(rows)
+        with app.test_request_context():
+            response = stream_query(connection, "SELECT 1", batch_size=2, **kwargs)
+            body = b"".join(response.iter_encoded()).decode()
+            response.close()
+        return connection, response, body
+
+    def test_bare_array(self):
+        connection, response, body = self.stream(ROWS)
+        data = json.loads(body)
+        self.assertEqual([row["id"] for row in data], [0, 1, 2, 3, 4])
+        # FastJSONProvider writes Decimal as a number and datetime as ISO 8601
+        self.assertEqual(data[0]["rating"], 4.5)
+        self.assertEqual(data[0]["created_at"], "2024-01-01T00:00:00+00:00")
+        self.assertTrue(connection.closed)
+        self.assertFalse(connection.consumed)
+
+    def test_envelope_and_empty_result(self):
+        _, _, body = self.stream(ROWS, key="messages", head={"success": True})
+        self.assertEqual(len(json.loads(body)["messages"]), 5)
+        _, _, body = self.stream([], key="messages", head={"success": True})
+        self.assertEqual(json.loads(body), {"success": True, "messages": []})
+
+    def test_ndjson(self):
+        _, response, body = self.stream(ROWS, ndjson=True, transform=lambda row: {"id": row["id"]})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in body.splitlines()], [{"id": n} for n in range(5)])
+
+    def test_abandoned_stream_discards_connection_without_draining(self):
+        connection = FakeConnection(ROWS)
+        with app.test_request_context():
+            response = stream_query(connection, "SELECT 1", batch_size=2)
+            next(response.iter_encoded())
+            response.close()
+        self.assertFalse(connection.consumed)
+        self.assertTrue(connection.discarded)
+        self.assertFalse(connection.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
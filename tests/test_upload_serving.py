@@ -0,0 +1,71 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from werkzeug.exceptions import NotFound
+
+from core import app
+from upload_serving import IMMUTABLE_MAX_AGE, send_upload
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 8
+DIGEST = hashlib.sha256(PDF).hexdigest()
+KEY = f"{DIGEST}.pdf"
+STORED = os.path.join(DIGEST[:2], DIGEST[2:4], KEY)
+
+
+class SendUploadTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        os.makedirs(os.path.join(self.tmp.name, DIGEST[:2], DIGEST[2:4]))
+        for name in (STORED, "photo_1234.jpg"):
+            with open(os.path.join(self.tmp.name, name), "wb") as f:
+                f.write(PDF)
+
+    def send(self, path, headers=None, **kwargs):
+        with app.test_request_context("/uploads/x", headers=headers or {}):
+            response = send_upload(self.tmp.name, path, **kwargs)
+            response.direct_passthrough = False
+            return response
+
+    def test_content_addressed_files_are_immutable(self):
+        response = self.send(STORED)
+        self.assertEqual(response.get_data(), PDF)
+        self.assertEqual(response.mimetype, "application/pdf")
+        self.assertEqual(response.get_etag(), (DIGEST, False))
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, IMMUTABLE_MAX_AGE)
+        self.assertEqual(self.send(STORED, {"If-None-Match": f'"{DIGEST}"'}).status_code, 304)
+
+    def test_range_requests_return_partial_content(self):
+        response = self.send(STORED, {"Range": "bytes=100-199"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), PDF[100:200])
+        self.assertEqual(response.headers["Content-Range"], f"bytes 100-199/{len(PDF)}")
+
+    def test_older_uploads_get_a_short_max_age(self):
+        response = self.send("photo_1234.jpg", max_age=60)
+        self.assertEqual(response.cache_control.max_age, 60)
+        self.assertFalse(response.cache_control.immutable)
+
+    def test_offload_sends_headers_only(self):
+        response = self.send(STORED, offload="x-accel", accel_prefix="/internal/uploads/store/")
+        self.assertEqual(response.headers["X-Accel-Redirect"], f"/internal/uploads/store/{DIGEST[:2]}/{DIGEST[2:4]}/{KEY}")
+        self.assertEqual(response.get_data(), b"")
+        self.assertEqual(self.send(STORED, {"If-None-Match": f'"{DIGEST}"'}, offload="x-accel").status_code, 304)
+
+        response = self.send(STORED, offload="x-sendfile")
+        self.assertEqual(response.headers["X-Sendfile"], os.path.join(self.tmp.name, STORED))
+        self.assertEqual(response.get_data(), b"")
+        self.assertEqual(self.send(STORED, {"Range": "bytes=0-9"}, offload="x-sendfile").headers["X-Sendfile"],
+                         os.path.join(self.tmp.name, STORED))
+
+    def test_missing_and_escaping_paths_are_not_found(self):
+        for path in ("missing.pdf", "../etc/passwd"):
+            with self.assertRaises(NotFound):
+                self.send(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import errno
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from upload_store import UploadStore, add_references, blob_key
+from uploads import SavedUpload
+
+PDF = b"%PDF-1.4 certificate"
+DIGEST = hashlib.sha256(PDF).hexdigest()
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.result = []
+
+    def execute(self, query, params=()):
+        self.connection.queries.append((query, params))
+        if "refcount = 0" in query and query.startswith("SELECT"):
+            self.result = [(key,) for key, count in self.connection.rows.items() if count == 0]
+        elif query.startswith("SELECT blob_key FROM upload_blobs WHERE blob_key IN"):
+            self.result = [(key,) for key in params if key in self.connection.rows]
+        elif query.startswith("DELETE"):
+            self.connection.rows.pop(params[0], None)
+
+    def executemany(self, query, rows):
+        self.connection.queries.append((query, rows))
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows=None):
+        self.rows = dict(rows or {})
+        self.queries = []
+        self.commits = 0
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class UploadStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.now = time.time()
+        self.store = UploadStore(os.path.join(self.tmp.name, "store"), clock=lambda: self.now)
+
+    def saved(self, data=PDF):
+        path = os.path.join(self.tmp.name, f"upload{len(os.listdir(self.tmp.name))}.pdf")
+        with open(path, "wb") as f:
+            f.write(data)
+        return SavedUpload("document", "cert.pdf", path, len(data), hashlib.sha256(data).hexdigest(), "pdf")
+
+    def test_identical_uploads_are_stored_once_under_fan_out(self):
+        first, second = self.saved(), self.saved()
+        key = self.store.put(first)
+        self.assertEqual(self.store.put(second), key)
+        self.assertEqual(key, f"{DIGEST}.pdf")
+        self.assertEqual(first.path, os.path.join(self.store.folder, DIGEST[:2], DIGEST[2:4], key))
+        self.assertEqual(list(self.store.iter_keys()), [key])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "upload1.pdf")))
+
+    def test_blob_key_accepts_urls_and_rejects_other_names(self):
+        key = f"{DIGEST}.pdf"
+        self.assertEqual(blob_key(f"/uploads/{key}"), key)
+        self.assertIsNone(blob_key("/uploads/photo_1234.jpg"))
+        self.assertIsNone(blob_key("https://via.placeholder.com/300x300"))
+        self.assertIsNone(self.store.path_for("../../etc/passwd"))
+
+    def test_references_are_counted_only_for_store_keys(self):
+        connection = FakeConnection()
+        add_references(connection, [f"/uploads/{DIGEST}.pdf", "https://example.com/me.jpg", None])
+        [(query, rows)] = connection.queries
+        self.assertIn("ON DUPLICATE KEY UPDATE refcount = refcount + 1", query)
+        self.assertEqual(rows, [(f"{DIGEST}.pdf",)])
+
+    def test_garbage_collection_spares_referenced_and_recent_files(self):
+        referenced = self.store.put(self.saved(b"%PDF referenced"))
+        released = self.store.put(self.saved(b"%PDF released"))
+        orphan = self.store.put(self.saved(b"%PDF orphan"))
+        recent = self.store.put(self.saved(b"%PDF recent"))
+        for key in (referenced, released, orphan):
+            os.utime(self.store.path_for(key), (self.now - 7200, self.now - 7200))
+        connection = FakeConnection({referenced: 2, released: 0})
+
+        stats = self.store.collect_garbage(connection, grace=3600)
+
+        self.assertEqual((stats["unreferenced"], stats["orphans"]), (1, 1))
+        self.assertEqual(sorted(self.store.iter_keys()), sorted([referenced, recent]))
+        self.assertNotIn(released, connection.rows)
+
+    def test_upload_replacing_a_file_being_collected_is_kept(self):
+        key = self.store.put(self.saved(b"%PDF orphan"))
+        path = self.store.path_for(key)
+        os.utime(path, (self.now - 7200, self.now - 7200))
+        is_old = self.store._is_old
+        checks = []
+
+        def upload_lands_after_age_check(checked, grace):
+            old = is_old(checked, grace)
+            if checked == path:
+                checks.append(old)
+                if len(checks) == 2:
+                    # put() of the same content between the last age check and the delete
+                    self.store.put(self.saved(b"%PDF orphan"))
+            return old
+
+        with mock.patch.object(self.store, "_is_old", side_effect=upload_lands_after_age_check):
+            self.store.collect_garbage(FakeConnection(), grace=3600)
+
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(os.listdir(os.path.dirname(path)), [key])
+
+    def test_put_falls_back_to_copy_across_filesystems(self):
+        upload = self.saved()
+        real_replace = os.replace
+
+        def replace(src, dst):
+            if src == os.path.join(self.tmp.name, "upload0.pdf"):
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            return real_replace(src, dst)
+
+        with mock.patch("upload_store.os.replace", side_effect=replace):
+            key = self.store.put(upload)
+        with open(self.store.path_for(key), "rb") as f:
+            self.assertEqual(f.read(), PDF)
+        self.assertEqual(os.listdir(os.path.dirname(self.store.path_for(key))), [key])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "upload0.pdf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+from unittest import mock
+
+from core import app
+import routes.public_routes  # noqa: F401
+import routes.auth_routes  # noqa: F401
+from upload_store import UploadStore
+from uploads import DOCUMENT_KINDS, IMAGE_KINDS, UploadError, UploadField, parse_multipart, sniff_kind
+
+BOUNDARY = b"testboundary"
+PDF = b"%PDF-1.4\n" + b"x" * 5000
+
+
+def png_chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+PNG_PIXELS = png_chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)) \
+    + png_chunk(b"IDAT", zlib.compress(b"\x00\xff\x00\x00")) + png_chunk(b"IEND", b"")
+PNG = b"\x89PNG\r\n\x1a\n" + png_chunk(b"tEXt", b"Location\x00Pune 18.52N 73.85E") + PNG_PIXELS
+
+
+def multipart(*parts):
+    body = b""
+    for name, value, filename in parts:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        body += b"--" + BOUNDARY + b"\r\nContent-Disposition: " + disposition.encode() + b"\r\n\r\n" + value + b"\r\n"
+    return body + b"--" + BOUNDARY + b"--\r\n"
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class ParseMultipartTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.fields = {
+            "document": UploadField(10000, DOCUMENT_KINDS),
+            "photo": UploadField(100, IMAGE_KINDS, prefix="photo_"),
+        }
+
+    def test_files_are_hashed_and_named_by_sniffed_type(self):
+        body = multipart(("name", b"Asha", None), ("document", PDF, "brief.DOC"), ("other", b"ignored", "x.txt"))
+        form, files = parse_multipart(io.BytesIO(body), BOUNDARY, self.fields, self.folder.name, chunk_size=1024)
+        self.assertEqual(form["name"], "Asha")
+        upload = files["document"]
+        self.assertEqual((upload.kind, upload.size, upload.filename), ("pdf", len(PDF), "brief.DOC"))
+        self.assertEqual(upload.sha256, hashlib.sha256(PDF).hexdigest())
+        self.assertTrue(upload.path.endswith(".pdf"))
+        with open(upload.path, "rb") as f:
+            self.assertEqual(f.read(), PDF)
+        self.assertNotIn("other", files)
+
+    def test_oversized_field_stops_reading_early(self):
+        photo = b"\x89PNG\r\n\x1a\n" + b"p" * 100000
+        stream = CountingStream(multipart(("name", b"Asha", None), ("photo", photo, "me.png")))
+        with self.assertRaises(UploadError) as caught:
+            parse_multipart(stream, BOUNDARY, self.fields, self.folder.name, chunk_size=64)
+        self.assertEqual(caught.exception.status, 413)
+        self.assertEqual(caught.exception.form["name"], "Asha")
+        self.assertLess(stream.bytes_read, 1000)
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+    def test_type_comes_from_content_not_extension(self):
+        body = multipart(("photo", b"MZ\x90\x00executable", "cute.png"))
+        with self.assertRaises(UploadError) as caught:
+            parse_multipart(io.BytesIO(body), BOUNDARY, self.fields, self.folder.name)
+        self.assertEqual(caught.exception.status, 415)
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+    def test_sniff_kind(self):
+        self.assertEqual(sniff_kind(b"\xff\xd8\xff\xe0"), "jpeg")
+        self.assertEqual(sniff_kind(b"PK\x03\x04", "cv.docx"), "docx")
+        self.assertIsNone(sniff_kind(b"PK\x03\x04", "archive.zip"))
+
+
+class UploadRouteTests(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.previous_folder = app.config["UPLOAD_FOLDER"]
+        app.config["UPLOAD_FOLDER"] = self.folder.name
+        self.addCleanup(app.config.__setitem__, "UPLOAD_FOLDER", self.previous_folder)
+        self.client = app.test_client()
+
+    def application(self, phone):
+        fields = {
+            "name": "Asha Rao", "email": "asha@example.com", "phone": phone, "license_number": "MH/123/2015",
+            "degree": "LLB", "specialization": "Family Law", "years_experience": "8", "bio": "b" * 60,
+            "location": "Pune",
+        }
+        parts = [(name, value.encode(), None) for name, value in fields.items()]
+        return multipart(*parts, ("photo", PNG, "me.png"))
+
+    def test_application_with_photo_and_invalid_phone(self):
+        response = self.client.post("/apply", data=self.application("12"),
+                                    content_type="multipart/form-data; boundary=testboundary")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"valid phone number", response.data)
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+    def test_application_missing_a_field_leaves_no_files(self):
+        body = multipart(("name", b"Asha Rao", None), ("photo", PNG, "me.png"), ("document", PDF, "licence.pdf"))
+        response = self.client.post("/apply", data=body, content_type="multipart/form-data; boundary=testboundary")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+    def test_application_with_photo_is_stored(self):
+        store = UploadStore(os.path.join(self.folder.name, "store"))
+        with mock.patch.object(routes.public_routes, "upload_store", store), \
+                mock.patch.object(routes.public_routes, "has_pending_application", return_value=False), \
+                mock.patch.object(routes.public_routes, "add_lawyer_application", return_value=7) as add, \
+                mock.patch.object(routes.public_routes, "queue_email"):
+            response = self.client.post("/apply", data=self.application("9876543210"),
+                                        content_type="multipart/form-data; boundary=testboundary")
+        self.assertEqual(response.status_code, 302)
+        key = add.call_args[0][0]["photo_path"]
+        stripped = b"\x89PNG\r\n\x1a\n" + PNG_PIXELS
+        self.assertEqual(key, hashlib.sha256(stripped).hexdigest() + ".png")
+        with open(store.path_for(key), "rb") as f:
+            self.assertEqual(f.read(), stripped)
+
+    def test_unreadable_photo_is_rejected(self):
+        body = multipart(("name", b"Asha Rao", None), ("photo", b"\x89PNG\r\n\x1a\n" + b"p" * 500, "me.png"))
+        response = self.client.post("/apply", data=body, content_type="multipart/form-data; boundary=testboundary")
+        self.assertIn(b"not a readable PNG image", response.data)
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+    def test_rejected_application_stores_nothing(self):
+        store = UploadStore(os.path.join(self.folder.name, "store"))
+        with mock.patch.object(routes.public_routes, "upload_store", store), \
+                mock.patch.object(routes.public_routes, "has_pending_application", return_value=True), \
+                mock.patch.object(routes.public_routes, "add_lawyer_application") as add:
+            response = self.client.post("/apply", data=self.application("9876543210"),
+                                        content_type="multipart/form-data; boundary=testboundary")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"already under review", response.data)
+        add.assert_not_called()
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+    def test_message_documents_are_rejected_before_the_view_runs(self):
+        response = self.client.post(
+            "/api/lawyers/1/messages",
+            data=multipart(("client_name", b"Asha", None), ("documents", b"not a document", "notes.pdf")),
+            content_type="multipart/form-data; boundary=testboundary",
+        )
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(response.get_json()["success"])
+        self.assertEqual(os.listdir(self.folder.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""Serving /uploads: HTTP caching, Range requests and offloading the copy to the front proxy.
+
+Store keys and image variants are named by the SHA-256 of their content, so a
+URL never changes meaning: they are sent with a far-future `immutable`
+Cache-Control and the digest as ETag. Older uploads keep a short max-age and
+revalidate. With UPLOAD_SERVING_CONFIG['offload'] set to 'x-accel' (nginx) or
+'x-sendfile' (Apache mod_xsendfile, lighttpd) the worker only sends headers
+and the proxy streams the file, including Range requests; otherwise Werkzeug
+answers Range and conditional requests itself.
+"""
+import mimetypes
+import os
+
+from flask import current_app, request
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+
+from image_variants import VARIANT_MIMETYPES
+from upload_store import KEY_PATTERN, VARIANT_PATTERN
+from uploads import UPLOAD_KINDS
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+OFFLOAD_MODES = ('', 'x-accel', 'x-sendfile')
+# Extensions mimetypes may not know (avif on older Pythons) or guesses differently
+UPLOAD_MIMETYPES = dict(VARIANT_MIMETYPES, **{ext: mimetype for ext, mimetype in UPLOAD_KINDS.values()})
+
+
+def upload_mimetype(filename):
+    extension = os.path.splitext(filename)[1].lstrip('.').lower()
+    return (UPLOAD_MIMETYPES.get(extension) or mimetypes.guess_type(filename)[0]
+            or 'application/octet-stream')
+
+
+def content_digest(filename):
+    """SHA-256 a content-addressed name was derived from, else None"""
+    match = KEY_PATTERN.match(filename) or VARIANT_PATTERN.match(filename)
+    return match.group(1) if match else None
+
+
+def send_upload(folder, relative_path, offload='', accel_prefix='', max_age=3600):
+    """Response for the file at `relative_path` under `folder`; raises NotFound if it does not exist.
+
+    `accel_prefix` is the internal nginx location that maps to `folder`.
+    """
+    path = safe_join(folder, relative_path)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+    filename = os.path.basename(path)
+    digest = content_digest(filename)
+    mimetype = upload_mimetype(filename)
+
+    if offload == 'x-accel':
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + relative_path.replace(os.sep, '/')
+        if digest:
+            response.set_etag(digest)
+    else:
+        response = send_file(
+            path, request.environ, mimetype=mimetype, etag=digest or True,
+            use_x_sendfile=offload == 'x-sendfile', response_class=current_app.response_class,
+        )
+
+    if digest:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+        response.expires = None
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.no_cache = None
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if offload == 'x-accel':
+        # nginx serves the body (and Range) itself; answer revalidation here
+        response = response.make_conditional(request.environ)
+    return response
@@ -0,0 +1,205 @@
+"""Content-addressed upload store.
+
+Each distinct file is kept once, named by its SHA-256 (plus the sniffed
+extension) under a two-level fan-out tree: <root>/ab/cd/abcd...ef.pdf. Rows that
+point at a file hold a reference counted in the upload_blobs table;
+collect_garbage() removes files nobody references any more.
+"""
+import errno
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+
+KEY_PATTERN = re.compile(r'^([0-9a-f]{64})\.([a-z0-9]{1,8})$')
+# Derived files kept next to a stored image (see image_variants): <sha256>-<width>.<format>
+VARIANT_PATTERN = re.compile(r'^([0-9a-f]{64})-(\d{1,5})\.(jpg|webp|avif)$')
+# Files younger than this are never collected, so an upload stored by a request
+# that has not recorded its reference yet is safe
+GC_GRACE_SECONDS = 3600
+GC_BATCH_SIZE = 1000
+
+
+def blob_key(value):
+    """Store key referenced by a stored value ('/uploads/<key>', a path or a bare key), else None"""
+    name = os.path.basename(value or '')
+    return name if KEY_PATTERN.match(name) else None
+
+
+def add_references(connection, values):
+    """Count one more reference for every store key among `values` (caller commits)"""
+    keys = [key for key in map(blob_key, values) if key]
+    if not keys:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(
+            "INSERT INTO upload_blobs (blob_key, refcount) VALUES (%s, 1) "
+            "ON DUPLICATE KEY UPDATE refcount = refcount + 1",
+            [(key,) for key in keys]
+        )
+    finally:
+        cursor.close()
+
+
+def release_references(connection, values):
+    """Drop one reference for every store key among `values` (caller commits)"""
+    keys = [key for key in map(blob_key, values) if key]
+    if not keys:
+        return
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(
+            "UPDATE upload_blobs SET refcount = GREATEST(refcount - 1, 0) WHERE blob_key = %s",
+            [(key,) for key in keys]
+        )
+    finally:
+        cursor.close()
+
+
+class UploadStore:
+    """Files under <folder>/ab/cd/<sha256>.<ext>"""
+
+    def __init__(self, folder, clock=time.time):
+        self.folder = folder
+        self._clock = clock
+
+    def path_for(self, key):
+        """Filesystem path of a key or image variant name, or None if it is neither"""
+        match = KEY_PATTERN.match(key or '') or VARIANT_PATTERN.match(key or '')
+        if not match:
+            return None
+        digest = match.group(1)
+        return os.path.join(self.folder, digest[:2], digest[2:4], key)
+
+    def put(self, upload):
+        """Move a SavedUpload into the store and return its key.
+
+        A file with the same content may already be stored; replacing it with
+        the identical new copy refreshes its mtime, which keeps the garbage
+        collector away from it until this upload's reference is recorded.
+        """
+        key = f"{upload.sha256}.{os.path.splitext(upload.path)[1].lstrip('.').lower()}"
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.replace(upload.path, path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # UPLOAD_STORE_FOLDER is on another filesystem: copy next to the
+            # target first so the key never names a half-written file
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            shutil.move(upload.path, tmp)
+            os.replace(tmp, path)
+        upload.path = path
+        upload.key = key
+        return key
+
+    def _is_old(self, path, grace):
+        try:
+            return self._clock() - os.path.getmtime(path) > grace
+        except OSError:
+            return False
+
+    def _remove(self, path, grace=None):
+        """Delete a stored file and any image variants derived from it; returns bytes freed.
+
+        With `grace`, the file is first renamed to a tombstone and put back if it
+        turns out to be younger than `grace`: put() may have replaced it with a
+        new upload of the same content since the caller checked its age.
+        """
+        if grace is not None:
+            tombstone = f"{path}.{uuid.uuid4().hex}.gc"
+            try:
+                os.rename(path, tombstone)
+            except OSError as e:
+                logging.warning(f"Error removing stored upload {path}: {e}")
+                return 0
+            if not self._is_old(tombstone, grace):
+                os.replace(tombstone, path)
+                return 0
+            removed, path = path, tombstone
+        else:
+            removed = path
+        size = 0
+        digest = KEY_PATTERN.match(os.path.basename(removed)).group(1)
+        folder = os.path.dirname(removed)
+        derived = [name for name in os.listdir(folder)
+                   if VARIANT_PATTERN.match(name) and name.startswith(digest)
+                   or name == f"{digest}.variants.json"] if os.path.isdir(folder) else []
+        for target in [path] + [os.path.join(folder, name) for name in derived]:
+            try:
+                size += os.path.getsize(target)
+                os.remove(target)
+            except OSError as e:
+                logging.warning(f"Error removing stored upload {target}: {e}")
+        return size
+
+    def iter_keys(self):
+        for first in sorted(os.listdir(self.folder)) if os.path.isdir(self.folder) else []:
+            first_dir = os.path.join(self.folder, first)
+            if len(first) != 2 or not os.path.isdir(first_dir):
+                continue
+            for second in sorted(os.listdir(first_dir)):
+                second_dir = os.path.join(first_dir, second)
+                if not os.path.isdir(second_dir):
+                    continue
+                for name in os.listdir(second_dir):
+                    if KEY_PATTERN.match(name):
+                        yield name
+
+    def collect_garbage(self, connection, grace=GC_GRACE_SECONDS, dry_run=False):
+        """Delete unreferenced files: rows whose count reached 0 and files that never got a row.
+
+        Returns {'unreferenced', 'orphans', 'bytes'}.
+        """
+        stats = {'unreferenced': 0, 'orphans': 0, 'bytes': 0}
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT blob_key FROM upload_blobs WHERE refcount = 0 AND updated_at < NOW() - INTERVAL %s SECOND "
+                "FOR UPDATE",
+                (int(grace),)
+            )
+            for (key,) in cursor.fetchall():
+                path = self.path_for(key)
+                if path and os.path.exists(path) and not self._is_old(path, grace):
+                    continue
+                stats['unreferenced'] += 1
+                if not dry_run:
+                    if path and os.path.exists(path):
+                        stats['bytes'] += self._remove(path, grace)
+                    cursor.execute("DELETE FROM upload_blobs WHERE blob_key = %s AND refcount = 0", (key,))
+            if not dry_run:
+                connection.commit()
+
+            # Files stored by requests that failed before recording a reference
+            batch = []
+            for key in self.iter_keys():
+                if self._is_old(self.path_for(key), grace):
+                    batch.append(key)
+                if len(batch) >= GC_BATCH_SIZE:
+                    self._remove_orphans(cursor, batch, grace, stats, dry_run)
+                    batch = []
+            self._remove_orphans(cursor, batch, grace, stats, dry_run)
+        finally:
+            cursor.close()
+        return stats
+
+    def _remove_orphans(self, cursor, keys, grace, stats, dry_run):
+        if not keys:
+            return
+        cursor.execute(
+            f"SELECT blob_key FROM upload_blobs WHERE blob_key IN ({', '.join(['%s'] * len(keys))})", keys
+        )
+        known = {key for (key,) in cursor.fetchall()}
+        for key in keys:
+            # Re-check the age: put() may have refreshed the file since it was listed
+            if key in known or not self._is_old(self.path_for(key), grace):
+                continue
+            stats['orphans'] += 1
+            if not dry_run:
+                stats['bytes'] += self._remove(self.path_for(key), grace)
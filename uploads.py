@@ -0,0 +1,293 @@
+"""Streaming multipart uploads with per-field size limits, type sniffing and hashing.
+
+Views decorated with @upload_limits(...) get their multipart body parsed by
+UploadRequest instead of Werkzeug's buffering parser: each file part is
+written to the upload folder chunk by chunk while its SHA-256 is computed,
+its type is taken from the first bytes, and the body stops being read as
+soon as a field goes over its limit. Fields with strip_metadata=True have
+EXIF, XMP and comments removed from their images before the file is named.
+"""
+import hashlib
+import os
+import uuid
+
+from flask import Request, current_app
+from werkzeug.datastructures import MultiDict
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+from werkzeug.utils import secure_filename
+
+from image_metadata import strip_metadata
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_FORM_FIELDS_SIZE = 512 * 1024
+SNIFF_LENGTH = 8
+
+# kind -> (file extension, mimetype)
+UPLOAD_KINDS = {
+    'jpeg': ('jpg', 'image/jpeg'),
+    'png': ('png', 'image/png'),
+    'gif': ('gif', 'image/gif'),
+    'pdf': ('pdf', 'application/pdf'),
+    'doc': ('doc', 'application/msword'),
+    'docx': ('docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+}
+IMAGE_KINDS = ('jpeg', 'png', 'gif')
+DOCUMENT_KINDS = ('pdf', 'doc', 'docx')
+
+
+def sniff_kind(head, filename=''):
+    """Upload kind from the leading bytes (None if unsupported)"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return 'doc'
+    # .docx is a zip archive; trust the extension only once the zip signature matches
+    if head.startswith(b'PK\x03\x04') and filename.lower().endswith('.docx'):
+        return 'docx'
+    return None
+
+
+class UploadError(Exception):
+    """An upload broke its field's rules; parsing stopped at that point"""
+
+    def __init__(self, field, message, status=400):
+        super().__init__(message)
+        self.field = field
+        self.message = message
+        self.status = status
+        self.form = MultiDict()
+
+
+class UploadField:
+    """Rules for one file field: size limit, accepted kinds, stored name prefix, file count,
+    whether image metadata is stripped"""
+
+    def __init__(self, max_size, kinds, prefix='', max_files=1, strip_metadata=False):
+        self.max_size = max_size
+        self.kinds = tuple(kinds)
+        self.prefix = prefix
+        self.max_files = max_files
+        self.strip_metadata = strip_metadata
+
+
+class SavedUpload:
+    """A file part already written to disk"""
+
+    def __init__(self, field, filename, path, size, sha256, kind):
+        self.name = field
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.kind = kind
+        # Set by UploadStore.put() once the file has been moved into the store
+        self.key = None
+
+    @property
+    def mimetype(self):
+        return UPLOAD_KINDS[self.kind][1]
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        # Request.close() closes every value in request.files; there is no open stream
+        pass
+
+    def __repr__(self):
+        return f"<SavedUpload {self.name}={self.filename!r} {self.kind} {self.size} bytes>"
+
+
+class _FileWriter:
+    """Copies one file part to disk, enforcing the size limit and hashing as it goes"""
+
+    def __init__(self, field, filename, rules, folder):
+        self.field = field
+        self.filename = secure_filename(filename) or 'upload'
+        self.rules = rules
+        self.folder = folder
+        self.size = 0
+        self.head = b''
+        self.kind = None
+        self.hash = hashlib.sha256()
+        self.part_path = os.path.join(folder, f".{uuid.uuid4().hex}.part")
+        self.file = None
+
+    def write(self, data):
+        if not data:
+            return
+        self.size += len(data)
+        self.check_size(self.size)
+        if self.kind is None:
+            self.head += data[:SNIFF_LENGTH - len(self.head)]
+            if len(self.head) >= SNIFF_LENGTH:
+                self._check_kind()
+        if self.file is None:
+            self.file = open(self.part_path, 'wb')
+        self.file.write(data)
+        self.hash.update(data)
+
+    def check_size(self, size):
+        if size > self.rules.max_size:
+            raise UploadError(self.field, f"{self.field} must be at most {self.rules.max_size // (1024 * 1024)}MB", 413)
+
+    def _check_kind(self):
+        self.kind = sniff_kind(self.head, self.filename)
+        if self.kind not in self.rules.kinds:
+            allowed = ', '.join(UPLOAD_KINDS[kind][0].upper() for kind in self.rules.kinds)
+            raise UploadError(self.field, f"{self.field} must be one of: {allowed}", 415)
+
+    def finish(self):
+        if self.kind is None:
+            self._check_kind()
+        self.file.close()
+        if self.rules.strip_metadata and self.kind in IMAGE_KINDS:
+            self._strip_metadata()
+        path = os.path.join(self.folder, f"{self.rules.prefix}{uuid.uuid4().hex}.{UPLOAD_KINDS[self.kind][0]}")
+        os.replace(self.part_path, path)
+        return SavedUpload(self.field, self.filename, path, self.size, self.hash.hexdigest(), self.kind)
+
+    def _strip_metadata(self):
+        with open(self.part_path, 'rb') as f:
+            data = f.read()
+        try:
+            data = strip_metadata(data, self.kind)
+        except ValueError:
+            raise UploadError(self.field, f"{self.field} is not a readable {UPLOAD_KINDS[self.kind][0].upper()} image")
+        with open(self.part_path, 'wb') as f:
+            f.write(data)
+        # The stored file is the stripped one, so its hash is what the upload store keys on
+        self.size = len(data)
+        self.hash = hashlib.sha256(data)
+
+    def abort(self):
+        if self.file is not None:
+            self.file.close()
+            try:
+                os.remove(self.part_path)
+            except OSError:
+                pass
+
+
+def parse_multipart(stream, boundary, fields, folder, chunk_size=UPLOAD_CHUNK_SIZE,
+                    max_form_size=MAX_FORM_FIELDS_SIZE):
+    """Parse a multipart body, streaming file parts to `folder`.
+
+    Returns (form, files) MultiDicts; files hold SavedUpload objects. File parts
+    for fields not in `fields` and empty file inputs are read and dropped.
+    Raises UploadError (after removing this request's files) when a field breaks its rules.
+    """
+    decoder = MultipartDecoder(boundary, max_form_memory_size=max_form_size)
+    form, files = [], []
+    counts = {}
+    part, writer, buffer = None, None, None
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            decoder.receive_data(chunk or None)
+            event = decoder.next_event()
+            while not isinstance(event, (Epilogue, NeedData)):
+                if isinstance(event, Field):
+                    part, writer, buffer = event, None, []
+                elif isinstance(event, File):
+                    part, writer, buffer = event, None, None
+                    rules = fields.get(event.name)
+                    if rules and event.filename:
+                        counts[event.name] = counts.get(event.name, 0) + 1
+                        if counts[event.name] > rules.max_files:
+                            raise UploadError(event.name, f"At most {rules.max_files} files for {event.name}", 413)
+                        writer = _FileWriter(event.name, event.filename, rules, folder)
+                elif isinstance(event, Data):
+                    if writer is not None:
+                        writer.write(event.data)
+                    elif buffer is not None:
+                        buffer.append(event.data)
+                    if not event.more_data:
+                        if writer is not None:
+                            if writer.size:
+                                files.append((part.name, writer.finish()))
+                            writer = None
+                        elif buffer is not None:
+                            form.append((part.name, b''.join(buffer).decode('utf-8', 'replace')))
+                            buffer = None
+                event = decoder.next_event()
+            if not chunk or isinstance(event, Epilogue):
+                break
+            if writer is not None:
+                # The decoder holds data back until it sees a line break; count it
+                # too so a file without one cannot grow past its limit in memory
+                writer.check_size(writer.size + len(decoder.buffer) - len(boundary) - 8)
+    except BaseException as e:
+        if isinstance(e, UploadError):
+            # Fields that arrived before the failing file are still usable
+            e.form = MultiDict(form)
+        if writer is not None:
+            writer.abort()
+        for _, upload in files:
+            upload.discard()
+        raise
+    return MultiDict(form), MultiDict(files)
+
+
+def discard_unstored(files):
+    """Delete a request's saved files that were not moved into the upload store"""
+    for _, upload in files.items(multi=True):
+        if isinstance(upload, SavedUpload) and upload.key is None:
+            upload.discard()
+
+
+# endpoint -> {field name: UploadField}
+UPLOAD_POLICIES = {}
+
+
+def upload_limits(**fields):
+    """Stream this view's multipart uploads with the given per-field rules"""
+    def decorator(view):
+        UPLOAD_POLICIES[view.__name__] = fields
+        return view
+    return decorator
+
+
+class UploadRequest(Request):
+    """Request whose multipart body is parsed by parse_multipart() for views with upload limits.
+
+    Files go to app.config['UPLOAD_FOLDER']. A broken rule does not raise while
+    the form is loaded (before_request hooks may read the form before the view
+    runs); it is kept on `upload_error` for the view to report.
+    """
+    _upload_error = None
+
+    @property
+    def upload_error(self):
+        """UploadError that stopped parsing this request's body, or None"""
+        self._load_form_data()
+        return self._upload_error
+
+    def _load_form_data(self):
+        if 'form' in self.__dict__:
+            return
+        fields = UPLOAD_POLICIES.get(self.endpoint)
+        boundary = self.mimetype_params.get('boundary')
+        if fields is None or self.mimetype != 'multipart/form-data' or not boundary:
+            return super()._load_form_data()
+        folder = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(folder, exist_ok=True)
+        try:
+            form, files = parse_multipart(self.stream, boundary.encode('latin-1'), fields, folder)
+        except UploadError as e:
+            self._upload_error = e
+            form, files = e.form, MultiDict()
+        except ValueError as e:
+            self._upload_error = UploadError(None, f"Malformed upload: {e}")
+            form, files = MultiDict(), MultiDict()
+        self.__dict__['form'] = form
+        self.__dict__['files'] = files
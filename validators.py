@@ -0,0 +1,44 @@
+"""Email and Indian phone number validation shared by forms, the API and bulk import"""
+import re
+
+
+def validate_email(email):
+    """Validate email format"""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+
+def validate_phone(phone):
+    """Validate Indian mobile numbers: 10 digits starting 6-9, optional +91/0 prefix"""
+    # Keep digits only for validation
+    digits = re.sub(r'\D', '', phone or '')
+    if not digits:
+        return False
+    # Strip country or trunk prefix
+    if digits.startswith('91') and len(digits) == 12:
+        digits = digits[2:]
+    elif digits.startswith('0') and len(digits) == 11:
+        digits = digits[1:]
+    # Must be 10 digits, starting 6-9
+    return len(digits) == 10 and digits[0] in '6789'
+
+
+def sanitize_phone(phone):
+    # Remove spaces, dashes, parentheses from phone number
+    return re.sub(r'[\s\-\(\)]', '', phone or '')
+
+
+def normalize_indian_phone(phone):
+    """Normalize to E.164 +91XXXXXXXXXX for valid Indian mobile numbers"""
+    digits = re.sub(r'\D', '', phone or '')
+    if digits.startswith('91') and len(digits) == 12:
+        local = digits[2:]
+    elif digits.startswith('0') and len(digits) == 11:
+        local = digits[1:]
+    elif len(digits) == 10:
+        local = digits
+    else:
+        return phone  # return original if cannot normalize
+    if len(local) == 10 and local[0] in '6789':
+        return f'+91{local}'
+    return phone